@@ -20,6 +20,9 @@ module.exports = (req, res) => {
     }
 
     // 파일 경로 설정
+    // 템플릿은 저장소에 포함되지 않으며 scripts/templates/invoice_detail.json 명세로 생성합니다.
+    // 저장소 루트에서 `python scripts/build_template.py` 를 실행하면 이 경로에 템플릿과
+    // 렌더 계획 사이드카(.plan.json)가 만들어집니다.
     const templatePath = path.join(process.cwd(), 'docs', '청구서 상세 폼.xlsx');
     const outputDir = path.join(process.cwd(), 'temp');
     const timestamp = new Date().toISOString().replace(/[:.]/g, '-');
@@ -36,7 +39,7 @@ module.exports = (req, res) => {
     if (!fs.existsSync(templatePath)) {
       return res.status(404).json({
         success: false,
-        error: '청구서 템플릿 파일을 찾을 수 없습니다.'
+        error: '청구서 템플릿 파일을 찾을 수 없습니다. 저장소 루트에서 python scripts/build_template.py 로 생성하세요.'
       });
     }
 
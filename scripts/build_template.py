@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+청구서 템플릿 빌더
+선언적 열 명세(JSON, PyYAML 이 있으면 YAML 도 가능)로부터 플레이스홀더 템플릿(xlsx)과
+렌더 계획 사이드카(`<템플릿>.plan.json`)를 함께 생성합니다.
+열 범위, 플레이스홀더, 정렬, 숫자 형식, 테두리, 인쇄 설정(용지·방향·여백·너비 맞춤)을 바꿀 때
+파이썬 코드를 고칠 필요가 없습니다.
+
+api/excel-generate.js 는 저장소 루트에서 기본 출력 경로(docs/청구서 상세 폼.xlsx)로 만든 템플릿을 사용합니다.
+
+사용 예:
+  python scripts/build_template.py                               # 저장소 루트에서: docs/청구서 상세 폼.xlsx
+  python build_template.py --spec templates/invoice_detail.json --output "docs/청구서 상세 폼.xlsx"
+  python build_template.py --compile-only "docs/청구서 상세 폼.xlsx"   # 기존 템플릿의 계획만 생성
+"""
+
+import os
+import sys
+import json
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SPEC = os.path.join(SCRIPT_DIR, "templates", "invoice_detail.json")
+DEFAULT_OUTPUT = os.path.join("docs", "청구서 상세 폼.xlsx")
+
+# ---------- 명세 로드 ----------
+def load_spec(spec_path):
+    """JSON 또는 YAML 명세를 dict 로 읽습니다."""
+    with open(spec_path, "r", encoding="utf-8") as f:
+        if spec_path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise RuntimeError("YAML 명세를 읽으려면 PyYAML 이 필요합니다 (pip install pyyaml).")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+# ---------- 스타일 생성 ----------
+def make_border(spec):
+    """"thin" 같은 문자열(네 변 동일) 또는 {"top": "thick", ...} 로 Border 생성"""
+    from openpyxl.styles import Border, Side
+
+    if not spec:
+        return None
+    if isinstance(spec, str):
+        spec = {side: spec for side in ("top", "bottom", "left", "right")}
+    return Border(**{side: Side(style=style) for side, style in spec.items()})
+
+def apply_style(cell, spec, border=None):
+    """명세의 font/align/wrap/fill/number_format/border 를 셀에 적용"""
+    from openpyxl.styles import Alignment, Font, PatternFill
+
+    if "font" in spec:
+        cell.font = Font(**spec["font"])
+    if "align" in spec or "wrap" in spec:
+        cell.alignment = Alignment(
+            horizontal=spec.get("align", "general"),
+            vertical=spec.get("valign", "center"),
+            wrap_text=spec.get("wrap", False),
+        )
+    if "fill" in spec:
+        cell.fill = PatternFill(start_color=spec["fill"], end_color=spec["fill"], fill_type="solid")
+    if "number_format" in spec:
+        cell.number_format = spec["number_format"]
+    border = make_border(spec.get("border")) or border
+    if border is not None:
+        cell.border = border
+
+def apply_print_settings(ws, spec):
+    """명세의 print 항목(paper_size, orientation, fit_to_width, margins, center_horizontally)을 적용"""
+    if "paper_size" in spec:
+        ws.page_setup.paperSize = spec["paper_size"]
+    if "orientation" in spec:
+        ws.page_setup.orientation = spec["orientation"]
+    if spec.get("fit_to_width"):
+        # 너비만 한 페이지에 맞추고 높이는 제한하지 않음 (페이지 나눔은 렌더러의 행 나눔을 따름)
+        ws.sheet_properties.pageSetUpPr.fitToPage = True
+        ws.page_setup.fitToWidth = 1
+        ws.page_setup.fitToHeight = 0
+    for side, inches in spec.get("margins", {}).items():
+        setattr(ws.page_margins, side, inches)
+    if spec.get("center_horizontally"):
+        ws.print_options.horizontalCentered = True
+
+def col_span(cols):
+    """"A:J" → (1, 10)"""
+    from openpyxl.utils import column_index_from_string
+
+    first, _, last = cols.partition(":")
+    return column_index_from_string(first), column_index_from_string(last or first)
+
+def place(ws, row, cols, spec, border=None):
+    """한 행의 열 범위에 값/스타일을 쓰고 병합합니다."""
+    c1, c2 = col_span(cols)
+    for c in range(c1, c2 + 1):
+        apply_style(ws.cell(row=row, column=c), spec, border)
+    if c2 > c1:
+        ws.merge_cells(start_row=row, start_column=c1, end_row=row, end_column=c2)
+    return ws.cell(row=row, column=c1)
+
+# ---------- 빌더 ----------
+def build_template(spec, output_path, base_dir=SCRIPT_DIR):
+    """명세로 템플릿을 만들고 저장합니다. (템플릿 경로, 렌더 계획 경로) 를 반환합니다."""
+    import openpyxl
+    from openpyxl.utils import get_column_letter
+    from openpyxl.utils.cell import range_boundaries
+    from invoice_template_renderer import compile_render_plan, write_render_plan
+
+    if spec.get("base"):
+        wb = openpyxl.load_workbook(os.path.join(base_dir, spec["base"]))
+        ws = wb[spec.get("sheet", wb.sheetnames[0])]
+    else:
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = spec.get("sheet", ws.title)
+
+    if spec.get("column_width"):
+        for c in range(1, spec.get("columns", 52) + 1):
+            ws.column_dimensions[get_column_letter(c)].width = spec["column_width"]
+
+    # 1) 고정 셀 (제목, 헤더 플레이스홀더 등)
+    for cell_spec in spec.get("cells", []):
+        c1, r1, c2, r2 = range_boundaries(cell_spec["range"])
+        for r in range(r1, r2 + 1):
+            for c in range(c1, c2 + 1):
+                apply_style(ws.cell(row=r, column=c), cell_spec)
+        if (r1, c1) != (r2, c2):
+            ws.merge_cells(cell_spec["range"])
+        ws.cell(row=r1, column=c1).value = cell_spec.get("value")
+        if cell_spec.get("height"):
+            ws.row_dimensions[r1].height = cell_spec["height"]
+
+    # 2) 항목 블록: 머리글 행, {#items}, 템플릿 행, {/items}
+    items = spec["items"]
+    border = make_border(items.get("border"))
+    header_style = items.get("header", {})
+    start_row = items["row"]
+    template_row = start_row + 1
+    for col in items["columns"]:
+        if "label" in col and items.get("header_row"):
+            place(ws, items["header_row"], col["cols"], header_style, border).value = col["label"]
+        cell = place(ws, template_row, col["cols"], col, border)
+        if "formula" in col:
+            cell.value = col["formula"].replace("{row}", str(template_row))
+        else:
+            cell.value = col.get("value")
+    if items.get("header_row") and header_style.get("height"):
+        ws.row_dimensions[items["header_row"]].height = header_style["height"]
+    if items.get("height"):
+        ws.row_dimensions[template_row].height = items["height"]
+    ws.cell(row=start_row, column=1).value = "{#items}"
+    ws.cell(row=start_row + 2, column=1).value = "{/items}"
+
+    # 3) 요약(총합계) 행
+    for i, row_spec in enumerate(spec.get("summary", [])):
+        r = start_row + 3 + i
+        for cell_spec in row_spec["cells"]:
+            place(ws, r, cell_spec["cols"], cell_spec).value = cell_spec.get("value")
+        if row_spec.get("height"):
+            ws.row_dimensions[r].height = row_spec["height"]
+
+    if spec.get("print"):
+        apply_print_settings(ws, spec["print"])
+
+    # 4) 저장 + 렌더 계획 사이드카 (합계 열은 명세의 total 표시를 따름)
+    plan = compile_render_plan(ws)
+    total_cols = [col_span(col["cols"])[0] for col in items["columns"] if col.get("total")]
+    if plan["items"] is not None:
+        if total_cols:
+            plan["items"]["total_col"] = total_cols[0]
+        plan["items"]["header_row"] = items.get("header_row")
+
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(output_dir, exist_ok=True)
+    wb.save(output_path)
+    return output_path, write_render_plan(output_path, plan)
+
+def main():
+    """메인 함수 - 명령줄 인자 처리"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='선언적 명세로 청구서 템플릿 생성')
+    parser.add_argument('--spec', default=DEFAULT_SPEC, help='열 명세 파일 (JSON/YAML)')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='생성할 템플릿 경로')
+    parser.add_argument('--compile-only', metavar='TEMPLATE', help='기존 템플릿의 렌더 계획 사이드카만 생성')
+    args = parser.parse_args()
+
+    if SCRIPT_DIR not in sys.path:
+        sys.path.insert(0, SCRIPT_DIR)
+
+    try:
+        if args.compile_only:
+            from invoice_template_renderer import write_render_plan
+            result = {"success": True, "plan_path": write_render_plan(args.compile_only)}
+        else:
+            spec = load_spec(args.spec)
+            template_path, plan_path = build_template(spec, args.output, os.path.dirname(os.path.abspath(args.spec)))
+            result = {"success": True, "output_path": template_path, "plan_path": plan_path}
+    except Exception as e:
+        result = {"success": False, "error": str(e)}
+
+    print(json.dumps(result, ensure_ascii=False))
+    return 0 if result["success"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
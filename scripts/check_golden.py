@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+골든 출력 검사
+templates/invoice_detail.json 으로 템플릿을 새로 만들고 golden/<이름>.json 의 각 사례를 렌더링한 뒤
+golden/<이름>.xlsx 와 xlsx_diff 로 구조 비교합니다. 값, 수식, 스타일, 병합, 행 높이, 인쇄 설정,
+이미지 위치 중 하나라도 달라지면 종료 코드 1 을 반환하므로 CI 에서 그대로 사용할 수 있습니다.
+
+사례 파일 형식:
+  {"description": "...", "payload": {...}, "pagination": {...}, "engine": "plan" | "fixed", "template": "..."}
+  engine 생략 시 렌더 계획 엔진(invoice_api.render), "fixed" 는 고정 레이아웃 엔진(render_fixed)
+  template 은 골든 디렉토리 기준 상대 경로이며, 생략하면 명세로 만든 템플릿을 사용합니다.
+  렌더러의 진행 메시지(logging INFO)는 출력하지 않고 비교 결과만 출력합니다.
+
+의도한 출력 변경이면 --update 로 골든을 다시 만들고 변경된 xlsx 를 함께 커밋합니다.
+
+사용 예:
+  python scripts/check_golden.py
+  python scripts/check_golden.py --case paginated --max-diffs 20
+  python scripts/check_golden.py --update
+"""
+
+import os
+import sys
+import json
+import argparse
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+GOLDEN_DIR = os.path.join(SCRIPT_DIR, "golden")
+TEMPLATE_SPEC = os.path.join(SCRIPT_DIR, "templates", "invoice_detail.json")
+
+def load_cases(golden_dir, names=None):
+    """(이름, 사례) 목록 - 이름순"""
+    cases = []
+    for filename in sorted(os.listdir(golden_dir)):
+        name, ext = os.path.splitext(filename)
+        if ext != ".json" or (names and name not in names):
+            continue
+        with open(os.path.join(golden_dir, filename), encoding="utf-8") as f:
+            cases.append((name, json.load(f)))
+    return cases
+
+def render_case(compiled, case, golden_dir):
+    from invoice_api import compile_template, render, render_fixed
+
+    if case.get("template"):
+        compiled = compile_template(os.path.join(golden_dir, case["template"]))
+    if case.get("engine", "plan") == "fixed":
+        return render_fixed(compiled, case["payload"])
+    return render(compiled, case["payload"], case.get("pagination"))
+
+def main():
+    """메인 함수 - 명령줄 인자 처리"""
+    parser = argparse.ArgumentParser(description='골든 xlsx 출력 비교')
+    parser.add_argument('--golden-dir', default=GOLDEN_DIR, help='사례(.json)와 골든(.xlsx) 디렉토리')
+    parser.add_argument('--spec', default=TEMPLATE_SPEC, help='템플릿 명세 파일')
+    parser.add_argument('--case', action='append', help='검사할 사례 이름 (여러 번 지정 가능)')
+    parser.add_argument('--max-diffs', type=int, default=10, help='사례별 최대 출력 차이 수')
+    parser.add_argument('--update', action='store_true', help='현재 출력으로 골든 xlsx 다시 생성')
+    args = parser.parse_args()
+
+    if SCRIPT_DIR not in sys.path:
+        sys.path.insert(0, SCRIPT_DIR)
+
+    import logging
+    import tempfile
+    logging.basicConfig(level=logging.ERROR, format="%(message)s")
+    from build_template import load_spec, build_template
+    from invoice_api import compile_template, write_output
+    from xlsx_diff import diff_workbooks, format_diff
+
+    cases = load_cases(args.golden_dir, args.case)
+    if not cases:
+        print(f"사례가 없습니다: {args.golden_dir}")
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        template_path, _ = build_template(
+            load_spec(args.spec), os.path.join(tmp, "template.xlsx"),
+            os.path.dirname(os.path.abspath(args.spec)),
+        )
+        compiled = compile_template(template_path)
+
+    failed = False
+    for name, case in cases:
+        golden_path = os.path.join(args.golden_dir, f"{name}.xlsx")
+        data = render_case(compiled, case, args.golden_dir)
+        if args.update:
+            write_output(golden_path, data)
+            print(f"갱신 {name}: {golden_path}")
+            continue
+        if not os.path.exists(golden_path):
+            failed = True
+            print(f"FAIL {name}: 골든 파일 없음 (--update 로 생성)")
+            continue
+
+        diffs = diff_workbooks(golden_path, data, args.max_diffs)
+        failed |= bool(diffs)
+        print(f"{'FAIL' if diffs else 'OK  '} {name}: {case.get('description', '')}")
+        for d in diffs:
+            print(f"     {format_diff(d)}")
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
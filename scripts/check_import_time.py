@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+임포트 시간 예산 검사
+`python -X importtime` 으로 각 스크립트의 기동 경로를 실행해
+인터프리터 기본 임포트를 뺀 추가 임포트 시간이 예산 안에 있는지,
+무거운 모듈(openpyxl, weasyprint 등)이 불필요하게 로드되지 않는지 확인합니다.
+예산 초과 시 종료 코드 1 을 반환하므로 CI 에서 그대로 사용할 수 있습니다.
+
+사용 예:
+  python scripts/check_import_time.py
+  python scripts/check_import_time.py --budget-ms 40 --runs 7
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 어떤 기동 경로에서도 로드되면 안 되는 무거운 모듈
+HEAVY_MODULES = ("openpyxl", "weasyprint", "PIL", "asyncio", "multiprocessing")
+
+# (이름, python 인자) - 모두 무거운 작업 전에 끝나는 경로
+CHECKS = [
+    ("import invoice_template_renderer", ["-c", "import invoice_template_renderer"]),
+    ("import excel_generator", ["-c", "import excel_generator"]),
+    ("import html_to_pdf", ["-c", "import html_to_pdf"]),
+    ("import build_template", ["-c", "import build_template"]),
+    ("import invoice_api", ["-c", "import invoice_api"]),
+    ("import xlsx_preview", ["-c", "import xlsx_preview"]),
+    ("import xlsx_import", ["-c", "import xlsx_import"]),
+    ("import xlsx_diff", ["-c", "import xlsx_diff"]),
+    ("import invoice_schema", ["-c", "import invoice_schema"]),
+    ("invoice_template_renderer.py (예시 출력)", ["invoice_template_renderer.py"]),
+]
+
+def parse_importtime(stderr):
+    """-X importtime 출력에서 최상위 임포트의 (모듈 이름, 누적 µs) 목록을 추출"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2]
+        depth = len(name) - len(name.lstrip(" "))
+        if depth <= 1:
+            entries.append((name.strip(), int(parts[1])))
+    return entries
+
+def all_imported(stderr):
+    """-X importtime 출력에 나온 모든 모듈 이름"""
+    return {line.split("|")[-1].strip() for line in stderr.splitlines() if line.startswith("import time:")}
+
+def run_importtime(args):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=SCRIPT_DIR, capture_output=True, text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    return proc.stderr
+
+def measure(args, baseline, runs):
+    """기본 임포트를 제외한 추가 임포트 시간(ms, 최솟값)과 로드된 모듈 집합"""
+    best = None
+    modules = set()
+    for _ in range(runs):
+        stderr = run_importtime(args)
+        extra_us = sum(us for name, us in parse_importtime(stderr) if name not in baseline)
+        best = extra_us if best is None else min(best, extra_us)
+        modules = all_imported(stderr)
+    return best / 1000, modules
+
+def main():
+    """메인 함수 - 명령줄 인자 처리"""
+    parser = argparse.ArgumentParser(description='스크립트 임포트 시간 예산 검사')
+    parser.add_argument('--budget-ms', type=float, default=30.0, help='경로별 추가 임포트 시간 예산(ms)')
+    parser.add_argument('--runs', type=int, default=5, help='경로별 반복 측정 횟수 (최솟값 사용)')
+    args = parser.parse_args()
+
+    baseline = all_imported(run_importtime(["-c", "pass"]))
+
+    failed = False
+    for label, cmd in CHECKS:
+        elapsed_ms, modules = measure(cmd, baseline, args.runs)
+        heavy = sorted(m for m in modules if m.split(".")[0] in HEAVY_MODULES)
+        ok = elapsed_ms <= args.budget_ms and not heavy
+        failed |= not ok
+        status = "OK  " if ok else "FAIL"
+        print(f"{status} {label}: {elapsed_ms:.1f}ms (예산 {args.budget_ms:.0f}ms)")
+        if heavy:
+            print(f"     불필요한 무거운 임포트: {', '.join(heavy[:5])}")
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,12 +9,9 @@ import os
 from pathlib import Path
 
 def check_weasyprint():
-    """Check if weasyprint is installed"""
-    try:
-        import weasyprint
-        return True
-    except ImportError:
-        return False
+    """Check if weasyprint is installed (without importing it)"""
+    from importlib.util import find_spec
+    return find_spec("weasyprint") is not None
 
 def install_weasyprint():
     """Install weasyprint if not available"""
@@ -28,8 +25,44 @@ def install_weasyprint():
         print("❌ Failed to install weasyprint")
         return False
 
-def convert_html_to_pdf(input_file, output_file=None):
-    """Convert HTML file to PDF"""
+IMAGE_PLACEHOLDER = r"\{IMAGE:([^{}:]+)(?::(\d+)x(\d+))?\}"
+FONT_FAMILY = '"Apple SD Gothic Neo", "Malgun Gothic", "Nanum Gothic", Arial, sans-serif'
+
+def page_css(size="A4", margin="2cm"):
+    """Page box and Korean font stack shared by the PDF and PNG renderers"""
+    return f"""
+            @page {{
+                size: {size};
+                margin: {margin};
+            }}
+            body {{
+                font-family: {FONT_FAMILY};
+            }}
+        """
+
+def embed_images(html, images):
+    """Replace {IMAGE:key} / {IMAGE:key:WxH} placeholders with inline PNG <img> tags"""
+    import re
+    import html as html_lib
+    import base64
+    from image_cache import prepare_image
+
+    def repl(m):
+        source = images.get(m.group(1).strip())
+        if not source:
+            return ""
+        size = (int(m.group(2)), int(m.group(3))) if m.group(2) else None
+        png, (width, height) = prepare_image(source, size)
+        data = base64.b64encode(png).decode("ascii")
+        return f'<img src="data:image/png;base64,{data}" width="{width}" height="{height}" alt="{html_lib.escape(m.group(1))}">'
+
+    return re.sub(IMAGE_PLACEHOLDER, repl, html)
+
+def convert_html_to_pdf(input_file, output_file=None, images=None):
+    """Convert HTML file to PDF
+
+    images: optional {key: data URL / base64 / path under INVOICE_ASSET_ROOT} used for {IMAGE:key} placeholders
+    """
     from weasyprint import HTML, CSS
 
     if output_file is None:
@@ -41,13 +74,8 @@ def convert_html_to_pdf(input_file, output_file=None):
 
     try:
         # Custom CSS for Korean font support and styling
-        custom_css = CSS(string='''
-            @page {
-                size: A4;
-                margin: 2cm;
-            }
+        custom_css = CSS(string=page_css() + '''
             body {
-                font-family: "Apple SD Gothic Neo", "Malgun Gothic", "Nanum Gothic", Arial, sans-serif;
                 line-height: 1.6;
                 color: #333;
             }
@@ -112,7 +140,12 @@ def convert_html_to_pdf(input_file, output_file=None):
         ''')
 
         # Convert HTML to PDF
-        HTML(filename=str(input_file)).write_pdf(
+        if images:
+            html_text = embed_images(Path(input_file).read_text(encoding="utf-8"), images)
+            document = HTML(string=html_text, base_url=str(Path(input_file).resolve().parent))
+        else:
+            document = HTML(filename=str(input_file))
+        document.write_pdf(
             str(output_file),
             stylesheets=[custom_css]
         )
@@ -130,6 +163,38 @@ def convert_html_to_pdf(input_file, output_file=None):
         print(f"\n❌ PDF 생성 실패: {e}")
         return False
 
+def html_to_png(html, css=None, resolution=96):
+    """Render the first page of an HTML string to PNG bytes
+
+    The document is laid out once and only its first page is kept, so long
+    previews are not rasterized (WeasyPrint < 53) or written (newer versions,
+    rasterized with pypdfium2 when it is installed) page by page.
+    """
+    if not check_weasyprint():
+        raise RuntimeError("PNG 미리보기에는 weasyprint 가 필요합니다 (pip install weasyprint).")
+    from weasyprint import HTML, CSS
+
+    stylesheets = [CSS(string=css or page_css("A4 landscape", "1cm"))]
+    rendered = HTML(string=html).render(stylesheets=stylesheets)
+    first_page = rendered.copy(rendered.pages[:1])
+    if hasattr(first_page, "write_png"):
+        return first_page.write_png(resolution=resolution)
+
+    try:
+        import pypdfium2
+    except ImportError:
+        raise RuntimeError("PNG 미리보기에는 pypdfium2 가 필요합니다 (pip install pypdfium2).")
+    from io import BytesIO
+
+    pdf = pypdfium2.PdfDocument(first_page.write_pdf())
+    try:
+        image = pdf[0].render(scale=resolution / 72).to_pil()
+        out = BytesIO()
+        image.save(out, format="PNG", optimize=True)
+        return out.getvalue()
+    finally:
+        pdf.close()
+
 def main():
     """Main function"""
     # Check if weasyprint is installed
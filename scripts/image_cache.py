@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+이미지(도장/로고) 디코딩 캐시
+Base64 data URL(company_info.stamp_image), Base64 문자열, 파일 경로, bytes 를 받아
+목표 크기로 줄인 PNG bytes 로 변환합니다.
+파일 경로는 INVOICE_ASSET_ROOT 환경 변수로 지정한 자산 디렉토리 아래의 파일만 읽습니다.
+(payload 를 통해 렌더링 서비스의 임의 파일을 읽어 가지 못하도록, 실제 경로 기준으로 검사)
+결과는 (원본 해시, 목표 크기) 로 캐시되어, 대량 렌더링에서 같은 PNG 를 매번
+다시 디코딩/리사이즈/인코딩하지 않습니다.
+
+INVOICE_IMAGE_CACHE_DIR 환경 변수를 지정하면 프로세스 간에도 디스크 캐시를 공유합니다.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+MAX_ENTRIES = 64
+ASSET_ROOT_ENV = "INVOICE_ASSET_ROOT"
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+def asset_path(source):
+    """자산 디렉토리 안의 파일이면 실제 경로, 아니면 None.
+
+    상대 경로는 자산 디렉토리 기준이며, 심볼릭 링크나 ".." 로 디렉토리를 벗어나는 경로는 거부합니다.
+    """
+    root = os.environ.get(ASSET_ROOT_ENV)
+    if not root or source.startswith("data:") or "\0" in source:
+        return None
+    root = os.path.realpath(root)
+    path = os.path.realpath(os.path.join(root, source))
+    if os.path.commonpath([root, path]) != root or not os.path.isfile(path):
+        return None
+    return path
+
+def source_error(source):
+    """payload 로 받은 이미지 원본을 쓸 수 없으면 오류 메시지, 아니면 None"""
+    import base64
+    import binascii
+
+    if source is None or isinstance(source, (bytes, bytearray)):
+        return None
+    if not isinstance(source, str):
+        return f"data URL 또는 Base64 문자열이어야 합니다: {type(source).__name__}"
+    if not source or source.startswith("data:") and "," in source:
+        return None
+    if asset_path(source) is not None:
+        return None
+    try:
+        base64.b64decode("".join(source.split()), validate=True)
+    except binascii.Error:
+        return f"data URL 또는 Base64 가 아닙니다 (파일 경로는 {ASSET_ROOT_ENV} 아래만 허용)"
+    return None
+
+def source_digest(source):
+    """원본(디코딩 전)의 SHA-256. 자산 파일은 실제 경로+수정 시각+크기로 식별합니다."""
+    import hashlib
+
+    if isinstance(source, (bytes, bytearray)):
+        return hashlib.sha256(source).hexdigest()
+    path = asset_path(source)
+    if path is not None:
+        st = os.stat(path)
+        source = f"file:{path}:{st.st_mtime_ns}:{st.st_size}"
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+def decode_source(source):
+    """data URL / Base64 문자열 / 자산 디렉토리 안의 파일 경로 / bytes → 원본 이미지 bytes"""
+    import base64
+
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    if source.startswith("data:"):
+        return base64.b64decode(source.split(",", 1)[1])
+    path = asset_path(source)
+    if path is not None:
+        with open(path, "rb") as f:
+            return f.read()
+    message = source_error(source)
+    if message:
+        raise ValueError(message)
+    return base64.b64decode(source)
+
+def encode_image(raw, size=None):
+    """이미지를 목표 크기 안으로(비율 유지) 줄여 PNG bytes 와 (폭, 높이) 를 반환합니다."""
+    from io import BytesIO
+
+    try:
+        from PIL import Image
+    except ImportError:
+        raise RuntimeError("이미지를 넣으려면 Pillow 가 필요합니다 (pip install pillow).")
+
+    with Image.open(BytesIO(raw)) as im:
+        im.load()
+        if im.mode not in ("RGB", "RGBA", "L", "LA"):
+            im = im.convert("RGBA")
+        if size:
+            im.thumbnail(size, Image.LANCZOS)
+        out = BytesIO()
+        im.save(out, format="PNG", optimize=True)
+        return out.getvalue(), im.size
+
+def disk_cache_path(key):
+    cache_dir = os.environ.get("INVOICE_IMAGE_CACHE_DIR")
+    if not cache_dir:
+        return None
+    digest, size = key
+    suffix = f"{size[0]}x{size[1]}" if size else "orig"
+    return os.path.join(cache_dir, f"{digest}_{suffix}.png")
+
+def prepare_image(source, size=None):
+    """캐시를 거쳐 (PNG bytes, (폭, 높이)) 를 반환합니다. size 는 (폭, 높이) 픽셀 또는 None."""
+    key = (source_digest(source), tuple(size) if size else None)
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+            return entry
+
+    path = disk_cache_path(key)
+    if path and os.path.exists(path):
+        from PIL import Image
+        with open(path, "rb") as f:
+            png = f.read()
+        with Image.open(path) as im:
+            entry = (png, im.size)
+    else:
+        entry = encode_image(decode_source(source), key[1])
+        if path:
+            from invoice_api import write_output
+            write_output(path, entry[0])  # 고유 임시 파일 → os.replace (스레드/프로세스 간 충돌 없음)
+
+    with _lock:
+        _stats["misses"] += 1
+        _cache[key] = entry
+        while len(_cache) > MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return entry
+
+def cache_info():
+    """캐시 적중/실패 횟수와 현재 항목 수"""
+    with _lock:
+        return {**_stats, "entries": len(_cache)}
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
+        _stats.update(hits=0, misses=0)
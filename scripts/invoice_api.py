@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+청구서 렌더링 라이브러리 API
+파일 경로나 하위 프로세스를 거치지 않고 같은 프로세스 안에서 청구서를 만들어 bytes 로 돌려줍니다.
+실패는 {"success": False} dict 대신 아래의 예외로 알립니다.
+
+  InvoiceError            모든 청구서 오류의 기반 클래스
+  ├─ TemplateError        템플릿을 읽을 수 없음 / 시트 없음 / 잘못된 렌더 계획
+  ├─ PayloadError         payload 형식 오류 (errors: 항목 위치별 검증 오류 전체 목록)
+  └─ RenderError          렌더링 또는 저장 중 오류
+
+사용 예:
+  from invoice_api import compile_template, render
+  compiled = compile_template("docs/청구서 상세 폼.xlsx")   # 한 번만 (템플릿 bytes + 렌더 계획)
+  data = render(compiled, payload)                         # 여러 스레드에서 동시에 호출 가능
+
+payload 는 템플릿을 열기 전에 invoice_schema 로 한 번에 검증·정규화되므로
+잘못된 작업은 렌더링 비용 없이 모든 오류와 함께 PayloadError 로 거부됩니다.
+이미 validate_payload 를 거친 payload 는 validated=True 로 넘겨 검증을 건너뜁니다
+(render_invoice, render_service 처럼 공개 진입점에서 한 번 검증하는 호출자용).
+
+CompiledTemplate 은 읽기 전용입니다. 렌더링마다 템플릿 bytes 로 새 워크북을 열고
+렌더 계획은 읽기만 하므로, 하나의 CompiledTemplate 을 여러 스레드가 공유해도 안전합니다.
+invoice_template_renderer.render_invoice 와 excel_generator.generate_invoice 는
+이 모듈을 감싸 파일 저장과 결과 dict 변환만 담당합니다.
+"""
+
+import os
+
+# openpyxl, logging 은 실제로 사용하는 함수 안에서 지연 임포트합니다.
+# 진행/경고 메시지는 stderr 에 직접 쓰지 않고 logging 으로 남깁니다 (호출자가 처리 방식을 결정).
+
+FIXED_SHEET = "청구서"
+FIXED_DATA_START_ROW = 10
+FIXED_HEADER_CELLS = (("A3", "client"), ("A4", "project"), ("A5", "site_addr"), ("J3", "issued_at"))
+
+def logger():
+    """모듈 로거 (logging 은 임포트 비용이 커서 처음 메시지를 남길 때 임포트)"""
+    import logging
+    return logging.getLogger(__name__)
+
+# ---------- 예외 ----------
+class InvoiceError(Exception):
+    """청구서 생성 오류의 기반 클래스"""
+
+class TemplateError(InvoiceError):
+    """템플릿을 읽거나 해석할 수 없음"""
+
+class PayloadError(InvoiceError):
+    """payload 가 템플릿이 요구하는 형식이 아님"""
+
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        # [{"path": "items[3].qty", "index": 3, "error": "..."}, ...]
+        self.errors = errors or []
+
+class RenderError(InvoiceError):
+    """렌더링 또는 저장 중 오류"""
+
+# ---------- 컴파일된 템플릿 ----------
+class CompiledTemplate:
+    """템플릿 bytes 와 렌더 계획의 읽기 전용 묶음"""
+
+    __slots__ = ("data", "plan", "sha256", "path")
+
+    def __init__(self, data, plan, path=None):
+        from invoice_template_renderer import file_sha256
+
+        self.data = data
+        self.plan = plan
+        self.sha256 = file_sha256(data)
+        self.path = path
+
+    def load_workbook(self):
+        """렌더링용 새 워크북 (호출마다 독립된 객체)"""
+        import openpyxl
+        from io import BytesIO
+
+        try:
+            return openpyxl.load_workbook(BytesIO(self.data))
+        except Exception as e:
+            raise TemplateError(f"템플릿을 열 수 없습니다: {e}") from e
+
+    def __repr__(self):
+        return f"CompiledTemplate(path={self.path!r}, sha256={self.sha256[:12]})"
+
+def read_template(template):
+    """템플릿 경로 / bytes / CompiledTemplate → (bytes, 경로 또는 None)"""
+    if isinstance(template, CompiledTemplate):
+        return template.data, template.path
+    if isinstance(template, (bytes, bytearray, memoryview)):
+        return bytes(template), None
+    if isinstance(template, (str, os.PathLike)):
+        path = os.fspath(template)
+        try:
+            with open(path, "rb") as f:
+                return f.read(), path
+        except OSError as e:
+            raise TemplateError(f"템플릿 파일을 읽을 수 없습니다: {path} ({e})") from e
+    raise TemplateError(f"템플릿은 경로, bytes, CompiledTemplate 중 하나여야 합니다: {type(template).__name__}")
+
+def compile_template(template, plan=None):
+    """템플릿을 렌더링 준비 상태로 만듭니다.
+
+    plan 이 없으면 템플릿 옆 사이드카(`<템플릿>.plan.json`)를, 그것도 없으면 템플릿을 스캔해 만듭니다.
+    이미 CompiledTemplate 이면 그대로 반환합니다. 계획 형식이 올바르지 않으면 TemplateError.
+    """
+    from invoice_template_renderer import compile_render_plan, load_render_plan, plan_errors
+
+    if isinstance(template, CompiledTemplate) and plan is None:
+        return template
+    data, path = read_template(template)
+    if plan is None and path is not None:
+        try:
+            plan = load_render_plan(path, data)
+        except (OSError, ValueError) as e:
+            raise TemplateError(f"렌더 계획 사이드카를 읽을 수 없습니다: {e}") from e
+    compiled = CompiledTemplate(data, plan, path)
+    if plan is None:
+        logger().info("  렌더 계획 사이드카가 없어 템플릿을 스캔합니다.")
+        wb = compiled.load_workbook()
+        compiled.plan = compile_render_plan(wb[wb.sheetnames[0]])
+    errors = plan_errors(compiled.plan)
+    if errors:
+        raise TemplateError(f"렌더 계획 형식이 올바르지 않습니다: {'; '.join(errors)}")
+    return compiled
+
+def save_workbook(wb):
+    """워크북을 xlsx bytes 로 직렬화"""
+    from io import BytesIO
+
+    out = BytesIO()
+    try:
+        wb.save(out)
+    except Exception as e:
+        raise RenderError(f"파일 저장 실패: {e}") from e
+    return out.getvalue()
+
+# ---------- 플레이스홀더 템플릿 렌더링 ----------
+def render_workbook(template, payload, pagination=None, validated=False):
+    """렌더링된 (Workbook, apply_render_plan 결과) 를 반환합니다. 레이아웃 사이드카가 필요한 호출자용.
+
+    validated: payload 가 이미 validate_payload(payload, pagination=pagination) 의 결과이면 True
+    """
+    from invoice_template_renderer import apply_render_plan
+
+    if not validated:
+        from invoice_schema import validate_payload
+        payload = validate_payload(payload, pagination=pagination)
+    compiled = compile_template(template)
+    wb = compiled.load_workbook()
+    if compiled.plan["sheet"] not in wb.sheetnames:
+        raise TemplateError(f"렌더 계획의 시트를 찾을 수 없습니다: {compiled.plan['sheet']}")
+    ws = wb[compiled.plan["sheet"]]
+    try:
+        rendered = apply_render_plan(ws, compiled.plan, payload, pagination)
+    except Exception as e:
+        # payload 와 계획은 이미 검증되었으므로 남은 오류는 템플릿 내용이나 렌더러 문제
+        raise RenderError(f"렌더링 실패: {e!r}") from e
+    return wb, rendered
+
+def render(template, payload, pagination=None, validated=False):
+    """플레이스홀더 템플릿을 렌더링한 xlsx bytes.
+
+    template: 템플릿 경로, 템플릿 bytes, 또는 compile_template() 결과
+    pagination: render_invoice 와 같은 페이지 나눔 설정
+    validated: payload 가 이미 검증·정규화되었으면 True (render_workbook 참고)
+    """
+    wb, _ = render_workbook(template, payload, pagination, validated)
+    return save_workbook(wb)
+
+# ---------- 고정 레이아웃 렌더링 ----------
+def set_merged_cell_value(ws, cell_ref, value):
+    """병합된 셀이면 병합 범위의 좌상단 셀에 값을 씁니다."""
+    cell = ws[cell_ref]
+    if cell.__class__.__name__ == "MergedCell":
+        for merged_range in ws.merged_cells.ranges:
+            if cell_ref in merged_range:
+                ws[merged_range.start_cell.coordinate].value = value
+                return
+    cell.value = value
+
+def render_fixed(template, payload):
+    """고정 레이아웃(헤더 A3/A4/A5/J3, 10행부터 항목) 청구서의 xlsx bytes"""
+    from invoice_schema import validate_payload
+
+    payload = validate_payload(payload, engine="fixed")
+    data, path = read_template(template)
+    wb = CompiledTemplate(data, None, path).load_workbook()
+    if not wb.sheetnames:
+        raise TemplateError("워크시트를 찾을 수 없습니다.")
+    if FIXED_SHEET in wb.sheetnames:
+        ws = wb[FIXED_SHEET]
+    else:
+        ws = wb[wb.sheetnames[0]]
+        logger().warning(f"'{FIXED_SHEET}' 시트를 찾을 수 없어 '{ws.title}' 시트를 사용합니다.")
+    header = payload["header"]
+
+    # 1) 헤더 바인딩 (병합된 셀은 좌상단 셀에)
+    for cell_ref, key in FIXED_HEADER_CELLS:
+        try:
+            set_merged_cell_value(ws, cell_ref, header[key])
+        except (AttributeError, ValueError) as e:
+            raise TemplateError(f"{ws.title} 시트 {cell_ref} 셀에 {key} 값을 쓸 수 없습니다: {e}") from e
+
+    # 2) 항목 행: 연번, 작업명, 규격, 수량, 단위, 단가, 합계, 비고 (값은 검증·변환 완료)
+    for i, item in enumerate(payload["items"]):
+        row = FIXED_DATA_START_ROW + i
+        qty, unit_price = item.get("qty", 0), item.get("unit_price", 0)
+        values = (
+            i + 1, item.get("title", ""), item.get("spec", ""), qty, item.get("unit", ""),
+            unit_price, qty * unit_price, item.get("note", ""),
+        )
+        try:
+            for c, value in enumerate(values, start=1):
+                ws.cell(row=row, column=c).value = value
+        except AttributeError as e:
+            # 일부 행만 쓰인 청구서를 내보내지 않도록 전체를 실패 처리
+            raise TemplateError(f"{ws.title} 시트 {row}행에 값을 쓸 수 없습니다 (병합된 셀?): {e}") from e
+
+    return save_workbook(wb)
+
+# ---------- 파일 어댑터 공용 ----------
+def write_output(output_path, data):
+    """bytes 를 출력 경로에 원자적으로 저장 (같은 디렉토리의 고유한 임시 파일 → os.replace)"""
+    import tempfile
+
+    output_path = os.fspath(output_path)
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    tmp_path = None
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=output_dir, prefix=os.path.basename(output_path) + ".",
+                                         suffix=".tmp", delete=False) as f:
+            tmp_path = f.name
+            f.write(data)
+        os.replace(tmp_path, output_path)
+    except OSError as e:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise RenderError(f"출력 파일을 저장할 수 없습니다: {output_path} ({e})") from e
+    return output_path
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+청구서 스크립트 공용 진입점
+하위 명령 이름만 보고 해당 스크립트 모듈을 그때 임포트하여 main()을 호출합니다.
+
+사용 예:
+  python invoice_cli.py render --template 템플릿.xlsx --output 결과.xlsx --data data.json
+  python invoice_cli.py generate --template 템플릿.xlsx --output 결과.xlsx --data data.json
+  python invoice_cli.py pdf public/user-guide.html user-guide.pdf
+  python invoice_cli.py serve --port 8765
+  python invoice_cli.py build-template --spec templates/invoice_detail.json
+  python invoice_cli.py preview --input 결과.xlsx --pages 1
+  python invoice_cli.py import --input 견적서.xlsx --output payloads.jsonl
+  python invoice_cli.py diff 이전.xlsx 새.xlsx
+  python invoice_cli.py validate --data payloads.jsonl
+"""
+
+import os
+import sys
+
+# 하위 명령 → (모듈 이름, 진입 함수, 설명)
+COMMANDS = {
+    "render": ("invoice_template_renderer", "main", "플레이스홀더 템플릿으로 청구서 렌더링"),
+    "generate": ("excel_generator", "main", "고정 레이아웃 청구서 엑셀 생성"),
+    "pdf": ("html_to_pdf", "main", "HTML 을 PDF 로 변환"),
+    "serve": ("render_service", "main", "로컬 렌더링 서비스 실행"),
+    "build-template": ("build_template", "main", "열 명세로 템플릿과 렌더 계획 생성"),
+    "preview": ("xlsx_preview", "main", "렌더링된 청구서 HTML/PNG 미리보기"),
+    "import": ("xlsx_import", "main", "견적/청구 엑셀을 JSONL payload 로 변환"),
+    "diff": ("xlsx_diff", "main", "두 xlsx 워크북의 구조 비교"),
+    "validate": ("invoice_schema", "main", "payload(JSON/JSONL) 일괄 검증"),
+}
+
+def print_usage(stream):
+    print("사용법: python invoice_cli.py <명령> [인자...]", file=stream)
+    print("", file=stream)
+    print("명령:", file=stream)
+    for name, (_, _, help_text) in COMMANDS.items():
+        print(f"  {name:<10} {help_text}", file=stream)
+
+def main(argv=None):
+    """메인 함수 - 하위 명령 분기"""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print_usage(sys.stdout if argv else sys.stderr)
+        return 0 if argv else 2
+
+    name, rest = argv[0], argv[1:]
+    if name not in COMMANDS:
+        print(f"알 수 없는 명령: {name}", file=sys.stderr)
+        print_usage(sys.stderr)
+        return 2
+
+    module_name, func_name, _ = COMMANDS[name]
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    if script_dir not in sys.path:
+        sys.path.insert(0, script_dir)
+
+    from importlib import import_module
+    module = import_module(module_name)
+
+    # 각 스크립트의 main()은 sys.argv 를 직접 읽으므로 하위 명령 기준으로 바꿔 둡니다.
+    sys.argv = [f"{sys.argv[0]} {name}"] + rest
+    result = getattr(module, func_name)()
+    return result if isinstance(result, int) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+청구서 증분 재렌더링
+이전 렌더링 결과(xlsx)에서 바뀐 항목의 행만 시트 XML 수준에서 고쳐 씁니다.
+워크북 전체를 다시 읽고 저장하지 않으므로 큰 견적서에서도 수 ms 단위로 끝납니다.
+
+전체 렌더링 때 item_key 를 주면 출력 옆에 `<출력>.layout.json` 이 기록됩니다.
+여기에는 렌더 계획, 페이지 배치, 항목 목록, 출력 해시가 담겨 있어
+항목 키 → (시트, 행) 위치를 바로 찾을 수 있습니다.
+
+부분 갱신이 불가능한 경우(항목 추가/삭제/순서 변경, 헤더 값 변경, 페이지 설정·템플릿·렌더 계획
+변경, 출력 파일이 레이아웃 기록 이후 바뀜 등)에는 None 을 반환하고, 호출자(render_invoice)가 전체 렌더링합니다.
+"""
+
+import os
+import json
+
+from xlsx_package import sha256_bytes, sheet_members
+
+LAYOUT_VERSION = 2
+LAYOUT_SUFFIX = ".layout.json"
+
+def logger():
+    """증분 갱신 진행 메시지용 로거"""
+    import logging
+    return logging.getLogger(__name__)
+
+# ---------- 레이아웃 사이드카 ----------
+def layout_path_for(output_path):
+    """출력 파일에 대응하는 레이아웃 사이드카 경로"""
+    return f"{output_path}{LAYOUT_SUFFIX}"
+
+def header_digest(payload):
+    """items 를 제외한 payload 의 해시 (전역 플레이스홀더 값 변경 감지용)"""
+    header = {k: v for k, v in payload.items() if k != "items"}
+    return sha256_bytes(json.dumps(header, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+
+def plan_digest(plan):
+    """렌더 계획의 해시 (요청한 계획이 기록된 계획과 같은지 확인용)"""
+    return sha256_bytes(json.dumps(plan, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+
+def pagination_settings(pagination):
+    """비교용 페이지 설정 (값이 None 인 키는 지정하지 않은 것과 같음)"""
+    return {k: v for k, v in (pagination or {}).items() if v is not None}
+
+def write_output_layout(output_path, plan, layout, sheet_titles, total_cells, payload, item_key, pagination,
+                        template_sha256=None):
+    """전체 렌더링 직후 출력 파일의 레이아웃 사이드카를 기록합니다."""
+    with open(output_path, "rb") as f:
+        output_sha = sha256_bytes(f.read())
+    meta = {
+        "version": LAYOUT_VERSION,
+        "output_sha256": output_sha,
+        "item_key": item_key,
+        "template_sha256": template_sha256,
+        "header_digest": header_digest(payload),
+        "pagination": pagination,
+        "plan": plan,
+        "layout": layout,
+        "sheets": sheet_titles,
+        "total_cells": total_cells,
+        "items": payload.get("items", []),
+    }
+    return write_layout(output_path, meta)
+
+def write_layout(output_path, meta):
+    """레이아웃 사이드카를 원자적으로 저장 (출력 xlsx 를 저장한 뒤에 호출)"""
+    from invoice_api import write_output
+
+    data = json.dumps(meta, ensure_ascii=False, default=str).encode("utf-8")
+    return write_output(layout_path_for(output_path), data)
+
+def read_output_layout(output_path):
+    path = layout_path_for(output_path)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    return meta if meta.get("version") == LAYOUT_VERSION else None
+
+# ---------- 변경 항목 계산 ----------
+def merge_changes(items, changes, item_key):
+    """변경 목록(항목 키 포함 dict)을 항목 목록에 반영한 새 목록.
+
+    알려지지 않은 키는 끝에 추가하고, {"_deleted": true} 가 있으면 삭제합니다.
+    """
+    by_key = {change.get(item_key): change for change in changes}
+    merged = []
+    for item in items:
+        change = by_key.pop(item.get(item_key), None)
+        if change is None:
+            merged.append(item)
+        elif not change.get("_deleted"):
+            merged.append({**item, **change})
+    merged.extend(change for change in by_key.values() if not change.get("_deleted"))
+    return merged
+
+def changed_indexes(old_items, new_items, item_key):
+    """같은 키 순서에서 값이 바뀐 항목 번호 목록. 추가/삭제/순서 변경이면 None."""
+    if len(old_items) != len(new_items):
+        return None
+    changed = []
+    for i, (old, new) in enumerate(zip(old_items, new_items)):
+        if old.get(item_key) is None or old.get(item_key) != new.get(item_key):
+            return None
+        if old != new:
+            changed.append(i)
+    return changed
+
+def locate_item(layout, index):
+    """항목 번호 → (시트 번호, 행 번호)"""
+    for page in layout["pages"]:
+        if page["index"] <= index < page["index"] + page["count"]:
+            return page["sheet"], page["row"] + index - page["index"]
+    raise IndexError(index)
+
+# ---------- 시트 XML 패치 ----------
+def xml_escape(text):
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+def cell_xml(ref, attrs, value):
+    """기존 셀의 스타일 속성을 유지한 채 새 값을 담은 <c> 요소를 만듭니다."""
+    import re
+
+    attrs = re.sub(r'\s+t="[^"]*"', "", attrs)
+    if value is None or value == "":
+        return f"<c{attrs}/>"
+    if isinstance(value, bool):
+        return f'<c{attrs} t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f"<c{attrs}><v>{value!r}</v></c>"
+    text = str(value)
+    if text.startswith("="):
+        return f"<c{attrs}><f>{xml_escape(text[1:])}</f></c>"
+    return f'<c{attrs} t="inlineStr"><is><t xml:space="preserve">{xml_escape(text)}</t></is></c>'
+
+class CellStyles:
+    """styles.xml 의 cellXfs 에서 숫자 형식만 다른 스타일을 찾거나 추가합니다."""
+
+    BUILTIN_FORMATS = {"General": 0, "0": 1, "0.00": 2, "#,##0": 3, "#,##0.00": 4}
+
+    def __init__(self, xml):
+        import re
+
+        self.xml = xml
+        self.changed = False
+        block = re.search(r"<cellXfs\b[^>]*>(.*?)</cellXfs>", xml, re.S)
+        self.xfs = re.findall(r"<xf\b[^>]*?(?:/>|>.*?</xf>)", block.group(1), re.S) if block else []
+        self.num_fmts = {int(i): code for i, code in re.findall(r'<numFmt\b[^>]*numFmtId="(\d+)"[^>]*formatCode="([^"]*)"', xml)}
+
+    def format_id(self, code):
+        from xml.sax.saxutils import escape, unescape
+
+        if code in self.BUILTIN_FORMATS:
+            return self.BUILTIN_FORMATS[code]
+        for i, existing in self.num_fmts.items():
+            if unescape(existing, {"&quot;": '"'}) == code:
+                return i
+        i = max([163, *self.num_fmts]) + 1
+        self.num_fmts[i] = escape(code, {'"': "&quot;"})
+        self.changed = True
+        return i
+
+    def with_format(self, style_id, code):
+        """style_id 와 같고 숫자 형식만 code 인 스타일 번호"""
+        import re
+
+        if style_id >= len(self.xfs):
+            return style_id
+        fmt_id = self.format_id(code)
+        xf = self.xfs[style_id]
+        current = re.search(r'\snumFmtId="(\d+)"', xf)
+        if int(current.group(1) if current else 0) == fmt_id:
+            return style_id
+        head = re.match(r"<xf\b[^>]*?(?=/?>)", xf).group(0)
+        new_head = re.sub(r'\s(?:numFmtId|applyNumberFormat)="[^"]*"', "", head)
+        new_xf = f'{new_head} numFmtId="{fmt_id}" applyNumberFormat="1"' + xf[len(head):]
+        if new_xf in self.xfs:
+            return self.xfs.index(new_xf)
+        self.xfs.append(new_xf)
+        self.changed = True
+        return len(self.xfs) - 1
+
+    def to_xml(self):
+        """변경을 반영한 styles.xml"""
+        import re
+
+        xml = re.sub(r"<cellXfs\b[^>]*>.*?</cellXfs>",
+                     lambda m: f'<cellXfs count="{len(self.xfs)}">{"".join(self.xfs)}</cellXfs>', self.xml, flags=re.S)
+        custom = "".join(f'<numFmt numFmtId="{i}" formatCode="{code}"/>' for i, code in sorted(self.num_fmts.items()))
+        num_fmts = f'<numFmts count="{len(self.num_fmts)}">{custom}</numFmts>' if self.num_fmts else ""
+        if re.search(r"<numFmts\b", xml):
+            return re.sub(r"<numFmts\b[^>]*?(?:/>|>.*?</numFmts>)", lambda m: num_fmts, xml, flags=re.S)
+        return re.sub(r"(<styleSheet\b[^>]*>)", lambda m: m.group(1) + num_fmts, xml, count=1)
+
+def patch_sheet_xml(xml, cell_values, cell_formats=None, styles=None):
+    """{(행, 열): 값} 을 시트 XML 에 반영합니다. 대상 셀이 XML 에 없으면 None.
+
+    cell_formats({(행, 열): 숫자 형식}) 와 styles(CellStyles) 를 주면 해당 셀의 스타일을
+    같은 스타일에 숫자 형식만 바꾼 것으로 교체합니다.
+    """
+    import re
+    from openpyxl.utils import get_column_letter
+
+    targets = {f"{get_column_letter(c)}{r}": v for (r, c), v in cell_values.items()}
+    formats = {f"{get_column_letter(c)}{r}": v for (r, c), v in (cell_formats or {}).items()}
+    rows = {r for r, _ in cell_values}
+    found = set()
+
+    def patch_cell(m):
+        ref = re.search(r'\br="([A-Z]+\d+)"', m.group(1)).group(1)
+        if ref not in targets:
+            return m.group(0)
+        found.add(ref)
+        attrs = m.group(1)
+        if ref in formats and styles is not None:
+            style = re.search(r'\ss="(\d+)"', attrs)
+            style_id = styles.with_format(int(style.group(1)) if style else 0, formats[ref])
+            attrs = re.sub(r'\ss="\d+"', "", attrs) + (f' s="{style_id}"' if style_id else "")
+        return cell_xml(ref, attrs, targets[ref])
+
+    def patch_row(m):
+        if int(re.search(r'\br="(\d+)"', m.group(1)).group(1)) not in rows:
+            return m.group(0)
+        return re.sub(r"<c\b([^>]*?)(?:/>|>.*?</c>)", patch_cell, m.group(0), flags=re.S)
+
+    patched = re.sub(r"<row\b([^>]*?)(?:/>|>.*?</row>)", patch_row, xml, flags=re.S)
+    return patched if len(found) == len(targets) else None
+
+def rewrite_zip(src_bytes, output_path, replacements):
+    """replacements({멤버 경로: 새 내용}) 를 반영한 새 xlsx 를 원자적으로 저장하고 그 bytes 를 반환합니다."""
+    import io
+    import zipfile
+    from invoice_api import write_output
+
+    out = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(src_bytes)) as zin, \
+            zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED) as zout:
+        for info in zin.infolist():
+            data = replacements.get(info.filename)
+            zout.writestr(info, zin.read(info) if data is None else data)
+    data = out.getvalue()
+    write_output(output_path, data)  # 고유 임시 파일 → os.replace (동시 패치끼리 충돌하지 않음)
+    return data
+
+# ---------- 증분 패치 ----------
+def patch_rendered_invoice(previous_output, output_path, payload=None, changes=None, item_key="id",
+                           pagination=None, template_sha256=None, plan=None):
+    """바뀐 항목 행만 고쳐 output_path 에 저장합니다. 부분 갱신이 불가능하면 None.
+
+    changes 는 payload 가 있으면 payload["items"] 에, 없으면 레이아웃에 기록된 항목에 병합합니다
+    (전체 렌더링으로 넘어갈 때와 같은 기준).
+    pagination/template_sha256/plan 을 주면 레이아웃에 기록된 값과 비교해 하나라도 다르면 None
+    (None 이면 이전 렌더링과 같은 것으로 봅니다).
+    """
+    import io
+    import zipfile
+    from invoice_template_renderer import item_number_format, replace_item_placeholders, items_total_amount
+
+    meta = read_output_layout(previous_output)
+    if meta is None or meta["item_key"] != item_key or meta["layout"] is None:
+        return None
+    with open(previous_output, "rb") as f:
+        data = f.read()
+    if sha256_bytes(data) != meta["output_sha256"]:
+        logger().info("  이전 출력이 레이아웃 기록 이후 변경되었습니다.")
+        return None
+    if pagination is not None and pagination_settings(pagination) != pagination_settings(meta["pagination"]):
+        logger().info("  페이지 설정이 바뀌었습니다.")
+        return None
+    if template_sha256 is not None and template_sha256 != meta["template_sha256"]:
+        logger().info("  템플릿이 바뀌었습니다.")
+        return None
+    if plan is not None and plan_digest(plan) != plan_digest(meta["plan"]):
+        logger().info("  렌더 계획이 바뀌었습니다.")
+        return None
+    if payload is not None and header_digest(payload) != meta["header_digest"]:
+        logger().info("  헤더 값이 바뀌었습니다.")
+        return None
+
+    old_items = meta["items"]
+    if changes is not None:
+        base = payload.get("items", []) if payload is not None else old_items
+        new_items = merge_changes(base, changes, item_key)
+    elif payload is not None:
+        new_items = payload.get("items", [])
+    else:
+        return None
+    changed = changed_indexes(old_items, new_items, item_key)
+    if changed is None:
+        logger().info("  항목이 추가/삭제/재정렬되었습니다.")
+        return None
+
+    # 1) 바뀐 항목 행의 값 셀
+    block = meta["plan"]["items"]
+    value_cells = [spec for spec in block["cells"] if "formula" not in spec]
+    per_sheet, formats = {}, {}
+    for i in changed:
+        sheet, row = locate_item(meta["layout"], i)
+        cells = per_sheet.setdefault(sheet, {})
+        for spec in value_cells:
+            if "key" in spec:
+                value = new_items[i].get(spec["key"], "")
+                cells[(row, spec["col"])] = value
+                if "number_format" in spec:
+                    # 값의 종류(문자↔숫자)가 바뀌어도 템플릿 항목 행과 같은 숫자 형식이 되도록
+                    fmt = item_number_format(spec["number_format"], value)
+                    formats.setdefault(sheet, {})[(row, spec["col"])] = fmt
+            else:
+                cells[(row, spec["col"])] = replace_item_placeholders(spec["text"], new_items[i])
+
+    # 2) 합계 열 수식이 없으면 값으로 들어간 총합계/이월 금액도 갱신
+    if changed and not block["total_col"]:
+        for sheet, row, col in meta["total_cells"]:
+            per_sheet.setdefault(sheet, {})[(row, col)] = items_total_amount(new_items)
+        label = (meta["pagination"] or {}).get("carry_label", "이월")
+        pages = meta["layout"]["pages"]
+        for p, page in enumerate(pages):
+            cells = per_sheet.setdefault(page["sheet"], {})
+            if page["carry_in"]:
+                carried = items_total_amount(new_items[:page["index"]])
+                cells[(page["carry_in"], 1)] = f"{label} : {carried:,}"
+            if page["carry_out"]:
+                running = items_total_amount(new_items[:page["index"] + page["count"]])
+                cells[(page["carry_out"], 1)] = f"{label} : {running:,}"
+
+    # 3) 시트 XML 패치 후 zip 재작성
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        members = sheet_members(zf)
+        styles = CellStyles(zf.read("xl/styles.xml").decode("utf-8")) if formats else None
+        replacements = {}
+        for sheet, cells in per_sheet.items():
+            member = members[meta["sheets"][sheet]]
+            patched = patch_sheet_xml(zf.read(member).decode("utf-8"), cells, formats.get(sheet), styles)
+            if patched is None:
+                logger().info(f"  {meta['sheets'][sheet]} 시트에서 대상 셀을 찾지 못했습니다.")
+                return None
+            replacements[member] = patched.encode("utf-8")
+        if styles is not None and styles.changed:
+            replacements["xl/styles.xml"] = styles.to_xml().encode("utf-8")
+
+    if replacements or previous_output != output_path:
+        data = rewrite_zip(data, output_path, replacements)
+    logger().info(f"증분 갱신: 항목 {len(changed)}개 행 패치 → {output_path}")
+
+    # xlsx 를 저장한 뒤 사이드카를 원자적으로 교체 (중간에 실패하면 해시 불일치로 전체 렌더링)
+    meta["output_sha256"] = sha256_bytes(data)
+    meta["items"] = new_items
+    write_layout(output_path, meta)
+
+    return {"success": True, "output_path": str(output_path), "patched_items": len(changed)}
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+청구서 payload 검증
+템플릿을 열기 전에 헤더 값과 모든 항목 열을 한 번에 검사하고, 숫자 열(qty, unit_price)은
+"1,200" / "3,000원" 같은 문자열을 숫자로 변환합니다. 오류는 첫 번째에서 멈추지 않고
+항목 위치(items[3].qty 등)와 함께 모두 모아 PayloadError.errors 로 돌려주므로,
+배치 작업은 렌더링 비용을 치르기 전에 잘못된 작업을 한꺼번에 걸러낼 수 있습니다.
+
+검사 내용:
+  - payload 는 객체, items 는 객체 배열
+  - 항목 값은 문자열/숫자/None 만 허용 (셀에 쓸 수 없는 객체·배열·제어 문자 거부)
+  - qty, unit_price 는 숫자로 변환 가능해야 함 (빈 값은 항목에서 제외, 참/거짓·NaN 거부)
+  - images 값은 data URL 또는 Base64 (파일 경로는 INVOICE_ASSET_ROOT 아래의 파일만).
+    HTML→PDF 작업의 images 는 validate_images 로 같은 기준을 적용
+  - 고정 레이아웃 엔진(engine="fixed")은 header 객체와 client/project/site_addr/issued_at 필요
+  - pagination 을 넘기면 페이지 나눔 설정도 같은 오류 목록에 포함 (1 이상의 정수 등)
+  - 증분 갱신 변경 목록(validate_changes)은 항목 키가 필요하고 {"_deleted": true} 를 허용
+
+사용 예:
+  python invoice_schema.py --data payload.json
+  python invoice_schema.py --data payloads.jsonl --engine plan --pagination '{"page_rows": 30}'
+"""
+
+import sys
+import json
+
+# 셀 값으로 쓸 수 없는 제어 문자 (openpyxl ILLEGAL_CHARACTERS_RE 와 같은 범위)
+ILLEGAL_CHARACTERS = r"[\000-\010]|[\013-\014]|[\016-\037]"
+NUMBER_FIELDS = ("qty", "unit_price")
+FIXED_HEADER_FIELDS = ("client", "project", "site_addr", "issued_at")
+MAX_MESSAGE_ERRORS = 5
+
+def describe(value, limit=40):
+    text = repr(value)
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+def add_error(errors, path, message, index=None):
+    errors.append({"path": path, "index": index, "error": message})
+
+def scalar_error(value, illegal):
+    """셀에 쓸 수 없는 값이면 오류 메시지, 아니면 None"""
+    if value is None or isinstance(value, (int, float)) and not isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        return "셀에 쓸 수 없는 제어 문자가 있습니다" if illegal.search(value) else None
+    return f"문자열 또는 숫자여야 합니다: {type(value).__name__}"
+
+def check_items(items, errors, illegal, name="items", flags=(), item_key=None):
+    """항목 목록을 열 단위로 검사하고 숫자 열을 변환한 새 목록을 반환합니다.
+
+    flags: 참/거짓 값을 허용할 열 (변경 목록의 _deleted 등)
+    item_key: 모든 항목에 있어야 하는 키 (변경 목록의 항목 식별 키)
+    """
+    import math
+    from xlsx_import import coerce_number
+
+    rows = []
+    for i, item in enumerate(items):
+        if isinstance(item, dict):
+            rows.append((i, dict(item)))
+        else:
+            add_error(errors, f"{name}[{i}]", f"항목은 객체여야 합니다: {type(item).__name__}", i)
+
+    # 숫자 열: 열마다 전체 항목을 한 번에 변환 (같은 문자열은 parse_number 캐시 재사용)
+    for field in NUMBER_FIELDS:
+        for i, item in rows:
+            if field not in item:
+                continue
+            value = item[field]
+            if isinstance(value, bool) or not isinstance(value, (str, int, float, type(None))):
+                add_error(errors, f"{name}[{i}].{field}", f"숫자가 아닙니다: {describe(value)}", i)
+                continue
+            try:
+                number = coerce_number(value)
+            except (ValueError, TypeError):
+                add_error(errors, f"{name}[{i}].{field}", f"숫자로 변환할 수 없습니다: {describe(value)}", i)
+                continue
+            if number is None:
+                del item[field]
+            elif isinstance(number, float) and not math.isfinite(number):
+                add_error(errors, f"{name}[{i}].{field}", f"유한한 숫자가 아닙니다: {value!r}", i)
+            else:
+                item[field] = number
+
+    # 나머지 열: 셀에 그대로 쓸 수 있는 값인지
+    for i, item in rows:
+        if item_key is not None and item.get(item_key) is None:
+            add_error(errors, f"{name}[{i}].{item_key}", "항목 키가 필요합니다", i)
+        for key, value in item.items():
+            if key in NUMBER_FIELDS or key in flags and isinstance(value, bool):
+                continue
+            message = scalar_error(value, illegal)
+            if message:
+                add_error(errors, f"{name}[{i}].{key}", message, i)
+    return [item for _, item in rows]
+
+def check_header(header, path, errors, illegal, required=()):
+    """헤더 값 검사: 문자열의 제어 문자는 항상, 형식은 필수 필드만 검사합니다."""
+    for key in required:
+        if key not in header:
+            add_error(errors, f"{path}{key}", "값이 필요합니다")
+    for key, value in header.items():
+        if isinstance(value, str) or key in required:
+            message = scalar_error(value, illegal)
+            if message:
+                add_error(errors, f"{path}{key}", message)
+
+def check_images(images, errors):
+    """images({키: 원본}) 검사: 원본마다 image_cache.source_error 기준을 적용합니다."""
+    if images is None:
+        return
+    if not isinstance(images, dict):
+        add_error(errors, "images", f"객체여야 합니다: {type(images).__name__}")
+        return
+    from image_cache import source_error
+
+    for key, source in images.items():
+        message = source_error(source)
+        if message:
+            add_error(errors, f"images.{key}", message)
+
+def payload_errors(payload, engine="plan", pagination=None):
+    """(정규화된 payload 또는 None, 오류 목록). 원본 payload 는 바꾸지 않습니다.
+
+    engine: "plan" (플레이스홀더 템플릿) 또는 "fixed" (고정 레이아웃, payload.header 필요)
+    pagination: 함께 검사할 페이지 나눔 설정 (render_invoice 와 같은 형식)
+    """
+    import re
+    from invoice_template_renderer import pagination_errors
+
+    errors = pagination_errors(pagination)
+    if not isinstance(payload, dict):
+        add_error(errors, "payload", f"객체(dict)여야 합니다: {type(payload).__name__}")
+        return None, errors
+    illegal = re.compile(ILLEGAL_CHARACTERS)
+    normalized = dict(payload)
+
+    items = payload.get("items", [])
+    if isinstance(items, list):
+        normalized["items"] = check_items(items, errors, illegal)
+    else:
+        add_error(errors, "items", f"배열이어야 합니다: {type(items).__name__}")
+
+    check_images(payload.get("images"), errors)
+
+    if engine == "fixed":
+        header = payload.get("header")
+        if isinstance(header, dict):
+            check_header(header, "header.", errors, illegal, FIXED_HEADER_FIELDS)
+        else:
+            add_error(errors, "header", "객체가 필요합니다")
+    else:
+        top = {k: v for k, v in payload.items() if k not in ("items", "images")}
+        check_header(top, "", errors, illegal)
+        for key, value in top.items():
+            if isinstance(value, dict):
+                check_header(value, f"{key}.", errors, illegal)
+
+    errors.sort(key=lambda e: -1 if e["index"] is None else e["index"])  # 헤더 오류 먼저, 이후 항목 순서
+    return (None if errors else normalized), errors
+
+def changes_errors(changes, item_key):
+    """증분 갱신 변경 목록의 (정규화된 목록 또는 None, 오류 목록)"""
+    import re
+
+    errors = []
+    if not isinstance(changes, list):
+        add_error(errors, "changes", f"배열이어야 합니다: {type(changes).__name__}")
+        return None, errors
+    normalized = check_items(changes, errors, re.compile(ILLEGAL_CHARACTERS), "changes", ("_deleted",), item_key)
+    errors.sort(key=lambda e: -1 if e["index"] is None else e["index"])
+    return (None if errors else normalized), errors
+
+def raise_errors(what, errors):
+    from invoice_api import PayloadError
+
+    shown = "; ".join(f"{e['path']}: {e['error']}" for e in errors[:MAX_MESSAGE_ERRORS])
+    more = f" 외 {len(errors) - MAX_MESSAGE_ERRORS}건" if len(errors) > MAX_MESSAGE_ERRORS else ""
+    raise PayloadError(f"{what} 검증 실패 ({len(errors)}건): {shown}{more}", errors)
+
+def validate_payload(payload, engine="plan", pagination=None):
+    """검증·정규화된 payload 를 반환합니다. 오류가 있으면 전체 목록을 담은 PayloadError."""
+    normalized, errors = payload_errors(payload, engine, pagination)
+    if errors:
+        raise_errors("payload", errors)
+    return normalized
+
+def validate_images(images):
+    """HTML→PDF 작업의 images 를 검증합니다. 오류가 있으면 전체 목록을 담은 PayloadError."""
+    errors = []
+    check_images(images, errors)
+    if errors:
+        raise_errors("images", errors)
+    return images
+
+def validate_changes(changes, item_key):
+    """검증·정규화된 변경 목록. 항목마다 item_key 가 필요하며 {"_deleted": true} 를 허용합니다."""
+    normalized, errors = changes_errors(changes, item_key)
+    if errors:
+        raise_errors("changes", errors)
+    return normalized
+
+def iter_documents(path):
+    """JSON 파일이면 payload 하나, JSONL 이면 줄마다 payload (줄 번호, payload 또는 파싱 오류)"""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    try:
+        yield 1, json.loads(text)
+        return
+    except json.JSONDecodeError:
+        pass
+    for line_no, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, e
+
+def main():
+    """메인 함수 - 명령줄 인자 처리"""
+    import os
+    import argparse
+
+    parser = argparse.ArgumentParser(description='청구서 payload 일괄 검증 (JSON / JSONL)')
+    parser.add_argument('--data', required=True, help='payload JSON 또는 JSONL 파일 경로')
+    parser.add_argument('--engine', choices=('plan', 'fixed'), default='plan',
+                        help='plan: 플레이스홀더 템플릿, fixed: 고정 레이아웃 (payload.header)')
+    parser.add_argument('--pagination', help='함께 검사할 페이지 나눔 설정 JSON')
+    args = parser.parse_args()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    if script_dir not in sys.path:
+        sys.path.insert(0, script_dir)
+
+    try:
+        pagination = json.loads(args.pagination) if args.pagination else None
+        total, invalid = 0, []
+        for line_no, payload in iter_documents(args.data):
+            total += 1
+            if isinstance(payload, json.JSONDecodeError):
+                invalid.append({"line": line_no, "errors": [{"path": "payload", "index": None, "error": f"JSON 파싱 오류: {payload}"}]})
+                continue
+            _, errors = payload_errors(payload, args.engine, pagination)
+            if errors:
+                invalid.append({"line": line_no, "errors": errors})
+        result = {"success": not invalid, "payloads": total, "invalid": len(invalid), "details": invalid}
+    except (OSError, json.JSONDecodeError) as e:
+        result = {"success": False, "error": str(e)}
+
+    print(json.dumps(result, ensure_ascii=False))
+    return 0 if result["success"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,18 +3,47 @@
 """
 청구서 템플릿 렌더러
 openpyxl을 사용하여 플레이스홀더 기반 템플릿을 렌더링합니다.
+
+렌더링은 '렌더 계획(plan)'을 따라 진행됩니다. 계획에는 플레이스홀더 셀 위치,
+{#items} 반복 블록, 템플릿 행의 병합/높이/항목 셀, 총합계 셀과 합계 열이 담깁니다.
+템플릿 옆에 `<템플릿>.plan.json` 사이드카(build_template.py 가 생성)가 있으면
+그대로 사용하고, 없으면 템플릿을 한 번 스캔하여 계획을 만듭니다.
+
+`{IMAGE:stamp}` / `{IMAGE:stamp:120x120}` 셀에는 payload["images"]["stamp"]
+(data URL, Base64, INVOICE_ASSET_ROOT 아래의 파일 경로) 이미지를 해당 셀에 고정해 넣습니다.
+
+렌더링 자체는 invoice_api(render/compile_template)가 담당하며, render_invoice 는
+파일 저장·증분 갱신·결과 dict 변환을 맡는 어댑터입니다.
 """
 
+import os
 import sys
 import json
-import argparse
 from copy import copy
-from pathlib import Path
-import re
-import openpyxl
-from openpyxl.styles import Alignment, Font
+
+# openpyxl, re, argparse 는 실제로 필요한 함수 안에서 지연 임포트합니다.
+# (인자 검증 실패나 예시 출력 경로에서 무거운 임포트 비용을 치르지 않도록)
+
+PLAN_VERSION = 4
+PLAN_SUFFIX = ".plan.json"
+TOTAL_SUM = "{TOTAL_SUM}"
+ITEM_PLACEHOLDER = r"\{item\.([^{}]+)\}"
+IMAGE_PLACEHOLDER = r"\{IMAGE:([^{}:]+)(?::(\d+)x(\d+))?\}"
+
+# 진행/경고 메시지는 logging 으로 남깁니다. CLI 는 main 에서 stderr 로 출력하도록 설정합니다.
+def logger():
+    """이 모듈의 로거 (첫 메시지를 남길 때 logging 임포트)"""
+    import logging
+    return logging.getLogger(__name__)
 
 # ---------- 유틸 함수 ----------
+def load_json_arg(value):
+    """JSON 인자 해석 (파일 경로 또는 JSON 문자열)"""
+    if os.path.exists(value):
+        with open(value, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return json.loads(value)
+
 def get_value_by_path(data, path_str):
     """점표기 경로(header.client 등) 해석"""
     cur = data
@@ -27,20 +56,21 @@ def get_value_by_path(data, path_str):
 
 def replace_placeholders_in_text(text, payload):
     """문자열 안의 {…} 패턴들을 payload 값으로 부분 치환"""
+    import re
     def repl(m):
         key = m.group(1).strip()
         val = get_value_by_path(payload, key)
         return "" if val is None else str(val)
     return re.sub(r"\{([^{}]+)\}", repl, text)
 
+def replace_item_placeholders(text, item):
+    """문자열 안의 {item.키} 패턴들을 항목 값으로 부분 치환"""
+    import re
+    return re.sub(ITEM_PLACEHOLDER, lambda m: str(item.get(m.group(1).strip(), "")), text)
+
 def clone_cell_style(src, dst):
     """셀 스타일을 복제합니다."""
-    dst.font = copy(src.font)
-    dst.fill = copy(src.fill)
-    dst.number_format = copy(src.number_format)
-    dst.protection = copy(src.protection)
-    dst.alignment = copy(src.alignment)
-    dst.border = copy(src.border)
+    dst._style = copy(src._style)
 
 def horizontal_merges_for_row(ws, row):
     """해당 행의 수평 병합 범위를 반환합니다."""
@@ -51,183 +81,621 @@ def horizontal_merges_for_row(ws, row):
     merges.sort()
     return merges
 
+def add_merged_ranges(ws, bounds):
+    """(min_row, min_col, max_row, max_col) 병합 범위들을 한 번에 등록합니다.
+
+    ws.merge_cells 는 기존 병합 전체와 겹침 검사를 하고 가장자리 셀 테두리를
+    다시 만들기 때문에 항목 수에 대해 제곱으로 느려집니다. 여기서는 셀 스타일을
+    템플릿에서 그대로 복제하므로 범위만 등록합니다.
+    """
+    from openpyxl.utils import get_column_letter
+    from openpyxl.worksheet.merge import MergedCellRange
+
+    ranges = ws.merged_cells.ranges
+    add = ranges.add if isinstance(ranges, set) else ranges.append
+    for r1, c1, r2, c2 in bounds:
+        if (r1, c1) != (r2, c2):
+            add(MergedCellRange(ws, f"{get_column_letter(c1)}{r1}:{get_column_letter(c2)}{r2}"))
+
 def apply_horizontal_merges(ws, merges, target_row):
     """수평 병합 범위를 target_row에 적용합니다."""
-    for c1, c2 in merges:
-        if c1 < c2:
-            ws.merge_cells(start_row=target_row, start_column=c1, end_row=target_row, end_column=c2)
+    add_merged_ranges(ws, [(target_row, c1, target_row, c2) for c1, c2 in merges])
+
+def file_sha256(data):
+    """템플릿 바이트의 SHA-256 (사이드카 계획과 템플릿 일치 확인용)"""
+    import hashlib
+    return hashlib.sha256(data).hexdigest()
+
+# ---------- 렌더 계획 ----------
+def plan_path_for(template_path):
+    """템플릿에 대응하는 렌더 계획 사이드카 경로"""
+    return f"{template_path}{PLAN_SUFFIX}"
+
+def compile_render_plan(ws):
+    """템플릿 시트를 한 번 스캔하여 렌더 계획(JSON 직렬화 가능한 dict)을 만듭니다."""
+    import re
+
+    placeholders, total_cells, images = [], [], []
+    start_row = end_row = None
+    for row in ws.iter_rows():
+        for cell in row:
+            value = cell.value
+            if not isinstance(value, str) or "{" not in value or "}" not in value:
+                continue
+            if "{#items}" in value:
+                if start_row is None:
+                    start_row = cell.row
+            elif "{/items}" in value:
+                if end_row is None:
+                    end_row = cell.row
+            elif value.strip() == TOTAL_SUM:
+                total_cells.append([cell.row, cell.column])
+            elif value.strip().startswith("{IMAGE:"):
+                m = re.fullmatch(IMAGE_PLACEHOLDER, value.strip())
+                if m:
+                    width, height = (int(m.group(2)), int(m.group(3))) if m.group(2) else (None, None)
+                    images.append([cell.row, cell.column, m.group(1).strip(), width, height])
+            elif "{item." not in value:
+                placeholders.append([cell.row, cell.column])
+
+    plan = {
+        "version": PLAN_VERSION,
+        "sheet": ws.title,
+        "max_row": ws.max_row,
+        "max_column": ws.max_column,
+        "placeholders": placeholders,
+        "total_cells": total_cells,
+        "images": images,
+        "items": None,
+    }
+    if start_row is None or end_row is None or end_row <= start_row + 1:
+        return plan
+
+    template_row = start_row + 1
+    cells = []
+    for c in range(1, ws.max_column + 1):
+        cell = ws.cell(row=template_row, column=c)
+        value = cell.value
+        if not isinstance(value, str):
+            continue
+        if value.startswith("="):
+            cells.append({"col": c, "formula": value})
+        elif "{item." in value:
+            m = re.fullmatch(ITEM_PLACEHOLDER, value.strip())
+            # number_format: 증분 패치에서 값 형식(텍스트↔숫자)이 바뀐 셀의 형식을 다시 정할 때 사용
+            cells.append({"col": c, "key": m.group(1).strip(), "number_format": cell.number_format}
+                         if m else {"col": c, "text": value})
+
+    footer_merges = sorted(
+        [rng.min_row, rng.min_col, rng.max_row, rng.max_col]
+        for rng in ws.merged_cells.ranges if rng.min_row > end_row
+    )
+    footer_heights = [
+        [r, ws.row_dimensions[r].height]
+        for r in range(end_row + 1, ws.max_row + 1)
+        if r in ws.row_dimensions and ws.row_dimensions[r].height
+    ]
+    plan["items"] = {
+        "start_row": start_row,
+        "template_row": template_row,
+        # 인쇄 시 반복할 열 머리글 행 (블록 바로 위 행)
+        "header_row": start_row - 1 if start_row > 1 else None,
+        "end_row": end_row,
+        "height": ws.row_dimensions[template_row].height,
+        "merges": [list(m) for m in horizontal_merges_for_row(ws, template_row)],
+        "cells": cells,
+        # 합계 열: 템플릿 행에서 수식이 들어 있는 첫 열
+        "total_col": next((cell["col"] for cell in cells if "formula" in cell), None),
+        "footer_merges": footer_merges,
+        "footer_heights": footer_heights,
+    }
+    return plan
+
+def plan_errors(plan):
+    """렌더 계획 형식 오류 목록 (apply_render_plan 이 읽는 키와 값 형태). 문제 없으면 빈 목록."""
+    def is_int(v):
+        return isinstance(v, int) and not isinstance(v, bool)
+
+    def int_rows(v, width):
+        return isinstance(v, list) and all(isinstance(x, list) and len(x) == width and all(map(is_int, x)) for x in v)
+
+    if not isinstance(plan, dict):
+        return [f"렌더 계획은 객체여야 합니다: {type(plan).__name__}"]
+    errors = []
+    if not isinstance(plan.get("sheet"), str):
+        errors.append("sheet 가 필요합니다")
+    for key in ("max_row", "max_column"):
+        if not is_int(plan.get(key)):
+            errors.append(f"{key} 는 정수여야 합니다")
+    for key in ("placeholders", "total_cells"):
+        if not int_rows(plan.get(key), 2):
+            errors.append(f"{key} 는 [행, 열] 목록이어야 합니다")
+    images = plan.get("images", [])
+    if not isinstance(images, list) or not all(isinstance(x, list) and len(x) == 5 for x in images):
+        errors.append("images 는 [행, 열, 키, 너비, 높이] 목록이어야 합니다")
+    if "items" not in plan:
+        errors.append("items 가 필요합니다 (반복 블록이 없으면 null)")
+    block = plan.get("items")
+    if block is None:
+        return errors
+    if not isinstance(block, dict):
+        return errors + ["items 는 객체 또는 null 이어야 합니다"]
+    for key in ("start_row", "template_row", "end_row"):
+        if not is_int(block.get(key)):
+            errors.append(f"items.{key} 는 정수여야 합니다")
+    for key in ("header_row", "total_col"):
+        if key not in block or block[key] is not None and not is_int(block[key]):
+            errors.append(f"items.{key} 는 정수 또는 null 이어야 합니다")
+    if "height" not in block or block["height"] is not None and not isinstance(block["height"], (int, float)):
+        errors.append("items.height 는 숫자 또는 null 이어야 합니다")
+    if not int_rows(block.get("merges"), 2):
+        errors.append("items.merges 는 [시작 열, 끝 열] 목록이어야 합니다")
+    if not int_rows(block.get("footer_merges"), 4):
+        errors.append("items.footer_merges 는 [행, 열, 행, 열] 목록이어야 합니다")
+    heights = block.get("footer_heights")
+    if not isinstance(heights, list) or not all(isinstance(x, list) and len(x) == 2 and is_int(x[0]) for x in heights):
+        errors.append("items.footer_heights 는 [행, 높이] 목록이어야 합니다")
+    cells = block.get("cells")
+    if not isinstance(cells, list) or not all(
+        isinstance(x, dict) and is_int(x.get("col")) and len({"key", "text", "formula"} & x.keys()) == 1 for x in cells
+    ):
+        errors.append("items.cells 는 {col, key|text|formula} 목록이어야 합니다")
+    return errors
+
+def load_render_plan(template_path, template_bytes):
+    """사이드카 렌더 계획을 읽습니다. 없거나 템플릿과 맞지 않으면 None."""
+    path = plan_path_for(template_path)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        plan = json.load(f)
+    if plan.get("version") != PLAN_VERSION or plan.get("template_sha256") != file_sha256(template_bytes):
+        logger().warning(f"  렌더 계획이 템플릿과 일치하지 않아 무시합니다: {path}")
+        return None
+    return plan
+
+def write_render_plan(template_path, plan=None):
+    """템플릿의 렌더 계획을 사이드카 파일로 저장하고 경로를 반환합니다."""
+    import openpyxl
+    from io import BytesIO
+
+    with open(template_path, "rb") as f:
+        data = f.read()
+    if plan is None:
+        wb = openpyxl.load_workbook(BytesIO(data))
+        plan = compile_render_plan(wb[wb.sheetnames[0]])
+    plan = {**plan, "template_sha256": file_sha256(data)}
+    path = plan_path_for(template_path)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(plan, f, ensure_ascii=False, indent=2)
+    return path
+
+# ---------- 계획 적용 ----------
+def items_total_amount(items):
+    """수식을 쓸 수 없을 때의 총합계 직접 계산"""
+    return sum(item.get('qty', 0) * item.get('unit_price', 0) for item in items)
+
+def write_total_cell(cell, value):
+    """총합계 셀에 값/수식을 쓰고 굵게, 천단위 형식을 적용합니다."""
+    font = copy(cell.font)
+    font.bold = True
+    cell.value = value
+    cell.font = font
+    cell.number_format = "#,##0"
+
+def sheet_ref(title):
+    """다른 시트 셀 참조용 접두사 ('시트 이름'!)"""
+    return "'" + title.replace("'", "''") + "'!"
+
+def copy_template_row(ws, r, tmpl_cells, block):
+    """템플릿 행의 값/스타일/병합/높이를 r 행에 복제합니다."""
+    for c, value, style in tmpl_cells:
+        dst = ws.cell(row=r, column=c)
+        dst._style = copy(style)
+        dst.value = value
+    apply_horizontal_merges(ws, block["merges"], r)
+    if block["height"]:
+        ws.row_dimensions[r].height = block["height"]
+
+def item_number_format(template_format, value):
+    """항목 값 셀의 숫자 형식: General 셀의 숫자는 천단위 콤마 (렌더링·증분 갱신 공용)"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and template_format == "General":
+        return "#,##0"
+    return template_format
+
+def render_item_row(ws, r, item, tmpl_cells, block, translators):
+    """템플릿 행 정보로 항목 한 행을 작성합니다."""
+    copy_template_row(ws, r, tmpl_cells, block)
+
+    for spec in block["cells"]:
+        dst = ws.cell(row=r, column=spec["col"])
+        if "key" in spec:
+            value = item.get(spec["key"], "")
+            dst.value = value
+            # 숫자 셀에 천단위 콤마 형식 적용
+            number_format = item_number_format(dst.number_format, value)
+            if number_format != dst.number_format:
+                dst.number_format = number_format
+        elif "text" in spec:
+            dst.value = replace_item_placeholders(spec["text"], item)
+        else:
+            translator, col_letter = translators[spec["col"]]
+            dst.value = translator.translate_formula(f"{col_letter}{r}")
+
+def render_carry_row(ws, r, label, value, tmpl_cells, block):
+    """이월(carry-forward) 소계 행을 작성합니다. 값은 합계 열에, 합계 열이 없으면 라벨 뒤에 씁니다."""
+    copy_template_row(ws, r, tmpl_cells, block)
+    for c, _, _ in tmpl_cells:
+        ws.cell(row=r, column=c).value = None
+    total_col = block["total_col"]
+    if total_col:
+        ws.cell(row=r, column=1).value = label
+        write_total_cell(ws.cell(row=r, column=total_col), value)
+    else:
+        ws.cell(row=r, column=1).value = f"{label} : {value:,}"
+    label_cell = ws.cell(row=r, column=1)
+    font = copy(label_cell.font)
+    font.bold = True
+    label_cell.font = font
+
+def image_source(payload, key):
+    """이미지 원본 조회: payload["images"][key] 만 사용합니다.
+
+    invoice_schema 가 원본(파일 경로 허용 범위 등)을 검증하는 곳이 images 뿐이므로
+    다른 payload 값을 점표기 경로로 찾아 이미지로 읽지 않습니다.
+    """
+    return (payload.get("images") or {}).get(key)
+
+def place_image(ws, r, c, source, size):
+    """셀 (r, c) 에 이미지를 고정합니다. 디코딩/리사이즈 결과는 image_cache 에서 재사용합니다."""
+    from io import BytesIO
+    from openpyxl.drawing.image import Image
+    from openpyxl.utils import get_column_letter
+    from image_cache import prepare_image
+
+    ws.cell(row=r, column=c).value = None
+    if not source:
+        return
+    png, _ = prepare_image(source, size)
+    img = Image(BytesIO(png))
+    img.anchor = f"{get_column_letter(c)}{r}"
+    ws.add_image(img)
+
+# ---------- 페이지 배치 ----------
+PAGINATION_COUNTS = ("page_rows", "first_page_rows", "pages_per_sheet")
+
+def pagination_errors(pagination):
+    """페이지 나눔 설정 오류 목록 (payload 검증 오류와 같은 형식). 문제 없으면 빈 목록."""
+    if pagination is None:
+        return []
+    if not isinstance(pagination, dict):
+        return [{"path": "pagination", "index": None, "error": f"객체여야 합니다: {type(pagination).__name__}"}]
+    errors = []
+    for key in PAGINATION_COUNTS:
+        value = pagination.get(key)
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < 1):
+            errors.append({"path": f"pagination.{key}", "index": None, "error": f"1 이상의 정수여야 합니다: {value!r}"})
+    if not errors:
+        page_rows, first = pagination.get("page_rows"), pagination.get("first_page_rows")
+        if first is not None and page_rows is None:
+            errors.append({"path": "pagination.first_page_rows", "index": None, "error": "page_rows 없이 지정할 수 없습니다"})
+        elif first is not None and first > page_rows:
+            errors.append({"path": "pagination.first_page_rows", "index": None,
+                           "error": f"page_rows({page_rows}) 이하여야 합니다: {first}"})
+    label = pagination.get("carry_label")
+    if label is not None and not isinstance(label, str):
+        errors.append({"path": "pagination.carry_label", "index": None, "error": f"문자열이어야 합니다: {type(label).__name__}"})
+    return errors
+
+def compute_item_layout(n_items, start_row, page_rows=None, first_page_rows=None, pages_per_sheet=None):
+    """항목 행 배치를 렌더링 전에 계산합니다.
+
+    page_rows 가 없으면 모든 항목이 한 페이지에 연속 배치됩니다.
+    page_rows 가 있으면 페이지마다 항목을 page_rows 개씩(첫 페이지는 first_page_rows 개) 나누고,
+    마지막이 아닌 페이지 끝에는 누계 '이월' 행을, 다음 페이지 처음에는 그 값을 받는 '이월' 행을 둡니다.
+    pages_per_sheet 가 있으면 그 페이지 수마다 새 시트로 넘어갑니다.
+
+    반환: {"pages": [...], "sheets": [...]}
+      page  = {"sheet", "carry_in", "row", "index", "count", "carry_out"}  (carry_* 는 행 번호 또는 None)
+      sheet = {"breaks": [페이지 나눔 행], "next_row": 마지막 배치 행 다음 행}
+    """
+    errors = pagination_errors({"page_rows": page_rows, "first_page_rows": first_page_rows,
+                                "pages_per_sheet": pages_per_sheet})
+    if errors:
+        raise ValueError("; ".join(f"{e['path']}: {e['error']}" for e in errors))
+    if page_rows:
+        first = first_page_rows or page_rows
+        sizes = [min(first, n_items)]
+        remaining = n_items - sizes[0]
+        while remaining > 0:
+            sizes.append(min(page_rows, remaining))
+            remaining -= sizes[-1]
+    else:
+        sizes = [n_items]
+
+    pages, sheets = [], []
+    index = 0
+    for p, size in enumerate(sizes):
+        if p == 0 or (pages_per_sheet and p % pages_per_sheet == 0):
+            sheets.append({"breaks": [], "next_row": start_row})
+        sheet = sheets[-1]
+        cursor = sheet["next_row"]
+        last = p == len(sizes) - 1
+
+        page = {"sheet": len(sheets) - 1, "carry_in": None, "row": None,
+                "index": index, "count": size, "carry_out": None}
+        if p > 0:
+            page["carry_in"] = cursor
+            cursor += 1
+        page["row"] = cursor
+        cursor += size
+        if not last:
+            page["carry_out"] = cursor
+            if not (pages_per_sheet and (p + 1) % pages_per_sheet == 0):
+                sheet["breaks"].append(cursor)
+            cursor += 1
+
+        sheet["next_row"] = cursor
+        pages.append(page)
+        index += size
+    return {"pages": pages, "sheets": sheets}
+
+def cumulative_expr(page, letter, prefix=""):
+    """해당 페이지까지의 누계 수식 본문 (앞의 '=' 제외)"""
+    parts = []
+    if page["carry_in"]:
+        parts.append(f"{prefix}{letter}{page['carry_in']}")
+    if page["count"]:
+        first, last = page["row"], page["row"] + page["count"] - 1
+        parts.append(f"SUM({prefix}{letter}{first}:{prefix}{letter}{last})")
+    return "+".join(parts) or "0"
+
+# ---------- 계획 적용 ----------
+def apply_render_plan(ws, plan, payload, pagination=None):
+    """렌더 계획에 따라 시트에 payload 를 채웁니다.
+
+    반환: {"sheets": 추가된 시트까지 포함한 시트 목록, "layout": 항목 배치(반복 블록이 없으면 None),
+           "total_cells": 총합계를 쓴 [시트 번호, 행, 열] 목록}
+    """
+    from openpyxl.formula.translate import Translator
+    from openpyxl.utils import get_column_letter
+    from openpyxl.worksheet.pagebreak import Break
+
+    pagination = pagination or {}
+
+    # 1) 전역 플레이스홀더 치환 (계획에 기록된 셀만)
+    logger().info(f"1단계: 전역 플레이스홀더 치환 ({len(plan['placeholders'])}개 셀)...")
+    for r, c in plan["placeholders"]:
+        cell = ws.cell(row=r, column=c)
+        cell.value = replace_placeholders_in_text(cell.value, payload)
+
+    items = payload.get("items", [])
+    block = plan["items"]
+    if block is None:
+        logger().info("  반복 블록이 없습니다. 기본 렌더링 완료.")
+        for r, c in plan["total_cells"]:
+            write_total_cell(ws.cell(row=r, column=c), items_total_amount(items))
+        for r, c, key, width, height in plan.get("images", []):
+            place_image(ws, r, c, image_source(payload, key), (width, height) if width else None)
+        return {"sheets": [ws], "layout": None, "total_cells": [[0, r, c] for r, c in plan["total_cells"]]}
+
+    start_row, end_row = block["start_row"], block["end_row"]
+    max_row, max_col = plan["max_row"], plan["max_column"]
+    layout = compute_item_layout(
+        len(items), start_row,
+        page_rows=pagination.get("page_rows"),
+        first_page_rows=pagination.get("first_page_rows"),
+        pages_per_sheet=pagination.get("pages_per_sheet"),
+    )
+    pages = layout["pages"]
+    shift = layout["sheets"][-1]["next_row"] - (end_row + 1)  # 블록 아래 행들이 이동할 거리
+    logger().info(f"2단계: 항목 {len(items)}개, {len(pages)}페이지/{len(layout['sheets'])}시트, "
+          f"아래 영역 {shift:+d}행 이동")
+
+    # 2) 템플릿 행과 블록 아래(푸터) 셀을 보관한 뒤 블록 이하 영역을 비움
+    tmpl_cells = [
+        (c, cell.value, cell._style)
+        for c, cell in enumerate(ws[block["template_row"]][:max_col], start=1)
+    ]
+    footer = [
+        (cell.row, cell.column, cell.value, cell._style)
+        for row in ws.iter_rows(min_row=end_row + 1, max_row=max_row, max_col=max_col)
+        for cell in row
+        if cell.value is not None or cell.has_style
+    ]
+    for rng in list(ws.merged_cells.ranges):
+        if rng.max_row >= start_row:
+            ws.unmerge_cells(str(rng))
+    ws.delete_rows(start_row, max_row - start_row + 1)
+    for r in [r for r in ws.row_dimensions if r >= start_row]:
+        del ws.row_dimensions[r]
+
+    # 시트 넘김: 머리글만 남은 시트를 복제
+    sheets = [ws]
+    for k in range(1, len(layout["sheets"])):
+        copy_ws = ws.parent.copy_worksheet(ws)
+        copy_ws.title = f"{ws.title[:25]} ({k + 1})"
+        sheets.append(copy_ws)
+
+    # 3) 항목/이월 행 작성 (행 위치는 layout 에서 미리 정해짐)
+    logger().info("3단계: 항목 데이터 렌더링...")
+    translators = {
+        spec["col"]: (
+            Translator(spec["formula"], origin=f"{get_column_letter(spec['col'])}{block['template_row']}"),
+            get_column_letter(spec["col"]),
+        )
+        for spec in block["cells"] if "formula" in spec
+    }
+    total_col = block["total_col"]
+    letter = get_column_letter(total_col) if total_col else None
+    carry_label = pagination.get("carry_label", "이월")
+    running = 0
+    for p, page in enumerate(pages):
+        sheet = sheets[page["sheet"]]
+        page_items = items[page["index"]:page["index"] + page["count"]]
+        for k, item in enumerate(page_items):
+            render_item_row(sheet, page["row"] + k, item, tmpl_cells, block, translators)
+
+        carried = running
+        running += items_total_amount(page_items) if not letter else 0
+        if page["carry_in"]:
+            prev = pages[p - 1]
+            if letter:
+                prefix = sheet_ref(sheets[prev["sheet"]].title) if prev["sheet"] != page["sheet"] else ""
+                value = f"={prefix}{letter}{prev['carry_out']}"
+            else:
+                value = carried
+            render_carry_row(sheet, page["carry_in"], carry_label, value, tmpl_cells, block)
+        if page["carry_out"]:
+            value = f"={cumulative_expr(page, letter)}" if letter else running
+            render_carry_row(sheet, page["carry_out"], carry_label, value, tmpl_cells, block)
+
+    for sheet, part in zip(sheets, layout["sheets"]):
+        for r in part["breaks"]:
+            sheet.row_breaks.append(Break(id=r))
+        if pagination.get("page_rows") and block.get("header_row"):
+            sheet.print_title_rows = f"{block['header_row']}:{block['header_row']}"
+
+    # 4) 푸터 재배치 (마지막 시트)
+    logger().info("4단계: 합계/푸터 영역 재배치...")
+    last_ws = sheets[-1]
+    for r, c, value, style in footer:
+        dst = last_ws.cell(row=r + shift, column=c)
+        dst._style = copy(style)
+        dst.value = value
+    add_merged_ranges(last_ws, [(r1 + shift, c1, r2 + shift, c2) for r1, c1, r2, c2 in block["footer_merges"]])
+    for r, height in block["footer_heights"]:
+        last_ws.row_dimensions[r + shift].height = height
+
+    # 5) 총합계: 합계 열 SUM(+이월) 수식 (합계 열이 없으면 직접 계산)
+    logger().info("5단계: 총합계 수식 생성...")
+    total_cells = []
+    for r, c in plan["total_cells"]:
+        if r > end_row:
+            targets = [(last_ws, r + shift)]
+        else:
+            targets = [(sheet, r) for sheet in sheets]
+        for sheet, row in targets:
+            total_cells.append([sheets.index(sheet), row, c])
+            if letter and items:
+                prefix = sheet_ref(last_ws.title) if sheet is not last_ws else ""
+                total_value = f"={cumulative_expr(pages[-1], letter, prefix)}"
+            else:
+                total_value = items_total_amount(items)
+            write_total_cell(sheet.cell(row=row, column=c), total_value)
+            logger().info(f"  총합계 설정 ({sheet.title}!{get_column_letter(c)}{row}): {total_value}")
+
+    # 6) 이미지 (도장/로고): 머리글 영역은 모든 시트, 푸터 영역은 마지막 시트
+    for r, c, key, width, height in plan.get("images", []):
+        if start_row <= r <= end_row:
+            continue
+        source = image_source(payload, key)
+        if not source:
+            logger().info(f"  이미지 없음: {key}")
+        targets = [(last_ws, r + shift)] if r > end_row else [(sheet, r) for sheet in sheets]
+        for sheet, row in targets:
+            place_image(sheet, row, c, source, (width, height) if width else None)
+    return {"sheets": sheets, "layout": layout, "total_cells": total_cells}
 
 # ---------- 메인 렌더링 함수 ----------
-def render_invoice(template_path, output_path, payload):
-    """템플릿을 렌더링하여 청구서를 생성합니다."""
+def render_invoice(template_path, output_path, payload, plan=None, pagination=None,
+                   item_key=None, previous_output=None, changes=None):
+    """템플릿을 렌더링하여 청구서를 생성합니다.
+
+    pagination: {"page_rows": 페이지당 항목 행 수, "first_page_rows": 첫 페이지 항목 행 수,
+                 "pages_per_sheet": 시트당 페이지 수, "carry_label": 이월 행 라벨}
+    item_key: 항목을 식별하는 키. 지정하면 출력 옆에 레이아웃 사이드카를 기록해 증분 갱신을 가능하게 합니다.
+    previous_output/changes: 이전 출력과 바뀐 항목 목록(item_key 포함). 바뀐 행만 고쳐 쓰고,
+        행 추가/삭제, 페이지 설정·템플릿·렌더 계획 변경 등으로 부분 갱신이 불가능하면
+        변경을 반영한 payload 로 전체 렌더링합니다. pagination 을 생략하면 이전 출력의 설정을 따릅니다.
+    """
+    from invoice_api import PayloadError, compile_template, read_template, render_workbook, save_workbook, write_output
+    from invoice_schema import validate_changes, validate_payload
+
     try:
-        wb = openpyxl.load_workbook(template_path)
-        ws = wb[wb.sheetnames[0]]
-
-        # 디버그 메시지를 stderr로 출력
-        print(f"템플릿 로드 완료: {template_path}", file=sys.stderr)
-        print(f"워크시트: {ws.title}, 최대 행: {ws.max_row}, 최대 열: {ws.max_column}", file=sys.stderr)
-
-        # 1) 전역 플레이스홀더 치환(모든 셀 순회) - 반복 마커는 제외
-        print("1단계: 전역 플레이스홀더 치환 중...", file=sys.stderr)
-        for r in range(1, ws.max_row + 1):
-            for c in range(1, ws.max_column + 1):
-                cell = ws.cell(row=r, column=c)
-                if isinstance(cell.value, str) and "{" in cell.value and "}" in cell.value:
-                    # 반복 마커와 item 플레이스홀더는 치환하지 않음
-                    if "{#items}" in cell.value or "{/items}" in cell.value or "{item." in cell.value:
-                        continue
-                    old_value = cell.value
-                    new_value = replace_placeholders_in_text(cell.value, payload)
-                    if old_value != new_value:
-                        print(f"  치환: {old_value} → {new_value}", file=sys.stderr)
-                        cell.value = new_value
-
-        # 2) 항목 반복 블록 찾기
-        print("2단계: 항목 반복 블록 찾기...", file=sys.stderr)
-        start_row = end_row = None
-        for r in range(1, ws.max_row + 1):
-            for c in range(1, ws.max_column + 1):
-                cell_value = str(ws.cell(row=r, column=c).value or "")
-                if "{#items}" in cell_value:
-                    start_row = r
-                    print(f"  시작 행 발견: {r}행 {c}열", file=sys.stderr)
-                elif "{/items}" in cell_value:
-                    end_row = r
-                    print(f"  종료 행 발견: {r}행 {c}열", file=sys.stderr)
-                    break
-            if end_row:
-                break
-
-        if start_row is None or end_row is None or end_row <= start_row + 1:
-            print("  반복 블록이 없습니다. 기본 렌더링 완료.", file=sys.stderr)
-            wb.save(output_path)
-            return {"success": True, "output_path": str(output_path)}
-
-        template_row = start_row + 1  # 이 한 줄이 항목 템플릿
-        items = payload.get("items", [])
-        print(f"  템플릿 행: {template_row}, 항목 수: {len(items)}", file=sys.stderr)
-
-        # 템플릿 행 스타일/병합/행높이 보관
-        max_cols = ws.max_column
-        tmpl_cells = [ws.cell(row=template_row, column=c) for c in range(1, max_cols + 1)]
-        tmpl_height = ws.row_dimensions[template_row].height
-        tmpl_merges = horizontal_merges_for_row(ws, template_row)
-        print(f"  템플릿 행 높이: {tmpl_height}, 병합 구조: {tmpl_merges}", file=sys.stderr)
-
-        # 3) 템플릿 아래에 items 길이만큼 공간 확보
-        if items and len(items) > 1:
-            print(f"3단계: {len(items) - 1}개 행 삽입...", file=sys.stderr)
-            ws.insert_rows(template_row + 1, amount=len(items) - 1)
-
-        # 4) 각 항목 렌더링
-        print("4단계: 항목 데이터 렌더링...", file=sys.stderr)
-        first_data_row = template_row
-        for i, item in enumerate(items):
-            r = first_data_row + i
-            print(f"  항목 {i + 1} 렌더링 (행 {r}): {item.get('title', 'N/A')}", file=sys.stderr)
-            
-            # 동일 병합 구조 적용
-            apply_horizontal_merges(ws, tmpl_merges, r)
-
-            # 셀 값 작성(템플릿 셀을 문자열 치환한 결과를 사용)
-            for c in range(1, max_cols + 1):
-                src = tmpl_cells[c - 1]
-                dst = ws.cell(row=r, column=c, value=src.value)
-                clone_cell_style(src, dst)
-                
-                if isinstance(dst.value, str) and "{item." in dst.value:
-                    # {item.키} 치환
-                    old_value = dst.value
-                    dst.value = re.sub(
-                        r"\{item\.([^{}]+)\}",
-                        lambda m: str(item.get(m.group(1).strip(), "")),
-                        dst.value
-                    )
-                    if old_value != dst.value:
-                        print(f"    항목 {i + 1} 치환 (열 {c}): {old_value} → {dst.value}", file=sys.stderr)
-
-            # 수식/숫자형식 적용 (필요시)
-            # 수량, 단가, 합계 열을 찾아서 적절히 설정
-            for c in range(1, max_cols + 1):
-                cell = ws.cell(row=r, column=c)
-                # 숫자 셀에 천단위 콤마 형식 적용
-                if isinstance(cell.value, (int, float)) or (isinstance(cell.value, str) and cell.value.isdigit()):
-                    cell.number_format = "#,##0"
-
-            # 행 높이 설정
-            if tmpl_height:
-                ws.row_dimensions[r].height = tmpl_height
-
-        # 5) 템플릿/마커 행 삭제({#items}, {/items}, 템플릿 행)
-        #    주의: 아래쪽부터 지워야 인덱스가 안 꼬임
-        print("5단계: 마커 및 템플릿 행 삭제...", file=sys.stderr)
-        adjusted_end_row = end_row + len(items) - 1 if items else end_row
-        ws.delete_rows(adjusted_end_row, 1)       # {/items}
-        ws.delete_rows(template_row, 1)           # 템플릿 샘플
-        ws.delete_rows(start_row, 1)              # {#items}
-
-        # 6) 총합계 치환: {TOTAL_SUM} 셀을 찾아 SUM 수식으로 대체
-        print("6단계: 총합계 수식 생성...", file=sys.stderr)
-        data_last_row = first_data_row + len(items) - 1
-        
-        for r in range(1, ws.max_row + 1):
-            for c in range(1, ws.max_column + 1):
-                cell = ws.cell(row=r, column=c)
-                if cell.value == "{TOTAL_SUM}":
-                    # 합계 열을 찾기 위해 데이터 행을 스캔
-                    total_col = None
-                    for col in range(1, max_cols + 1):
-                        test_cell = ws.cell(row=first_data_row, column=col)
-                        if isinstance(test_cell.value, (int, float)) and test_cell.value > 0:
-                            total_col = col
-                            break
-                    
-                    if total_col:
-                        sum_formula = f"=SUM({openpyxl.utils.get_column_letter(total_col)}{first_data_row}:{openpyxl.utils.get_column_letter(total_col)}{data_last_row})"
-                        cell.value = sum_formula
-                        print(f"  총합계 수식 설정: {sum_formula}", file=sys.stderr)
-                    else:
-                        # 수식을 찾지 못한 경우 직접 계산
-                        total_amount = sum(item.get('qty', 0) * item.get('unit_price', 0) for item in items)
-                        cell.value = total_amount
-                        print(f"  총합계 직접 계산: {total_amount}", file=sys.stderr)
-                    
-                    cell.font = Font(bold=True)
-                    cell.number_format = "#,##0"
-
-        # 7) 저장
-        print(f"7단계: 파일 저장 중... {output_path}", file=sys.stderr)
-        wb.save(output_path)
-        
+        # 템플릿을 열기 전에 payload·페이지 설정·변경 목록 전체를 검증·정규화 (오류는 위치와 함께 한 번에 반환)
+        payload = validate_payload(payload, pagination=pagination)
+        if changes is not None:
+            changes = validate_changes(changes, item_key or "id")
+
+        if previous_output is not None:
+            from invoice_patch import patch_rendered_invoice, merge_changes, read_output_layout
+
+            item_key = item_key or "id"
+            template_sha = file_sha256(read_template(template_path)[0])
+            result = patch_rendered_invoice(previous_output, output_path, payload, changes, item_key,
+                                            pagination, template_sha, plan)
+            if result is not None:
+                return result
+            logger().info("  부분 갱신이 불가능하여 전체 렌더링합니다.")
+            if changes:
+                payload = {**payload, "items": merge_changes(payload.get("items", []), changes, item_key)}
+            if pagination is None:
+                meta = read_output_layout(previous_output)
+                pagination = meta["pagination"] if meta else None
+
+        compiled = compile_template(template_path, plan)
+        logger().info(f"템플릿 로드 완료: {template_path}")
+        logger().info(f"워크시트: {compiled.plan['sheet']}, 최대 행: {compiled.plan['max_row']}, "
+              f"최대 열: {compiled.plan['max_column']}")
+
+        # payload 는 위에서 검증했고, 병합된 변경 목록과 이전 출력의 페이지 설정도 검증을 거친 값
+        wb, rendered = render_workbook(compiled, payload, pagination, validated=True)
+
+        logger().info(f"6단계: 파일 저장 중... {output_path}")
+        write_output(output_path, save_workbook(wb))
+        if item_key:
+            from invoice_patch import write_output_layout
+            write_output_layout(output_path, compiled.plan, rendered["layout"],
+                                [sheet.title for sheet in rendered["sheets"]],
+                                rendered["total_cells"], payload, item_key, pagination, compiled.sha256)
+
         return {"success": True, "output_path": str(output_path)}
-        
+
+    except PayloadError as e:
+        logger().error(f"오류 발생: {str(e)}")
+        return {"success": False, "error": str(e), "errors": e.errors}
     except Exception as e:
-        print(f"오류 발생: {str(e)}", file=sys.stderr)
+        logger().error(f"오류 발생: {str(e)}")
         return {"success": False, "error": str(e)}
 
 def main():
     """메인 함수 - 명령줄 인자 처리"""
+    import argparse
+
     parser = argparse.ArgumentParser(description='청구서 템플릿 렌더링')
     parser.add_argument('--template', required=True, help='템플릿 파일 경로')
     parser.add_argument('--output', required=True, help='출력 파일 경로')
     parser.add_argument('--data', required=True, help='JSON 데이터 (파일 경로 또는 JSON 문자열)')
+    parser.add_argument('--page-rows', type=int, help='페이지당 항목 행 수 (지정 시 페이지 나눔 + 이월 행)')
+    parser.add_argument('--first-page-rows', type=int, help='첫 페이지 항목 행 수 (기본: --page-rows)')
+    parser.add_argument('--pages-per-sheet', type=int, help='시트당 페이지 수 (초과분은 새 시트로)')
+    parser.add_argument('--item-key', help='항목 식별 키 (지정 시 증분 갱신용 레이아웃 기록)')
+    parser.add_argument('--previous', help='증분 갱신할 이전 출력 파일')
+    parser.add_argument('--changes', help='바뀐 항목 목록 JSON (파일 경로 또는 JSON 문자열)')
     
     args = parser.parse_args()
+    import logging
+    logging.basicConfig(level=logging.INFO, format="%(message)s")  # 진행 메시지는 stderr, 결과 JSON 은 stdout
     
     # JSON 데이터 로드
     try:
-        if Path(args.data).exists():
-            with open(args.data, 'r', encoding='utf-8') as f:
-                payload = json.load(f)
-        else:
-            payload = json.loads(args.data)
+        payload = load_json_arg(args.data)
+        changes = load_json_arg(args.changes) if args.changes else None
     except Exception as e:
         print(json.dumps({"success": False, "error": f"JSON 데이터 파싱 오류: {str(e)}"}, ensure_ascii=False))
         sys.exit(1)
     
     # 템플릿 렌더링
-    result = render_invoice(args.template, args.output, payload)
+    pagination = None
+    if args.page_rows:
+        pagination = {
+            "page_rows": args.page_rows,
+            "first_page_rows": args.first_page_rows,
+            "pages_per_sheet": args.pages_per_sheet,
+        }
+    result = render_invoice(args.template, args.output, payload, pagination=pagination,
+                            item_key=args.item_key, previous_output=args.previous, changes=changes)
     print(json.dumps(result, ensure_ascii=False))
 
 if __name__ == "__main__":
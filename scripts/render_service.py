@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+청구서 렌더링 서비스
+invoice_api.render / convert_html_to_pdf 를 감싸는 로컬 HTTP 서비스입니다.
+고정 크기 워커 프로세스 풀 위에서 비동기 작업 큐로 동작하며 외부 네트워크 없이 실행됩니다.
+
+xlsx 작업의 template 은 템플릿 루트(--template-root, INVOICE_TEMPLATE_ROOT, 기본: 시작 디렉터리)
+기준 경로이며, 루트를 벗어나는 경로(절대 경로, "..", 심볼릭 링크)는 400 으로 거부합니다.
+payload 와 PDF 작업의 images 는 제출 시 스레드에서 검증하므로 이벤트 루프를 막지 않습니다.
+
+엔드포인트:
+  POST /jobs               작업 제출 (202 + job_id, 큐가 가득 차면 429, payload 검증 실패 시 400 + errors)
+  GET  /jobs/<id>          작업 상태 조회
+  GET  /jobs/<id>/result   결과 파일 다운로드 (완료 전에는 409)
+  GET  /metrics            큐 깊이, 처리 건수(워커 재활용 포함), 대기/처리 지연(ms)
+
+작업 본문 예시:
+  {"kind": "xlsx", "template": "docs/청구서 상세 폼.xlsx", "payload": {...}, "pagination": {"page_rows": 30}}
+  {"kind": "pdf", "html": "<html>...{IMAGE:stamp}...</html>", "images": {"stamp": "data:image/png;base64,..."}}
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import uuid
+import asyncio
+import argparse
+import tempfile
+import multiprocessing
+from collections import OrderedDict, deque
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+MAX_BODY_BYTES = 10 * 1024 * 1024
+TEMPLATE_ROOT_ENV = "INVOICE_TEMPLATE_ROOT"
+LATENCY_WINDOW = 1000
+
+CONTENT_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "pdf": "application/pdf",
+}
+
+HTTP_REASONS = {
+    200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+    429: "Too Many Requests", 500: "Internal Server Error",
+}
+
+# ---------- 워커 프로세스 ----------
+_templates = {}
+
+def current_rss():
+    """현재 프로세스의 상주 메모리(RSS, bytes). psutil → /proc → 최대 RSS 순으로 시도합니다."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+def compiled_template(path):
+    """워커 안에서 템플릿을 (경로, 수정 시각) 기준으로 한 번만 컴파일해 재사용합니다."""
+    from invoice_api import compile_template
+
+    path = Path(path).resolve()
+    key = (str(path), path.stat().st_mtime_ns)
+    compiled = _templates.get(key)
+    if compiled is None:
+        _templates.clear()  # 워커당 최근 템플릿 하나만 보관
+        compiled = _templates[key] = compile_template(path)
+    return compiled
+
+def run_job(kind, spec, output_path):
+    """워커 프로세스 안에서 작업 하나를 실행합니다."""
+    if str(SCRIPT_DIR) not in sys.path:
+        sys.path.insert(0, str(SCRIPT_DIR))
+
+    if kind == "xlsx":
+        from invoice_api import render, write_output
+        # payload 는 submit 에서 검증·정규화했으므로 워커에서는 다시 검증하지 않음
+        write_output(output_path, render(compiled_template(spec["template"]), spec["payload"], spec.get("pagination"),
+                                         validated=True))
+    elif kind == "pdf":
+        from html_to_pdf import convert_html_to_pdf
+        html_path = Path(output_path).with_suffix(".html")
+        html_path.write_text(spec["html"], encoding="utf-8")
+        try:
+            if not convert_html_to_pdf(html_path, output_path, spec.get("images")):
+                raise RuntimeError("PDF 생성 실패")
+        finally:
+            html_path.unlink(missing_ok=True)
+    else:
+        raise ValueError(f"알 수 없는 작업 종류: {kind}")
+    return str(output_path)
+
+def worker_main(conn):
+    """워커 프로세스 루프: 파이프로 받은 작업을 순서대로 처리합니다."""
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        kind, spec, output_path = message
+        try:
+            conn.send(("ok", run_job(kind, spec, output_path), current_rss()))
+        except Exception as e:
+            conn.send(("error", str(e), current_rss()))
+
+class WorkerSlot:
+    """워커 프로세스 하나를 소유하며, 시간 초과 시 프로세스를 종료하고 다시 띄웁니다.
+
+    재활용 정책: 처리 건수가 max_jobs 에 이르거나 작업 직후 RSS 가 max_rss 를 넘으면
+    워커를 정상 종료하고 새로 띄웁니다 (soak_render.py 의 권장값 참고).
+    """
+
+    def __init__(self, ctx, max_jobs=None, max_rss=None):
+        self.ctx = ctx
+        self.max_jobs = max_jobs
+        self.max_rss = max_rss
+        self.process = None
+        self.conn = None
+        self.start()
+
+    def start(self):
+        parent_conn, child_conn = self.ctx.Pipe()
+        self.process = self.ctx.Process(target=worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+        self.jobs = 0
+        self.rss = None
+
+    def should_recycle(self):
+        return (self.max_jobs is not None and self.jobs >= self.max_jobs) or \
+            (self.max_rss is not None and self.rss is not None and self.rss >= self.max_rss)
+
+    def recycle(self):
+        self.stop()
+        self.start()
+
+    def restart(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+        self.start()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+        self.conn.close()
+
+    def execute(self, message, timeout):
+        """블로킹 실행. 시간 초과면 None 을 반환합니다 (스레드에서 호출)."""
+        self.conn.send(message)
+        if not self.conn.poll(timeout):
+            return None
+        reply = self.conn.recv()
+        self.jobs += 1
+        self.rss = reply[2]
+        return reply
+
+# ---------- 작업/지표 ----------
+class Job:
+    """제출된 렌더링 작업의 상태"""
+
+    def __init__(self, kind, spec, output_path):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.spec = spec
+        self.output_path = output_path
+        self.status = "queued"
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+def percentile(values, pct):
+    """정렬된 값 목록의 백분위수(최근접 순위)"""
+    if not values:
+        return None
+    k = max(0, math.ceil(pct / 100 * len(values)) - 1)
+    return round(values[k], 1)
+
+class Metrics:
+    """큐 깊이와 지연 시간 지표"""
+
+    def __init__(self):
+        self.counts = {"submitted": 0, "rejected": 0, "done": 0, "failed": 0, "timeout": 0, "recycled": 0, "invalid": 0}
+        self.wait_ms = deque(maxlen=LATENCY_WINDOW)
+        self.run_ms = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, job):
+        self.counts[job.status] += 1
+        self.wait_ms.append((job.started_at - job.submitted_at) * 1000)
+        self.run_ms.append((job.finished_at - job.started_at) * 1000)
+
+    def snapshot(self, queue_depth, running):
+        wait = sorted(self.wait_ms)
+        run = sorted(self.run_ms)
+        return {
+            "queue_depth": queue_depth,
+            "running": running,
+            **self.counts,
+            "wait_ms": {"p50": percentile(wait, 50), "p95": percentile(wait, 95), "max": percentile(wait, 100)},
+            "run_ms": {"p50": percentile(run, 50), "p95": percentile(run, 95), "max": percentile(run, 100)},
+        }
+
+# ---------- 서비스 ----------
+class RenderService:
+    """유한 큐 + 고정 워커 풀 기반 렌더링 서비스"""
+
+    def __init__(self, workers, queue_limit, timeout, output_dir, keep_jobs=500,
+                 max_jobs_per_worker=None, max_worker_rss_mb=None, template_root=None):
+        self.n_workers = workers
+        self.template_root = os.path.realpath(template_root or os.environ.get(TEMPLATE_ROOT_ENV) or os.getcwd())
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.max_worker_rss = max_worker_rss_mb * 1024 * 1024 if max_worker_rss_mb else None
+        self.timeout = timeout
+        self.output_dir = Path(output_dir)
+        self.keep_jobs = keep_jobs
+        self.queue = asyncio.Queue(maxsize=queue_limit)
+        self.jobs = OrderedDict()
+        self.metrics = Metrics()
+        self.running = 0
+        self.slots = []
+        self.tasks = []
+
+    async def start(self):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        ctx = multiprocessing.get_context("spawn")
+        self.slots = [WorkerSlot(ctx, self.max_jobs_per_worker, self.max_worker_rss) for _ in range(self.n_workers)]
+        self.tasks = [asyncio.create_task(self.consume(slot)) for slot in self.slots]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        # 워커 종료 대기(join)가 이벤트 루프를 막지 않도록 스레드에서
+        await asyncio.gather(*(asyncio.to_thread(slot.stop) for slot in self.slots))
+
+    def template_path(self, name):
+        """템플릿 루트 안의 파일이면 실제 경로. 루트를 벗어나거나 파일이 없으면 ValueError."""
+        path = os.path.realpath(os.path.join(self.template_root, name)) if "\0" not in name else None
+        if path is None or os.path.commonpath([self.template_root, path]) != self.template_root:
+            raise ValueError(f"템플릿은 템플릿 루트 아래의 파일만 허용됩니다: {name}")
+        if not os.path.isfile(path):
+            raise ValueError(f"템플릿 파일을 찾을 수 없습니다: {name}")
+        return path
+
+    async def submit(self, body):
+        """작업을 검증해 큐에 넣습니다. 큐가 가득 차면 asyncio.QueueFull 을 발생시킵니다.
+
+        잘못된 payload/images 는 큐에 넣기 전에 PayloadError 로 거부합니다 (워커 왕복과 템플릿 로드 비용 없이).
+        검증은 큰 payload 에서 수십 ms 가 걸릴 수 있으므로 스레드에서 실행합니다.
+        """
+        from invoice_api import PayloadError
+        from invoice_schema import validate_images, validate_payload
+
+        kind = body.get("kind", "xlsx")
+        if kind not in ("xlsx", "pdf"):
+            raise ValueError(f"알 수 없는 작업 종류: {kind}")
+        if self.queue.full():
+            # 검증 비용을 치르기 전에 거부
+            self.metrics.counts["rejected"] += 1
+            raise asyncio.QueueFull
+        try:
+            if kind == "xlsx":
+                if not isinstance(body.get("template"), str) or not isinstance(body.get("payload"), dict):
+                    raise ValueError("xlsx 작업에는 template(문자열)과 payload(객체)가 필요합니다.")
+                template = self.template_path(body["template"])
+                payload = await asyncio.to_thread(validate_payload, body["payload"], "plan", body.get("pagination"))
+                spec = {"template": template, "payload": payload, "pagination": body.get("pagination")}
+            else:
+                if not isinstance(body.get("html"), str):
+                    raise ValueError("pdf 작업에는 html(문자열)이 필요합니다.")
+                images = await asyncio.to_thread(validate_images, body.get("images"))
+                spec = {"html": body["html"], "images": images}
+        except PayloadError:
+            self.metrics.counts["invalid"] += 1
+            raise
+
+        job = Job(kind, spec, None)
+        job.output_path = str(self.output_dir / f"{job.id}.{kind}")
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.metrics.counts["rejected"] += 1
+            raise
+        self.metrics.counts["submitted"] += 1
+        self.jobs[job.id] = job
+        self.prune()
+        return job
+
+    def prune(self):
+        """오래된 완료 작업과 결과 파일을 정리해 메모리/디스크 사용량을 제한합니다."""
+        finished = [j for j in self.jobs.values() if j.finished_at is not None]
+        for job in finished[:max(0, len(finished) - self.keep_jobs)]:
+            Path(job.output_path).unlink(missing_ok=True)
+            del self.jobs[job.id]
+
+    async def consume(self, slot):
+        while True:
+            job = await self.queue.get()
+            job.status = "running"
+            job.started_at = time.time()
+            self.running += 1
+            message = (job.kind, job.spec, job.output_path)
+            try:
+                reply = await asyncio.to_thread(slot.execute, message, self.timeout)
+                if reply is None:
+                    job.status = "timeout"
+                    job.error = f"작업 시간 초과 ({self.timeout}초)"
+                    await asyncio.to_thread(slot.restart)
+                elif reply[0] == "ok":
+                    job.status = "done"
+                else:
+                    job.status = "failed"
+                    job.error = reply[1]
+                if reply is not None and slot.should_recycle():
+                    self.metrics.counts["recycled"] += 1
+                    await asyncio.to_thread(slot.recycle)
+            except Exception as e:
+                job.status = "failed"
+                job.error = str(e)
+                await asyncio.to_thread(slot.restart)
+            finally:
+                self.running -= 1
+                job.finished_at = time.time()
+                job.spec = None
+                self.metrics.record(job)
+                self.queue.task_done()
+
+    # ---------- HTTP ----------
+    async def route(self, method, path, body):
+        """(상태코드, 헤더, 본문 bytes) 를 반환합니다."""
+        parts = [p for p in path.split("?", 1)[0].split("/") if p]
+
+        if parts == ["jobs"]:
+            if method != "POST":
+                return json_response(405, {"success": False, "error": "POST 만 허용됩니다."})
+            from invoice_api import PayloadError
+            try:
+                job = await self.submit(json.loads(body or b"{}"))
+            except asyncio.QueueFull:
+                return json_response(429, {"success": False, "error": "작업 큐가 가득 찼습니다."},
+                                     {"Retry-After": "1"})
+            except PayloadError as e:
+                return json_response(400, {"success": False, "error": str(e), "errors": e.errors})
+            except (ValueError, AttributeError) as e:
+                return json_response(400, {"success": False, "error": str(e)})
+            return json_response(202, {"success": True, **job.to_dict()})
+
+        if parts == ["metrics"] and method == "GET":
+            return json_response(200, self.metrics.snapshot(self.queue.qsize(), self.running))
+
+        if len(parts) in (2, 3) and parts[0] == "jobs" and method == "GET":
+            job = self.jobs.get(parts[1])
+            if job is None:
+                return json_response(404, {"success": False, "error": "작업을 찾을 수 없습니다."})
+            if len(parts) == 2:
+                return json_response(200, {"success": True, **job.to_dict()})
+            if parts[2] == "result":
+                if job.status != "done":
+                    return json_response(409, {"success": False, **job.to_dict()})
+                data = Path(job.output_path).read_bytes()
+                return 200, {"Content-Type": CONTENT_TYPES[job.kind]}, data
+
+        return json_response(404, {"success": False, "error": "경로를 찾을 수 없습니다."})
+
+    async def handle(self, reader, writer):
+        try:
+            request_line = (await reader.readline()).decode("latin-1").strip()
+            if not request_line:
+                return
+            method, path, _ = request_line.split(" ", 2)
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin-1").strip()
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            length = int(headers.get("content-length", 0))
+            if length > MAX_BODY_BYTES:
+                status, extra, data = json_response(413, {"success": False, "error": "요청 본문이 너무 큽니다."})
+            else:
+                body = await reader.readexactly(length) if length else b""
+                try:
+                    status, extra, data = await self.route(method, path, body)
+                except Exception as e:
+                    status, extra, data = json_response(500, {"success": False, "error": str(e)})
+
+            head = [f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}",
+                    f"Content-Length: {len(data)}", "Connection: close"]
+            head += [f"{k}: {v}" for k, v in extra.items()]
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + data)
+            await writer.drain()
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+def json_response(status, obj, headers=None):
+    data = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+    return status, {"Content-Type": "application/json; charset=utf-8", **(headers or {})}, data
+
+async def serve(args):
+    output_dir = args.output_dir or tempfile.mkdtemp(prefix="render_service_")
+    service = RenderService(args.workers, args.queue_limit, args.timeout, output_dir,
+                            max_jobs_per_worker=args.max_jobs_per_worker, max_worker_rss_mb=args.max_worker_rss_mb,
+                            template_root=args.template_root)
+    await service.start()
+    server = await asyncio.start_server(service.handle, args.host, args.port)
+    print(f"렌더링 서비스 시작: http://{args.host}:{args.port} "
+          f"(워커 {args.workers}, 큐 한도 {args.queue_limit}, 시간 제한 {args.timeout}초, "
+          f"템플릿 루트 {service.template_root})", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+def main():
+    """메인 함수 - 명령줄 인자 처리"""
+    parser = argparse.ArgumentParser(description='청구서 렌더링 서비스')
+    parser.add_argument('--host', default='127.0.0.1', help='바인딩 주소')
+    parser.add_argument('--port', type=int, default=8765, help='포트')
+    parser.add_argument('--workers', type=int, default=max(1, (multiprocessing.cpu_count() or 2) - 1), help='워커 프로세스 수')
+    parser.add_argument('--queue-limit', type=int, default=100, help='대기 큐 최대 길이 (초과 시 429)')
+    parser.add_argument('--timeout', type=float, default=60, help='작업별 시간 제한(초)')
+    parser.add_argument('--max-jobs-per-worker', type=int, help='워커 재활용 전 최대 처리 건수')
+    parser.add_argument('--max-worker-rss-mb', type=float, help='작업 후 워커 RSS 가 이 값(MB)을 넘으면 재활용')
+    parser.add_argument('--output-dir', help='결과 파일 디렉터리 (기본: 임시 디렉터리)')
+    parser.add_argument('--template-root', help=f'xlsx 작업 템플릿을 허용할 디렉터리 (기본: {TEMPLATE_ROOT_ENV} 또는 현재 디렉터리)')
+
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+렌더링 메모리 소크(soak) 검사
+한 프로세스에서 크기가 섞인 청구서를 수천 건 연속 렌더링하면서 RSS 와 tracemalloc 을 표본 추출합니다.
+워밍업 이후 구간의 렌더링당 메모리 증가량(선형 회귀 기울기)이 예산을 넘으면 종료 코드 1 을 반환하고,
+호출 위치별 할당 증가량과 render_service 워커 재활용 정책 권장값을 출력합니다.
+
+RSS 는 가장 큰 청구서를 처음 렌더링할 때 한 번 계단식으로 오르고 이후에는 그 수준을 유지합니다
+(해제된 메모리를 할당자가 OS 에 돌려주지 않음). 이 계단이 측정 구간에 들어가 누수처럼 보이지 않도록
+워밍업은 크기 구간마다 가장 큰 청구서(페이지 나눔 유무 각각)부터 렌더링합니다.
+
+tracemalloc 을 켜면 렌더링이 크게 느려집니다(기본 크기 구간에서 약 2~3건/초). 기본 2000건은
+15분 안팎이 걸리며, 장시간 누수를 확인하려면 --renders 를 늘려 별도로 실행하세요(20000건이면 몇 시간).
+
+사용 예:
+  python scripts/soak_render.py                                  # 기본 명세로 만든 템플릿, 2000건
+  python scripts/soak_render.py --renders 500 --warmup 100       # 빠른 확인
+  python scripts/soak_render.py --renders 20000 --verbose        # 장시간 실행, 렌더러 진행 로그 표시
+  python scripts/soak_render.py --template "docs/청구서 상세 폼.xlsx" --report soak.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 크기 구간(항목 수)과 비율
+DEFAULT_SIZES = "1-20:70,21-200:25,201-500:5"
+PAGINATION = {"page_rows": 30, "pages_per_sheet": 10}
+
+# ---------- 입력 생성 ----------
+def parse_sizes(text):
+    """"1-20:70,21-200:25" → [((1, 20), 70), ((21, 200), 25)]"""
+    buckets = []
+    for part in text.split(","):
+        span, _, weight = part.partition(":")
+        low, _, high = span.partition("-")
+        buckets.append(((int(low), int(high or low)), float(weight or 1)))
+    return buckets
+
+def make_payload(rng, n_items, seq):
+    items = [
+        {
+            "id": f"{seq}-{i}",
+            "title": f"공정 {i + 1}",
+            "spec": rng.choice(["토목공사", "구조공사", "마감공사", "기타"]),
+            "qty": rng.randint(1, 20),
+            "unit": rng.choice(["식", "㎡", "EA", "m"]),
+            "unit_price": rng.randrange(1000, 5000000, 100),
+            "note": "" if rng.random() < 0.7 else f"비고 {seq}",
+        }
+        for i in range(n_items)
+    ]
+    return {
+        "client": f"건축주 {seq % 97}",
+        "project": f"프로젝트 {seq}",
+        "site_addr": "서울시 강남구 역삼동 123-45",
+        "issued_at": "2024-09-01",
+        "items": items,
+    }
+
+def priming_jobs(sizes):
+    """크기 구간마다 가장 큰 청구서를 페이지 나눔 없이/있게 한 번씩 (할당자 최고 사용량을 미리 채움)"""
+    import random
+
+    rng = random.Random(0)
+    for (_, high), _ in sizes:
+        for pagination in (None, PAGINATION):
+            yield make_payload(rng, high, -1), pagination
+
+def job_stream(seed, sizes, paginate_ratio):
+    """(항목 수, pagination) 을 끝없이 생성"""
+    import random
+
+    rng = random.Random(seed)
+    spans = [span for span, _ in sizes]
+    weights = [weight for _, weight in sizes]
+    seq = 0
+    while True:
+        low, high = rng.choices(spans, weights)[0]
+        n_items = rng.randint(low, high)
+        pagination = PAGINATION if rng.random() < paginate_ratio else None
+        yield make_payload(rng, n_items, seq), pagination
+        seq += 1
+
+# ---------- 측정 ----------
+def slope(points):
+    """최소제곱 기울기 (y 증가량 / x 1 단위)"""
+    n = len(points)
+    if n < 2:
+        return 0.0
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var = sum((x - mean_x) ** 2 for x, _ in points)
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var if var else 0.0
+
+def top_growth(start, end, renders, limit):
+    """두 tracemalloc 스냅샷 사이 호출 위치별 증가량 상위 목록"""
+    import tracemalloc
+
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")]
+    stats = end.filter_traces(filters).compare_to(start.filter_traces(filters), "lineno")
+    rows = []
+    for stat in stats[:limit]:
+        if stat.size_diff <= 0:
+            break
+        frame = stat.traceback[0]
+        rows.append({
+            "site": f"{frame.filename}:{frame.lineno}",
+            "size_diff": stat.size_diff,
+            "count_diff": stat.count_diff,
+            "bytes_per_render": round(stat.size_diff / renders, 2),
+        })
+    return rows
+
+def recommend_policy(baseline_rss, peak_rss, rss_slope, target_rss):
+    """워커 재활용 정책 권장값: 최대 RSS 는 관측 최고치에 25% 여유, 최대 처리 건수는 증가 기울기 기준"""
+    max_rss = max(int(peak_rss * 1.25), target_rss or 0)
+    headroom = max_rss - baseline_rss
+    max_jobs = int(headroom / rss_slope) if rss_slope > 0 else None
+    return {"max_worker_rss_mb": round(max_rss / 1024 / 1024), "max_jobs_per_worker": max_jobs}
+
+def format_kb(value):
+    return f"{value / 1024:,.1f}KB"
+
+# ---------- 실행 ----------
+def run_soak(args):
+    import gc
+    import itertools
+    import tracemalloc
+    from invoice_api import compile_template, render
+    from render_service import current_rss
+
+    if args.template:
+        compiled = compile_template(args.template)
+    else:
+        import tempfile
+        from build_template import build_template, load_spec
+
+        # CompiledTemplate 은 템플릿 bytes 를 들고 있으므로 임시 디렉토리는 바로 지워도 됩니다.
+        with tempfile.TemporaryDirectory(prefix="soak_render_") as tmp_dir:
+            template_path, _ = build_template(load_spec(args.spec), os.path.join(tmp_dir, "template.xlsx"),
+                                              os.path.dirname(os.path.abspath(args.spec)))
+            compiled = compile_template(template_path)
+
+    sizes = parse_sizes(args.sizes)
+    jobs = itertools.chain(priming_jobs(sizes), job_stream(args.seed, sizes, args.paginate_ratio))
+    rss_points, traced_points = [], []
+    peak_rss = 0
+    baseline_snapshot = None
+    started = time.perf_counter()
+    total_items = 0
+
+    tracemalloc.start(args.frames)
+    try:
+        for i in range(args.warmup + args.renders):
+            payload, pagination = next(jobs)
+            total_items += len(payload["items"])
+            render(compiled, payload, pagination)
+            del payload
+
+            done = i + 1
+            if done == args.warmup or (done > args.warmup and (done - args.warmup) % args.sample_every == 0):
+                gc.collect()
+                rss = current_rss()
+                traced = tracemalloc.get_traced_memory()[0]
+                peak_rss = max(peak_rss, rss)
+                x = done - args.warmup
+                rss_points.append((x, rss))
+                traced_points.append((x, traced))
+                if done == args.warmup:
+                    baseline_snapshot = tracemalloc.take_snapshot()
+                elapsed = time.perf_counter() - started
+                print(f"  {done:>7,}건  RSS {rss / 1024 / 1024:7.1f}MB  traced {traced / 1024 / 1024:7.2f}MB  "
+                      f"{done / elapsed:6.1f}건/초", file=sys.stderr)
+        gc.collect()
+        end_snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    # 앞쪽 절반은 캐시/할당자 안정화 구간으로 보고 뒤쪽 절반에서 기울기를 구합니다.
+    steady = len(rss_points) // 2
+    rss_slope = slope(rss_points[steady:])
+    traced_slope = slope(traced_points[steady:])
+    return {
+        "renders": args.renders,
+        "warmup": args.warmup,
+        "total_items": total_items,
+        "elapsed_s": round(time.perf_counter() - started, 1),
+        "baseline_rss": rss_points[0][1],
+        "final_rss": rss_points[-1][1],
+        "peak_rss": peak_rss,
+        "rss_bytes_per_render": round(rss_slope, 2),
+        "traced_bytes_per_render": round(traced_slope, 2),
+        "top_growth": top_growth(baseline_snapshot, end_snapshot, args.renders, args.top),
+        "policy": recommend_policy(rss_points[0][1], peak_rss, rss_slope, args.target_rss_mb * 1024 * 1024),
+        "samples": {"rss": rss_points, "traced": traced_points},
+    }
+
+def main():
+    """메인 함수 - 명령줄 인자 처리"""
+    parser = argparse.ArgumentParser(description='렌더링 메모리 소크 검사')
+    parser.add_argument('--template', help='템플릿 경로 (기본: --spec 으로 임시 템플릿 생성)')
+    parser.add_argument('--spec', default=os.path.join(SCRIPT_DIR, "templates", "invoice_detail.json"), help='템플릿 명세')
+    parser.add_argument('--renders', type=int, default=2000, help='측정 구간 렌더링 건수 (tracemalloc 사용 시 약 2~3건/초)')
+    parser.add_argument('--warmup', type=int, default=500, help='측정 전 워밍업 건수 (크기 구간별 최대 청구서 포함)')
+    parser.add_argument('--sample-every', type=int, default=250, help='표본 추출 간격(건)')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='항목 수 구간:비율 목록')
+    parser.add_argument('--paginate-ratio', type=float, default=0.3, help='페이지 나눔을 쓰는 청구서 비율')
+    parser.add_argument('--seed', type=int, default=1, help='난수 시드')
+    parser.add_argument('--frames', type=int, default=1, help='tracemalloc 호출 스택 깊이')
+    parser.add_argument('--top', type=int, default=10, help='출력할 호출 위치 수')
+    parser.add_argument('--budget-bytes', type=float, default=512, help='렌더링당 tracemalloc 증가 예산(bytes)')
+    parser.add_argument('--rss-budget-bytes', type=float, default=4096, help='렌더링당 RSS 증가 예산(bytes)')
+    parser.add_argument('--target-rss-mb', type=float, default=0, help='권장 정책 계산 시 워커 RSS 하한(MB)')
+    parser.add_argument('--report', help='JSON 보고서 저장 경로')
+    parser.add_argument('--verbose', action='store_true', help='렌더러 진행 로그 표시')
+    args = parser.parse_args()
+    if args.verbose:
+        import logging
+        logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    sizes = parse_sizes(args.sizes)
+    args.warmup = max(args.warmup, 2 * len(sizes))  # 최대 청구서 렌더링은 항상 워밍업 안에서
+    if args.sample_every < 1 or args.renders // args.sample_every < 2:
+        parser.error("워밍업 이후 표본이 2개 이상 필요합니다: --renders 를 --sample-every 의 2배 이상으로 지정하세요")
+    if SCRIPT_DIR not in sys.path:
+        sys.path.insert(0, SCRIPT_DIR)
+
+    report = run_soak(args)
+
+    print(f"렌더링 {report['renders']:,}건 (항목 {report['total_items']:,}개, {report['elapsed_s']}초)")
+    print(f"RSS: 기준 {report['baseline_rss'] / 1024 / 1024:.1f}MB → 최종 {report['final_rss'] / 1024 / 1024:.1f}MB "
+          f"(최고 {report['peak_rss'] / 1024 / 1024:.1f}MB)")
+    print("호출 위치별 증가량 (워밍업 이후):")
+    for row in report["top_growth"]:
+        print(f"  {format_kb(row['size_diff']):>12} ({row['bytes_per_render']:>8.1f}B/건, "
+              f"{row['count_diff']:+,}개)  {row['site']}")
+
+    checks = [
+        ("tracemalloc", report["traced_bytes_per_render"], args.budget_bytes),
+        ("RSS", report["rss_bytes_per_render"], args.rss_budget_bytes),
+    ]
+    failed = False
+    for label, value, budget in checks:
+        ok = value <= budget
+        failed |= not ok
+        print(f"{'OK  ' if ok else 'FAIL'} {label} 정상 상태 증가: {value:,.1f}B/건 (예산 {budget:,.0f}B/건)")
+
+    policy = report["policy"]
+    print("권장 워커 재활용 정책: "
+          f"--max-worker-rss-mb {policy['max_worker_rss_mb']}"
+          + (f" --max-jobs-per-worker {policy['max_jobs_per_worker']}" if policy["max_jobs_per_worker"] else ""))
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
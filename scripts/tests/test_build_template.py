@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""build_template 명세 → 템플릿·렌더 계획 테스트 (python -m unittest discover -s scripts/tests)"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPT_DIR)
+
+from build_template import build_template, load_spec
+from invoice_template_renderer import file_sha256
+
+SPEC = os.path.join(SCRIPT_DIR, "templates", "invoice_detail.json")
+
+
+class BuildTemplateTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import openpyxl
+
+        tmp = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(tmp.cleanup)
+        cls.template, plan_path = build_template(load_spec(SPEC), os.path.join(tmp.name, "template.xlsx"),
+                                                 os.path.dirname(SPEC))
+        with open(plan_path, encoding="utf-8") as f:
+            cls.plan = json.load(f)
+        cls.ws = openpyxl.load_workbook(cls.template)["청구서"]
+
+    def test_placeholders_and_item_block(self):
+        ws = self.ws
+        self.assertEqual(ws["A1"].value, "청구서 상세 - {invoice_no}")
+        self.assertEqual(ws["AK3"].value, "발행일 : {issued_at}")
+        self.assertEqual((ws["A8"].value, ws["A10"].value), ("{#items}", "{/items}"))
+        self.assertEqual([ws.cell(row=9, column=c).value for c in (1, 11, 17, 34)],
+                         ["{item.title}\n{item.desc}", "{item.spec}", "{item.qty}", "=Q9*AA9"])
+        self.assertEqual(ws["AP11"].value, "{TOTAL_SUM}")
+        self.assertEqual(ws["AP12"].value, "{IMAGE:stamp:80x80}")
+        self.assertEqual(ws["AA9"].number_format, "#,##0")
+
+    def test_merges(self):
+        merges = {str(r) for r in self.ws.merged_cells.ranges}
+        for expected in ("A1:AZ1", "A3:AH3", "AK3:AZ3", "A7:J7", "AP7:AZ7", "A9:J9", "AH9:AO9", "AP9:AZ9",
+                         "A11:AO11", "AP11:AZ11", "AP12:AZ12"):
+            self.assertIn(expected, merges)
+        self.assertNotIn("A8:J8", merges)
+
+    def test_print_settings(self):
+        ws = self.ws
+        self.assertEqual((ws.page_setup.paperSize, ws.page_setup.orientation), (9, "portrait"))
+        self.assertTrue(ws.sheet_properties.pageSetUpPr.fitToPage)
+        self.assertEqual((ws.page_setup.fitToWidth, ws.page_setup.fitToHeight), (1, 0))
+        self.assertEqual((ws.page_margins.left, ws.page_margins.top), (0.4, 0.6))
+        self.assertTrue(ws.print_options.horizontalCentered)
+
+    def test_plan_sidecar(self):
+        with open(self.template, "rb") as f:
+            self.assertEqual(self.plan["template_sha256"], file_sha256(f.read()))
+        items = self.plan["items"]
+        self.assertEqual((items["header_row"], items["start_row"], items["template_row"], items["end_row"]), (7, 8, 9, 10))
+        self.assertEqual(items["total_col"], 34)
+        self.assertEqual(self.plan["total_cells"], [[11, 42]])
+        self.assertEqual(self.plan["images"], [[12, 42, "stamp", 80, 80]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""image_cache 원본 허용 범위 테스트 (python -m unittest discover -s scripts/tests)"""
+
+import base64
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_cache import ASSET_ROOT_ENV, decode_source, source_error
+from invoice_schema import payload_errors
+
+PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z8BQDwAEhQGAhKmMIQAAAABJRU5ErkJggg=="
+)
+
+
+class DecodeSourceTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = os.path.join(tmp.name, "assets")
+        os.makedirs(self.root)
+        with open(os.path.join(self.root, "stamp.png"), "wb") as f:
+            f.write(PNG)
+        self.outside = os.path.join(tmp.name, "secret.txt")
+        with open(self.outside, "wb") as f:
+            f.write(b"secret")
+        env = mock.patch.dict(os.environ, {ASSET_ROOT_ENV: self.root})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def test_data_url_and_base64(self):
+        encoded = base64.b64encode(PNG).decode("ascii")
+        self.assertEqual(decode_source(f"data:image/png;base64,{encoded}"), PNG)
+        self.assertEqual(decode_source(encoded), PNG)
+
+    def test_files_under_asset_root(self):
+        self.assertEqual(decode_source("stamp.png"), PNG)
+        self.assertEqual(decode_source(os.path.join(self.root, "stamp.png")), PNG)
+        self.assertIsNone(source_error("stamp.png"))
+
+    def test_paths_outside_asset_root_are_rejected(self):
+        link = os.path.join(self.root, "link.txt")
+        os.symlink(self.outside, link)
+        for source in (self.outside, "../secret.txt", link, "/etc/passwd"):
+            with self.subTest(source=source):
+                self.assertIsNotNone(source_error(source))
+                with self.assertRaises(ValueError):
+                    decode_source(source)
+
+    def test_paths_rejected_without_asset_root(self):
+        with mock.patch.dict(os.environ, {ASSET_ROOT_ENV: ""}):
+            self.assertIsNotNone(source_error(os.path.join(self.root, "stamp.png")))
+
+    def test_payload_validation_reports_image_key(self):
+        _, errors = payload_errors({"items": [], "images": {"stamp": self.outside}})
+        self.assertEqual([e["path"] for e in errors], ["images.stamp"])
+
+    def test_image_sources_come_only_from_images(self):
+        from invoice_template_renderer import image_source
+
+        payload = {"stamp": self.outside, "header": {"stamp": self.outside}, "images": {"seal": "stamp.png"}}
+        self.assertIsNone(image_source(payload, "stamp"))
+        self.assertIsNone(image_source(payload, "header.stamp"))
+        self.assertEqual(image_source(payload, "seal"), "stamp.png")
+
+
+class EmbedImagesTest(unittest.TestCase):
+    def test_alt_is_escaped(self):
+        from html_to_pdf import embed_images
+
+        key = 'a" onerror="x'
+        encoded = base64.b64encode(PNG).decode("ascii")
+        html = embed_images("{IMAGE:%s}" % key, {key: encoded})
+        self.assertIn('alt="a&quot; onerror=&quot;x"', html)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""invoice_api 동시 렌더링·예외 테스트 (python -m unittest discover -s scripts/tests)"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPT_DIR)
+
+from build_template import build_template, load_spec
+from invoice_api import (PayloadError, RenderError, TemplateError, compile_template, render,
+                         render_workbook, write_output)
+from xlsx_diff import diff_workbooks
+
+SPEC = os.path.join(SCRIPT_DIR, "templates", "invoice_detail.json")
+GOLDEN_DIR = os.path.join(SCRIPT_DIR, "golden")
+
+
+def golden_cases():
+    """플레이스홀더 템플릿용 골든 사례 (payload, pagination)"""
+    cases = []
+    for name in ("basic", "empty", "paginated", "stamp"):
+        with open(os.path.join(GOLDEN_DIR, f"{name}.json"), encoding="utf-8") as f:
+            case = json.load(f)
+        cases.append((case["payload"], case.get("pagination")))
+    return cases
+
+
+class InvoiceApiTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        tmp = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(tmp.cleanup)
+        cls.dir = tmp.name
+        template, _ = build_template(load_spec(SPEC), os.path.join(cls.dir, "template.xlsx"), os.path.dirname(SPEC))
+        cls.compiled = compile_template(template)
+
+    def test_concurrent_renders_match_sequential(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        cases = golden_cases()
+        expected = [render(self.compiled, payload, pagination) for payload, pagination in cases]
+        jobs = [i % len(cases) for i in range(4 * len(cases))]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            outputs = list(pool.map(lambda i: render(self.compiled, *cases[i]), jobs))
+        for i, data in zip(jobs, outputs):
+            self.assertEqual(diff_workbooks(expected[i], data), [])
+
+    def test_unreadable_template(self):
+        with self.assertRaises(TemplateError):
+            compile_template(os.path.join(self.dir, "없는 템플릿.xlsx"))
+        with self.assertRaises(TemplateError):
+            compile_template(b"not a zip")
+        with self.assertRaises(TemplateError):
+            compile_template(self.compiled.data, plan={"sheet": "청구서"})
+
+    def test_payload_errors_are_collected(self):
+        payload = {"items": [{"qty": "abc", "unit_price": 1000}, {"qty": 1, "unit_price": "x"}]}
+        with self.assertRaises(PayloadError) as ctx:
+            render(self.compiled, payload)
+        self.assertEqual([(e["path"], e["index"]) for e in ctx.exception.errors],
+                         [("items[0].qty", 0), ("items[1].unit_price", 1)])
+        with self.assertRaises(PayloadError) as ctx:
+            render(self.compiled, {"items": []}, pagination={"page_rows": 0})
+        self.assertEqual([e["path"] for e in ctx.exception.errors], ["pagination.page_rows"])
+
+    def test_render_failures(self):
+        # validated=True 는 검증을 건너뛰므로 형식이 틀린 payload 는 렌더링 단계에서 실패
+        with self.assertRaises(RenderError):
+            render_workbook(self.compiled, {"items": "항목 아님"}, validated=True)
+        blocker = os.path.join(self.dir, "file")
+        with open(blocker, "w") as f:
+            f.write("")
+        with self.assertRaises(RenderError):
+            write_output(os.path.join(blocker, "out.xlsx"), b"data")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""invoice_patch 증분 갱신 테스트 (python -m unittest discover -s scripts/tests)"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPT_DIR)
+
+from build_template import build_template, load_spec
+from invoice_patch import layout_path_for, read_output_layout
+from invoice_template_renderer import render_invoice
+
+SPEC = os.path.join(SCRIPT_DIR, "templates", "invoice_detail.json")
+GOLDEN_PAYLOAD = os.path.join(SCRIPT_DIR, "golden", "basic.json")
+
+
+def sheet_values(path):
+    """시트 제목 → {좌표: 값} (패치 결과와 전체 렌더링 결과 비교용)"""
+    import openpyxl
+
+    wb = openpyxl.load_workbook(path)
+    return {ws.title: {cell.coordinate: cell.value for row in ws.iter_rows() for cell in row if cell.value is not None}
+            for ws in wb.worksheets}
+
+
+def many_items(n):
+    return [{"id": i, "title": f"공정 {i}", "spec": "마감공사", "qty": i % 7 + 1, "unit": "식",
+             "unit_price": 1000 * i, "note": ""} for i in range(1, n + 1)]
+
+
+class PatchRenderedInvoiceTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        self.template, _ = build_template(load_spec(SPEC), os.path.join(self.dir, "template.xlsx"),
+                                          os.path.dirname(SPEC))
+        with open(GOLDEN_PAYLOAD, encoding="utf-8") as f:
+            payload = json.load(f)["payload"]
+        for i, item in enumerate(payload["items"], start=1):
+            item["id"] = i
+        self.payload = payload
+        self.first = os.path.join(self.dir, "first.xlsx")
+        result = render_invoice(self.template, self.first, payload, item_key="id")
+        self.assertTrue(result["success"], result)
+
+    def patch(self, payload, changes):
+        output = os.path.join(self.dir, "second.xlsx")
+        result = render_invoice(self.template, output, payload, item_key="id",
+                                previous_output=self.first, changes=changes)
+        self.assertTrue(result["success"], result)
+        return output, result
+
+    def item_cell(self, output, key, value):
+        import openpyxl
+
+        ws = openpyxl.load_workbook(output).active
+        for row in ws.iter_rows():
+            for cell in row:
+                if cell.value == value:
+                    return cell
+        self.fail(f"{key}={value!r} 셀을 찾을 수 없습니다")
+
+    def test_text_to_number_gets_item_row_number_format(self):
+        output, result = self.patch(self.payload, [{"id": 2, "spec": 1234567}])
+        self.assertEqual(result.get("patched_items"), 1)
+        self.assertEqual(self.item_cell(output, "spec", 1234567).number_format, "#,##0")
+
+        # 다시 문자열로 바꾸면 템플릿 형식(General)으로 돌아감
+        self.first = output
+        again, _ = self.patch(self.payload, [{"id": 2, "spec": "구조공사"}])
+        self.assertEqual(self.item_cell(again, "spec", "구조공사").number_format, "General")
+
+    def test_changes_merge_against_payload_items(self):
+        payload = dict(self.payload, items=[dict(item) for item in self.payload["items"]])
+        payload["items"][0]["note"] = "payload 에서 바뀐 비고"
+        output, _ = self.patch(payload, [{"id": 3, "note": "변경 목록의 비고"}])
+        items = read_output_layout(output)["items"]
+        self.assertEqual(items[0]["note"], "payload 에서 바뀐 비고")
+        self.assertEqual(items[2]["note"], "변경 목록의 비고")
+
+    def test_no_temporary_files_left(self):
+        self.patch(self.payload, [{"id": 1, "qty": 2}])
+        leftovers = [name for name in os.listdir(self.dir) if name.endswith(".tmp")]
+        self.assertEqual(leftovers, [])
+        self.assertTrue(os.path.exists(layout_path_for(os.path.join(self.dir, "second.xlsx"))))
+
+    def test_add_and_remove_item_fall_back_to_full_render(self):
+        for changes in ([{"id": 99, "title": "추가 공정", "qty": 1, "unit_price": 500}], [{"id": 2, "_deleted": True}]):
+            with self.subTest(changes=changes):
+                output, result = self.patch(self.payload, changes)
+                self.assertNotIn("patched_items", result)
+                keys = [item["id"] for item in read_output_layout(output)["items"]]
+                expected = [item["id"] for item in self.payload["items"]]
+                if changes[0].get("_deleted"):
+                    expected.remove(2)
+                else:
+                    expected.append(99)
+                self.assertEqual(keys, expected)
+
+    def test_changed_template_falls_back_to_full_render(self):
+        spec = load_spec(SPEC)
+        spec["cells"][0]["value"] = "상세 청구서 - {invoice_no}"
+        self.template, _ = build_template(spec, os.path.join(self.dir, "template2.xlsx"), os.path.dirname(SPEC))
+        output, result = self.patch(self.payload, [{"id": 1, "qty": 2}])
+        self.assertNotIn("patched_items", result)
+        self.assertTrue(sheet_values(output)["청구서"]["A1"].startswith("상세 청구서"))
+
+
+class PatchPaginationTest(unittest.TestCase):
+    """페이지 나눔 출력의 증분 갱신: 페이지 설정 변경 감지, 총합계·이월 값"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        self.payload = {"invoice_no": "INV-1", "client": "김철수", "issued_at": "2024-09-01",
+                        "project": "신축", "site_addr": "서울", "items": many_items(50)}
+
+    def render(self, name, spec=None, pagination=None, **kwargs):
+        template = os.path.join(self.dir, "template.xlsx")
+        if not os.path.exists(template):
+            build_template(spec or load_spec(SPEC), template, os.path.dirname(SPEC))
+        output = os.path.join(self.dir, name)
+        result = render_invoice(template, output, kwargs.pop("payload", self.payload), pagination=pagination,
+                                item_key="id", **kwargs)
+        self.assertTrue(result["success"], result)
+        return output, result
+
+    def test_changed_pagination_forces_full_render(self):
+        first, _ = self.render("first.xlsx", pagination={"page_rows": 40})
+        pages = read_output_layout(first)["layout"]["pages"]
+        output, result = self.render("second.xlsx", pagination={"page_rows": 10},
+                                     previous_output=first, changes=[{"id": 3, "qty": 9}])
+        self.assertNotIn("patched_items", result)
+        meta = read_output_layout(output)
+        self.assertEqual(meta["pagination"], {"page_rows": 10})
+        self.assertEqual([p["count"] for p in meta["layout"]["pages"]], [10] * 5)
+        self.assertNotEqual(meta["layout"]["pages"], pages)
+
+    def test_same_or_omitted_pagination_patches(self):
+        first, _ = self.render("first.xlsx", pagination={"page_rows": 40})
+        for pagination in ({"page_rows": 40, "first_page_rows": None}, None):
+            with self.subTest(pagination=pagination):
+                _, result = self.render("second.xlsx", pagination=pagination,
+                                        previous_output=first, changes=[{"id": 3, "qty": 9}])
+                self.assertEqual(result.get("patched_items"), 1)
+
+    def test_explicit_plan_mismatch_forces_full_render(self):
+        first, _ = self.render("first.xlsx", pagination={"page_rows": 40})
+        plan = dict(read_output_layout(first)["plan"], max_column=99)
+        _, result = self.render("second.xlsx", previous_output=first, changes=[{"id": 3, "qty": 9}], plan=plan)
+        self.assertNotIn("patched_items", result)
+
+    def test_patched_totals_and_carry_match_full_render(self):
+        # 합계 열이 없는 템플릿: 총합계와 이월 금액이 수식이 아닌 값으로 들어가므로 패치에서 다시 계산
+        spec = load_spec(SPEC)
+        spec["items"]["columns"] = [col for col in spec["items"]["columns"] if not col.get("total")]
+        pagination = {"page_rows": 10, "first_page_rows": 8, "pages_per_sheet": 2}
+        first, _ = self.render("first.xlsx", spec=spec, pagination=pagination)
+        self.assertIsNone(read_output_layout(first)["plan"]["items"]["total_col"])
+
+        changes = [{"id": 3, "qty": 100}, {"id": 47, "unit_price": 123456}]
+        patched, result = self.render("patched.xlsx", pagination=pagination, previous_output=first, changes=changes)
+        self.assertEqual(result.get("patched_items"), 2)
+
+        from invoice_patch import merge_changes
+        merged = dict(self.payload, items=merge_changes(self.payload["items"], changes, "id"))
+        full, _ = self.render("full.xlsx", pagination=pagination, payload=merged)
+        self.assertEqual(sheet_values(patched), sheet_values(full))
+
+
+if __name__ == "__main__":
+    unittest.main()
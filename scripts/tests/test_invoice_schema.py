@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""payload / 변경 목록 / 페이지 나눔 일괄 검증 테스트"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from invoice_api import PayloadError
+from invoice_schema import payload_errors, validate_changes, validate_payload
+
+
+class ValidatePayloadTest(unittest.TestCase):
+    def test_coerces_number_strings(self):
+        payload = validate_payload({"items": [{"qty": "2", "unit_price": "₩1,500원"}, {"qty": ""}]})
+        self.assertEqual(payload["items"], [{"qty": 2, "unit_price": 1500}, {}])
+
+    def test_rejects_ambiguous_number_strings(self):
+        _, errors = payload_errors({"items": [{"qty": "1/2", "unit_price": "3 x 4"}]})
+        self.assertEqual([e["path"] for e in errors], ["items[0].qty", "items[0].unit_price"])
+
+    def test_collects_every_error_with_item_index(self):
+        _, errors = payload_errors({"client": "a\x01", "items": [{"qty": "x"}, "str", {"note": {"a": 1}, "unit_price": True}]})
+        self.assertEqual([(e["path"], e["index"]) for e in errors],
+                         [("client", None), ("items[0].qty", 0), ("items[1]", 1),
+                          ("items[2].unit_price", 2), ("items[2].note", 2)])
+
+    def test_pagination_errors_are_included(self):
+        with self.assertRaises(PayloadError) as ctx:
+            validate_payload({"items": [{"qty": "x"}]}, pagination={"page_rows": -1})
+        self.assertEqual([e["path"] for e in ctx.exception.errors], ["pagination.page_rows", "items[0].qty"])
+
+    def test_fixed_engine_requires_header(self):
+        _, errors = payload_errors({"header": {"client": "a"}, "items": []}, engine="fixed")
+        self.assertEqual([e["path"] for e in errors], ["header.project", "header.site_addr", "header.issued_at"])
+
+    def test_does_not_mutate_input(self):
+        items = [{"qty": "2"}]
+        validate_payload({"items": items})
+        self.assertEqual(items, [{"qty": "2"}])
+
+
+class ValidateChangesTest(unittest.TestCase):
+    def test_allows_delete_marker(self):
+        self.assertEqual(validate_changes([{"id": 5, "_deleted": True}, {"id": 6, "qty": "3"}], "id"),
+                         [{"id": 5, "_deleted": True}, {"id": 6, "qty": 3}])
+
+    def test_requires_item_key(self):
+        with self.assertRaises(PayloadError) as ctx:
+            validate_changes([{"id": 1}, {"qty": 2}], "id")
+        self.assertEqual([e["path"] for e in ctx.exception.errors], ["changes[1].id"])
+
+    def test_bool_only_allowed_for_delete_marker(self):
+        with self.assertRaises(PayloadError):
+            validate_changes([{"id": 1, "title": True}], "id")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""페이지 나눔 설정 검증과 항목 배치 테스트"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from invoice_template_renderer import compute_item_layout, pagination_errors
+
+
+class PaginationErrorsTest(unittest.TestCase):
+    def test_valid_settings(self):
+        self.assertEqual(pagination_errors(None), [])
+        self.assertEqual(pagination_errors({"page_rows": 30, "first_page_rows": 20, "pages_per_sheet": 2}), [])
+
+    def test_rejects_non_positive_and_non_int_counts(self):
+        for pagination in ({"page_rows": -1}, {"page_rows": 0}, {"page_rows": "30"}, {"page_rows": True},
+                           {"page_rows": 10, "first_page_rows": -3}, {"page_rows": 10, "pages_per_sheet": 1.5}):
+            with self.subTest(pagination=pagination):
+                self.assertTrue(pagination_errors(pagination))
+
+    def test_first_page_rows_needs_page_rows_and_fits(self):
+        self.assertEqual(pagination_errors({"first_page_rows": 5})[0]["path"], "pagination.first_page_rows")
+        self.assertTrue(pagination_errors({"page_rows": 10, "first_page_rows": 20}))
+
+    def test_rejects_non_object(self):
+        self.assertEqual(pagination_errors([30])[0]["path"], "pagination")
+
+
+class ComputeItemLayoutTest(unittest.TestCase):
+    def test_negative_page_rows_raises_instead_of_looping(self):
+        with self.assertRaises(ValueError):
+            compute_item_layout(5, 8, page_rows=-1)
+
+    def test_page_sizes(self):
+        layout = compute_item_layout(25, 8, page_rows=10, first_page_rows=5)
+        self.assertEqual([p["count"] for p in layout["pages"]], [5, 10, 10])
+        self.assertEqual(sum(p["count"] for p in compute_item_layout(100000, 8, page_rows=1)["pages"]), 100000)
+
+    def test_sheet_split(self):
+        layout = compute_item_layout(45, 8, page_rows=10, pages_per_sheet=2)
+        self.assertEqual(len(layout["sheets"]), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
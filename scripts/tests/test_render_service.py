@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""render_service 큐·검증·워커 관리 테스트 (python -m unittest discover -s scripts/tests)"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPT_DIR)
+
+from build_template import build_template, load_spec
+from render_service import RenderService
+
+SPEC = os.path.join(SCRIPT_DIR, "templates", "invoice_detail.json")
+
+
+def xlsx_job(n_items=3, template="template.xlsx", **payload):
+    items = [{"id": i, "title": f"공정 {i}", "qty": 1, "unit": "식", "unit_price": 1000} for i in range(n_items)]
+    return {"kind": "xlsx", "template": template, "payload": {"client": "김철수", "items": items, **payload}}
+
+
+class RenderServiceTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = os.path.join(tmp.name, "templates")
+        os.makedirs(self.root)
+        build_template(load_spec(SPEC), os.path.join(self.root, "template.xlsx"), os.path.dirname(SPEC))
+        self.outside = os.path.join(tmp.name, "outside.xlsx")
+        build_template(load_spec(SPEC), self.outside, os.path.dirname(SPEC))
+        self.output_dir = os.path.join(tmp.name, "out")
+
+    async def service(self, start=False, **kwargs):
+        options = {"workers": 1, "queue_limit": 10, "timeout": 60, **kwargs}
+        service = RenderService(output_dir=self.output_dir, template_root=self.root, **options)
+        if start:
+            await service.start()
+            self.addAsyncCleanup(service.stop)
+        return service
+
+    async def post(self, service, body):
+        status, headers, data = await service.route("POST", "/jobs", json.dumps(body).encode("utf-8"))
+        return status, headers, json.loads(data)
+
+    async def finish(self, service):
+        await asyncio.wait_for(service.queue.join(), 120)
+
+    async def test_queue_full_returns_429(self):
+        service = await self.service(queue_limit=1)
+        status, _, body = await self.post(service, xlsx_job())
+        self.assertEqual(status, 202)
+        self.assertEqual(body["status"], "queued")
+        status, headers, _ = await self.post(service, xlsx_job())
+        self.assertEqual(status, 429)
+        self.assertEqual(headers["Retry-After"], "1")
+        self.assertEqual((service.metrics.counts["submitted"], service.metrics.counts["rejected"]), (1, 1))
+
+    async def test_invalid_payload_returns_400_with_errors(self):
+        service = await self.service()
+        job = xlsx_job()
+        job["payload"]["items"][1]["qty"] = "많이"
+        status, _, body = await self.post(service, job)
+        self.assertEqual(status, 400)
+        self.assertEqual([e["path"] for e in body["errors"]], ["items[1].qty"])
+        self.assertEqual(service.metrics.counts["invalid"], 1)
+        self.assertEqual(service.queue.qsize(), 0)
+
+    async def test_pdf_images_are_validated_at_submit(self):
+        service = await self.service()
+        status, _, body = await self.post(service, {"kind": "pdf", "html": "<p>{IMAGE:stamp}</p>",
+                                                    "images": {"stamp": "/etc/passwd"}})
+        self.assertEqual(status, 400)
+        self.assertEqual([e["path"] for e in body["errors"]], ["images.stamp"])
+
+    async def test_templates_outside_root_are_rejected(self):
+        service = await self.service()
+        link = os.path.join(self.root, "link.xlsx")
+        os.symlink(self.outside, link)
+        for template in (self.outside, "../outside.xlsx", "link.xlsx", "없는 템플릿.xlsx"):
+            with self.subTest(template=template):
+                status, _, _ = await self.post(service, xlsx_job(template=template))
+                self.assertEqual(status, 400)
+        self.assertEqual(service.queue.qsize(), 0)
+
+    async def test_timeout_restarts_worker(self):
+        service = await self.service(start=True, timeout=0.2)
+        pid = service.slots[0].process.pid
+        status, _, body = await self.post(service, xlsx_job(n_items=2000))
+        self.assertEqual(status, 202)
+        await self.finish(service)
+        self.assertEqual(service.jobs[body["job_id"]].status, "timeout")
+        self.assertEqual(service.metrics.counts["timeout"], 1)
+        self.assertNotEqual(service.slots[0].process.pid, pid)
+
+        # 새 워커는 다음 작업을 정상 처리
+        service.timeout = 60
+        _, _, body = await self.post(service, xlsx_job())
+        await self.finish(service)
+        self.assertEqual(service.jobs[body["job_id"]].status, "done")
+
+    async def test_worker_recycled_after_max_jobs(self):
+        service = await self.service(start=True, max_jobs_per_worker=1)
+        pids = [service.slots[0].process.pid]
+        for _ in range(2):
+            status, _, body = await self.post(service, xlsx_job())
+            self.assertEqual(status, 202)
+            await self.finish(service)
+            self.assertEqual(service.jobs[body["job_id"]].status, "done")
+            pids.append(service.slots[0].process.pid)
+        self.assertEqual(service.metrics.counts["recycled"], 2)
+        self.assertEqual(len(set(pids)), 3)
+
+        status, headers, data = await service.route("GET", f"/jobs/{body['job_id']}/result", b"")
+        self.assertEqual(status, 200)
+        self.assertTrue(data.startswith(b"PK"))
+
+
+if __name__ == "__main__":
+    unittest.main()
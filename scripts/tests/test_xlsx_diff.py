@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""xlsx_diff 시트 수준 비교 테스트 (python -m unittest discover -s scripts/tests)"""
+
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from xlsx_diff import diff_workbooks
+
+
+def workbook_bytes(freeze=None, zoom=None, image_color=None):
+    import openpyxl
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "청구서"
+    ws["A1"] = "청구서"
+    ws.freeze_panes = freeze
+    if zoom:
+        ws.sheet_view.zoomScale = zoom
+    if image_color:
+        from PIL import Image as PILImage
+        from openpyxl.drawing.image import Image
+
+        png = io.BytesIO()
+        PILImage.new("RGB", (8, 8), image_color).save(png, format="PNG")
+        img = Image(io.BytesIO(png.getvalue()))
+        img.anchor = "B2"
+        ws.add_image(img)
+    out = io.BytesIO()
+    wb.save(out)
+    return out.getvalue()
+
+
+class SheetLevelDiffTest(unittest.TestCase):
+    def kinds(self, a, b):
+        return [d["kind"] for d in diff_workbooks(a, b)]
+
+    def test_identical(self):
+        self.assertEqual(diff_workbooks(workbook_bytes("A3", image_color="red"), workbook_bytes("A3", image_color="red")), [])
+
+    def test_freeze_panes(self):
+        self.assertEqual(self.kinds(workbook_bytes("A3"), workbook_bytes("A5")), ["freeze_panes"])
+        self.assertEqual(self.kinds(workbook_bytes(), workbook_bytes("A3")), ["freeze_panes"])
+
+    def test_sheet_view(self):
+        self.assertEqual(self.kinds(workbook_bytes(), workbook_bytes(zoom=85)), ["view"])
+
+    def test_image_bytes_with_same_anchor(self):
+        self.assertEqual(self.kinds(workbook_bytes(image_color="red"), workbook_bytes(image_color="blue")), ["image"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""xlsx_import 숫자 정규화 테스트 (python -m unittest discover -s scripts/tests)"""
+
+import io
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from invoice_schema import payload_errors
+from xlsx_import import (
+    ColumnMatcher, coerce_number, iter_payloads, key_values, load_mapping, match_header_row, parse_number, write_jsonl,
+)
+
+
+def workbook(rows, title="견적서"):
+    import openpyxl
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = title
+    for row in rows:
+        ws.append(row)
+    out = io.BytesIO()
+    wb.save(out)
+    out.seek(0)
+    return out
+
+ESTIMATE = [
+    ["건축주 : 김철수"],
+    ["공사명", "단독주택 신축"],
+    [],
+    ["청구서번호", "내    용", "규격", "수량*", "단위", "단가(원)", "비고"],
+    ["INV-1", "기초공사", "토목", "1", "식", "₩3,000,000원", ""],
+    ["INV-1", "골조공사", "구조", 2, "식", "1,500", "확인"],
+    ["INV-1", "합계", None, None, None, None, None],
+    ["INV-2", "마감공사", "마감", "(3)", "㎡", 12000, None],
+    ["INV-2", None, "규격만", None, None, None, None],
+]
+
+
+class ParseNumberTest(unittest.TestCase):
+    def test_accepts_separators_affixes_and_parentheses(self):
+        cases = {
+            "1,200": 1200,
+            "₩3,000,000원": 3000000,
+            "(1,000)": -1000,
+            "-1,500": -1500,
+            "₩-200": -200,
+            "$1.50": 1.5,
+            "12 EA": 12,
+            "3개": 3,
+            ".5": 0.5,
+            "+7": 7,
+        }
+        for text, expected in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(parse_number(text), expected)
+
+    def test_empty_markers_are_none(self):
+        for text in ("", "  ", "-", "—"):
+            with self.subTest(text=text):
+                self.assertIsNone(parse_number(text))
+
+    def test_rejects_interior_non_numeric_characters(self):
+        for text in ("1e3", "1/2", "3 x 4", "2~3", "1,5", "v2.1", "1,2345", "1.2.3", "--1", "(-5)", "abc", "₩", "원"):
+            with self.subTest(text=text):
+                with self.assertRaises(ValueError):
+                    parse_number(text)
+
+    def test_large_integers_keep_every_digit(self):
+        self.assertEqual(parse_number("12345678901234567890"), 12345678901234567890)
+        self.assertEqual(parse_number("12,345,678,901,234,567,890"), 12345678901234567890)
+
+    def test_integer_strings_stay_int(self):
+        self.assertIsInstance(parse_number("1,200"), int)
+        self.assertIsInstance(parse_number("1.5"), float)
+
+
+class CoerceNumberTest(unittest.TestCase):
+    def test_numbers_pass_through(self):
+        self.assertEqual(coerce_number(3), 3)
+        self.assertEqual(coerce_number(3.0), 3)
+        self.assertEqual(coerce_number(2.5), 2.5)
+        self.assertIsNone(coerce_number(None))
+
+    def test_strings_are_parsed(self):
+        self.assertEqual(coerce_number(" 1,200 "), 1200)
+        with self.assertRaises(ValueError):
+            coerce_number("1/2")
+
+
+class HeaderMatchingTest(unittest.TestCase):
+    def setUp(self):
+        self.matcher = ColumnMatcher(load_mapping())
+
+    def test_labels_with_spacing_brackets_and_symbols(self):
+        columns = match_header_row(["내    용", "단가(원)", "수량*", "건 축 주 :", "알 수 없음", "단가"], self.matcher)
+        self.assertEqual(columns, {
+            0: ("items", "title"), 1: ("items", "unit_price"), 2: ("items", "qty"), 3: ("header", "client"),
+        })
+
+    def test_key_value_rows(self):
+        self.assertEqual(key_values(["건축주 : 김철수"], self.matcher), {"client": "김철수"})
+        self.assertEqual(key_values(["공사명", "단독주택 신축", None], self.matcher), {"project": "단독주택 신축"})
+
+
+class ImportStreamTest(unittest.TestCase):
+    def test_groups_become_payloads(self):
+        payloads = list(iter_payloads(workbook(ESTIMATE)))
+        self.assertEqual([p["invoice_no"] for p in payloads], ["INV-1", "INV-2"])
+        first, second = payloads
+        self.assertEqual(first["client"], "김철수")
+        self.assertEqual(first["project"], "단독주택 신축")
+        self.assertEqual(first["header"]["invoice_no"], "INV-1")
+        self.assertEqual([(i["title"], i["qty"], i["unit_price"]) for i in first["items"]],
+                         [("기초공사", 1, 3000000), ("골조공사", 2, 1500)])  # "합계" 행은 건너뜀
+        self.assertEqual([(i["title"], i["qty"]) for i in second["items"]], [("마감공사", -3)])
+
+    def test_jsonl_stream_and_stats(self):
+        out = io.StringIO()
+        stats = write_jsonl(workbook(ESTIMATE), out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual([json.loads(line)["items"] for line in lines], [p["items"] for p in iter_payloads(workbook(ESTIMATE))])
+        self.assertEqual((stats["payloads"], stats["rows"], stats["skipped"]), (2, 3, 2))
+        self.assertEqual(stats["errors"], 1)  # 제목 없는 행
+
+    def test_unparseable_numbers_keep_raw_value_and_fail_validation(self):
+        rows = [["내용", "수량", "단가"], ["기초공사", "1/2", "1,000"]]
+        out = io.StringIO()
+        stats = write_jsonl(workbook(rows), out)
+        payload = json.loads(out.getvalue())
+        self.assertEqual(payload["items"][0]["qty"], "1/2")
+        self.assertEqual(stats["errors"], 1)
+        _, errors = payload_errors(payload)
+        self.assertEqual([e["path"] for e in errors], ["items[0].qty"])
+
+
+if __name__ == "__main__":
+    unittest.main()
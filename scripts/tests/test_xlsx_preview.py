@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""xlsx_preview 수식 계산·셀 읽기 테스트 (python -m unittest discover -s scripts/tests)"""
+
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from xlsx_preview import FormulaEvaluator, format_number, sheet_cells
+
+
+def evaluator(cells, results=None):
+    sheets = {"청구서": cells}
+    return FormulaEvaluator(lambda name: sheets.get(name, {}), lambda name: (results or {}) if name == "청구서" else {})
+
+
+class FormulaEvaluatorTest(unittest.TestCase):
+    def test_long_carry_chain_does_not_recurse(self):
+        n = 20000
+        cells = {(1, 1): 1}
+        cells.update({(r, 1): f"=A{r - 1}+1" for r in range(2, n + 1)})
+        self.assertEqual(evaluator(cells).cell_value("청구서", n, 1), n)
+
+    def test_sum_and_arithmetic(self):
+        cells = {(1, 1): 2, (2, 1): 3, (3, 1): "=SUM(A1:A2)*2", (4, 1): "=(A3-A1)/2"}
+        ev = evaluator(cells)
+        self.assertEqual(ev.cell_value("청구서", 3, 1), 10)
+        self.assertEqual(ev.cell_value("청구서", 4, 1), 4)
+
+    def test_unsupported_formula_falls_back_to_saved_result(self):
+        cells = {(1, 1): "=VLOOKUP(B1,C1:D2,2)", (2, 1): "=A1+1", (3, 1): "=1/0"}
+        ev = evaluator(cells, results={(1, 1): 41})
+        self.assertEqual(ev.cell_value("청구서", 1, 1), 41)
+        self.assertEqual(ev.cell_value("청구서", 2, 1), 42)
+        self.assertIsNone(ev.cell_value("청구서", 3, 1))
+
+    def test_missing_sheet_and_cycles_are_empty(self):
+        cells = {(1, 1): "=A2", (2, 1): "=A1", (3, 1): "='없는 시트'!A1"}
+        ev = evaluator(cells)
+        self.assertIsNone(ev.cell_value("청구서", 1, 1))
+        self.assertIsNone(ev.cell_value("청구서", 3, 1))
+
+
+class SheetCellsTest(unittest.TestCase):
+    XML = (
+        '<worksheet><sheetData>'
+        '<row r="1"><c r="A1" t="s"><v>0</v></c><c r="B1" s="2"/><c r="C1" t="inlineStr"><is><t>a&amp;b</t></is></c></row>'
+        '<row r="2"><c r="A2"><v>1.5</v></c><c r="B2" t="b"><v>1</v></c><c r="C2" s="3"><f>A2*2</f><v>3</v></c></row>'
+        '<row r="3"><c r="A3"><f t="shared" ref="A3:A4" si="0">A2+1</f></c><c r="B3"/></row>'
+        '<row r="4"><c r="A4"><f t="shared" si="0"/></c></row>'
+        '</sheetData></worksheet>'
+    )
+
+    def test_values_formulas_and_saved_results(self):
+        rows, values, results = sheet_cells(self.XML, ["공유"], covered={(1, 2)})
+        self.assertEqual(values, {
+            (1, 1): "공유", (1, 3): "a&b", (2, 1): 1.5, (2, 2): True,
+            (2, 3): "=A2*2", (3, 1): "=A2+1", (4, 1): "=A3+1",
+        })
+        self.assertEqual(results, {(2, 3): 3})
+        self.assertEqual([(r, [c for c, _, _ in cells]) for r, cells in rows], [(1, [1, 3]), (2, [1, 2, 3]), (3, [1]), (4, [1])])
+
+    def test_last_row(self):
+        rows, _, _ = sheet_cells(self.XML, ["공유"], last_row=2)
+        self.assertEqual([r for r, _ in rows], [1, 2])
+
+
+class FormatNumberTest(unittest.TestCase):
+    def test_common_formats(self):
+        self.assertEqual(format_number(1234567, "#,##0"), "1,234,567")
+        self.assertEqual(format_number(-1234.5, "#,##0.00;(#,##0.00)"), "(1,234.50)")
+        self.assertEqual(format_number(0.125, "0.0%"), "12.5%")
+        self.assertEqual(format_number(3000, '#,##0"원"'), "3,000원")
+        self.assertEqual(format_number(1500, "[$₩-412]#,##0"), "₩1,500")
+
+
+def weasyprint_available():
+    """WeasyPrint 를 실제로 임포트할 수 있는지 (패키지만 있고 pango 등 시스템 라이브러리가 없으면 OSError)"""
+    try:
+        import weasyprint  # noqa: F401
+    except (ImportError, OSError):
+        return False
+    return True
+
+
+@unittest.skipUnless(weasyprint_available(), "WeasyPrint 를 사용할 수 없음")
+class PreviewPngTest(unittest.TestCase):
+    def workbook_bytes(self):
+        import openpyxl
+
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = "청구서"
+        for r in range(1, 61):
+            ws.cell(row=r, column=1).value = f"항목 {r}"
+            ws.cell(row=r, column=2).value = r * 1000
+        out = io.BytesIO()
+        wb.save(out)
+        return out.getvalue()
+
+    def test_first_page_png_is_cached(self):
+        from PIL import Image
+        from xlsx_preview import cache_info, clear_cache, preview_png
+
+        clear_cache()
+        data = self.workbook_bytes()
+        try:
+            png = preview_png(data)
+        except RuntimeError as e:
+            self.skipTest(str(e))  # 새 WeasyPrint 는 pypdfium2 도 필요
+        self.assertTrue(png.startswith(b"\x89PNG"))
+        width, height = Image.open(io.BytesIO(png)).size
+        self.assertGreater(width, height)  # 기본 A4 가로 한 페이지
+        self.assertEqual(preview_png(data), png)
+        self.assertGreaterEqual(cache_info()["hits"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+청구서 워크북 구조 비교 (xlsx diff)
+두 xlsx 의 값, 수식, 숫자 형식, 스타일(글꼴/채우기/테두리/정렬/보호), 병합, 행 높이, 열 너비,
+인쇄 설정(용지/여백/맞춤/행 나눔/인쇄 제목), 틀 고정과 시트 보기 설정(선택 영역 제외),
+이미지 위치·표시 크기·내용(bytes 해시와 크기)을 비교합니다.
+두 시트는 read_only 모드에서 같은 행끼리 나란히 스트리밍하므로 전체 객체 그래프를 만들지 않고,
+스타일은 스타일 ID 쌍 단위로 한 번만 비교합니다. 생성 시각 같은 문서 속성은 비교하지 않습니다.
+
+렌더러 최적화(배치 엔진, 스타일 공유, zip 패치 등) 전후 출력이 같은지 확인할 때 사용합니다.
+골든 출력 묶음 검사는 check_golden.py 를 참고하세요.
+
+사용 예:
+  python xlsx_diff.py 이전.xlsx 새.xlsx
+  python xlsx_diff.py 이전.xlsx 새.xlsx --max-diffs 20 --json
+"""
+
+import sys
+import json
+
+# openpyxl, re, zipfile 은 실제로 비교하는 함수 안에서 지연 임포트합니다.
+
+STYLE_PARTS = ("font", "fill", "border", "alignment", "protection")
+
+# ---------- 시트 XML 정보 ----------
+def xml_attrs(text):
+    import re
+    return dict(re.findall(r'([\w:]+)="([^"]*)"', text))
+
+def print_settings(xml, defined_names):
+    """pageSetup/pageMargins/printOptions/fitToPage/인쇄 제목·영역 (관계 ID 제외)"""
+    import re
+
+    settings = {}
+    for tag in ("pageSetup", "pageMargins", "printOptions", "pageSetUpPr"):
+        m = re.search(rf"<{tag}\b([^>]*?)/?>", xml)
+        if m:
+            settings[tag] = {k: v for k, v in xml_attrs(m.group(1)).items() if not k.startswith("r:")}
+    settings.update(defined_names)
+    return settings
+
+def defined_names(zf):
+    """시트 번호 → {_xlnm.Print_Titles: 값, ...}"""
+    import re
+
+    names = {}
+    xml = zf.read("xl/workbook.xml").decode("utf-8")
+    for attrs, value in re.findall(r"<definedName\b([^>]*)>(.*?)</definedName>", xml, flags=re.S):
+        attrs = xml_attrs(attrs)
+        if "localSheetId" in attrs and attrs.get("name", "").startswith("_xlnm."):
+            names.setdefault(int(attrs["localSheetId"]), {})[attrs["name"]] = value.split("!", 1)[-1]
+    return names
+
+def sheet_views(xml):
+    """시트 보기 설정 [({sheetView 속성}, {틀 고정 pane 속성} 또는 None)] (선택 영역은 비교하지 않음)"""
+    import re
+
+    views = []
+    for attrs, body in re.findall(r"<sheetView\b([^>]*?)(?:/>|>(.*?)</sheetView>)", xml, flags=re.S):
+        pane = re.search(r"<pane\b([^>]*?)/?>", body)
+        views.append((xml_attrs(attrs), xml_attrs(pane.group(1)) if pane else None))
+    return views
+
+def part_rels(zf, part):
+    """패키지 파트의 내부 관계 {관계 ID: (관계 유형, 대상 파트 경로)}"""
+    import re
+    import posixpath
+
+    rels_path = posixpath.join(posixpath.dirname(part), "_rels", posixpath.basename(part) + ".rels")
+    try:
+        xml = zf.read(rels_path).decode("utf-8")
+    except KeyError:
+        return {}
+    rels = {}
+    for attrs in re.findall(r"<Relationship\b([^>]*?)/?>", xml):
+        attrs = xml_attrs(attrs)
+        target = attrs.get("Target", "")
+        if attrs.get("TargetMode") == "External":
+            continue
+        path = target.lstrip("/") if target.startswith("/") else posixpath.normpath(
+            posixpath.join(posixpath.dirname(part), target))
+        rels[attrs.get("Id")] = (attrs.get("Type", "").rsplit("/", 1)[-1], path)
+    return rels
+
+def sheet_images(zf, member):
+    """시트에 고정된 이미지 [(시작 열, 시작 행, 폭 EMU, 높이 EMU, 이미지 SHA-256, 이미지 bytes 크기)]"""
+    import re
+    import hashlib
+
+    images = []
+    for kind, path in part_rels(zf, member).values():
+        if kind != "drawing":
+            continue
+        media = part_rels(zf, path)
+        xml = zf.read(path).decode("utf-8")
+        # openpyxl 은 xdr 접두사 없이(기본 네임스페이스) 저장하므로 접두사는 선택
+        for m in re.finditer(r"<((?:xdr:)?\w+Anchor)\b.*?</\1>", xml, flags=re.S):
+            anchor = m.group(0)
+            start = re.search(r"<(?:xdr:)?from>.*?<(?:xdr:)?col>(\d+)</(?:xdr:)?col>.*?<(?:xdr:)?row>(\d+)</(?:xdr:)?row>",
+                              anchor, flags=re.S)
+            ext = re.search(r'<(?:xdr:)?ext\b[^>]*cx="(\d+)"[^>]*cy="(\d+)"', anchor) or \
+                re.search(r'<a:ext\b[^>]*cx="(\d+)"[^>]*cy="(\d+)"', anchor)
+            blip = re.search(r'<a:blip\b[^>]*r:embed="([^"]+)"', anchor)
+            data = zf.read(media[blip.group(1)][1]) if blip and blip.group(1) in media else None
+            images.append((
+                int(start.group(1)) + 1 if start else None, int(start.group(2)) + 1 if start else None,
+                int(ext.group(1)) if ext else None, int(ext.group(2)) if ext else None,
+                hashlib.sha256(data).hexdigest() if data is not None else None,
+                len(data) if data is not None else None,
+            ))
+    return sorted(images, key=str)
+
+class SheetInfo:
+    """read_only 워크시트가 제공하지 않는 시트 수준 정보"""
+
+    def __init__(self, zf, member, names):
+        from xlsx_preview import sheet_layout
+
+        self.widths, self.heights, merges, self.breaks = sheet_layout(zf, member)
+        self.merges = set(merges)
+        xml = zf.read(member).decode("utf-8")
+        self.print = print_settings(xml, names)
+        self.views = sheet_views(xml)
+        self.images = sheet_images(zf, member)
+
+# ---------- 비교 ----------
+class WorkbookDiff:
+    """두 워크북의 차이 목록을 만듭니다. max_diffs 에 이르면 비교를 멈춥니다."""
+
+    def __init__(self, max_diffs=None):
+        self.max_diffs = max_diffs
+        self.diffs = []
+        self.style_equal = {}
+
+    @property
+    def full(self):
+        return self.max_diffs is not None and len(self.diffs) >= self.max_diffs
+
+    def add(self, sheet, where, kind, a, b):
+        if not self.full:
+            self.diffs.append({"sheet": sheet, "where": where, "kind": kind, "a": a, "b": b})
+
+    def compare_styles(self, cell_a, cell_b):
+        """스타일 ID 쌍 단위로 해석된 스타일을 비교합니다. 다른 항목 이름 목록 반환."""
+        key = (getattr(cell_a, "_style_id", 0), getattr(cell_b, "_style_id", 0))
+        if key not in self.style_equal:
+            parts = []
+            for part in STYLE_PARTS:
+                if style_part(cell_a, part) != style_part(cell_b, part):
+                    parts.append(part)
+            if number_format(cell_a) != number_format(cell_b):
+                parts.append("number_format")
+            self.style_equal[key] = parts
+        return self.style_equal[key]
+
+    def compare_cells(self, title, r, row_a, row_b, width):
+        from itertools import zip_longest
+        from openpyxl.utils import get_column_letter
+
+        for c, (cell_a, cell_b) in enumerate(zip_longest(row_a or (), row_b or ()), start=1):
+            if c > width or self.full:
+                break
+            value_a = getattr(cell_a, "value", None)
+            value_b = getattr(cell_b, "value", None)
+            parts = self.compare_styles(cell_a, cell_b)
+            if value_a == value_b and not parts:
+                continue
+            ref = f"{get_column_letter(c)}{r}"
+            if value_a != value_b:
+                is_formula = any(isinstance(v, str) and v.startswith("=") for v in (value_a, value_b))
+                self.add(title, ref, "formula" if is_formula else "value", value_a, value_b)
+            for part in parts:
+                self.add(title, ref, part, style_repr(cell_a, part), style_repr(cell_b, part))
+
+    def compare_sheet(self, title, ws_a, ws_b, info_a, info_b):
+        from itertools import zip_longest
+        from openpyxl.utils import get_column_letter
+
+        # 1) 셀 (두 시트를 같은 행끼리 나란히 스트리밍)
+        width = max(ws_a.max_column or 1, ws_b.max_column or 1)
+        height = max(ws_a.max_row or 1, ws_b.max_row or 1)
+        rows_a = ws_a.iter_rows(min_row=1, min_col=1, max_col=width, max_row=height)
+        rows_b = ws_b.iter_rows(min_row=1, min_col=1, max_col=width, max_row=height)
+        for r, (row_a, row_b) in enumerate(zip_longest(rows_a, rows_b), start=1):
+            if self.full:
+                return
+            self.compare_cells(title, r, row_a, row_b, width)
+
+        # 2) 병합, 행 높이, 열 너비, 행 나눔, 인쇄 설정, 틀 고정/보기, 이미지
+        fmt_range = lambda b: f"{get_column_letter(b[0])}{b[1]}:{get_column_letter(b[2])}{b[3]}"
+        for bounds in sorted(info_a.merges - info_b.merges, key=lambda b: (b[1], b[0])):
+            self.add(title, fmt_range(bounds), "merge", "merged", None)
+        for bounds in sorted(info_b.merges - info_a.merges, key=lambda b: (b[1], b[0])):
+            self.add(title, fmt_range(bounds), "merge", None, "merged")
+        for r in sorted(set(info_a.heights) | set(info_b.heights)):
+            if info_a.heights.get(r) != info_b.heights.get(r):
+                self.add(title, f"row {r}", "row_height", info_a.heights.get(r), info_b.heights.get(r))
+        for c in sorted(set(info_a.widths) | set(info_b.widths)):
+            if info_a.widths.get(c) != info_b.widths.get(c):
+                self.add(title, f"column {get_column_letter(c)}", "column_width",
+                         info_a.widths.get(c), info_b.widths.get(c))
+        if info_a.breaks != info_b.breaks:
+            self.add(title, "rowBreaks", "print", info_a.breaks, info_b.breaks)
+        for key in sorted(set(info_a.print) | set(info_b.print)):
+            if info_a.print.get(key) != info_b.print.get(key):
+                self.add(title, key, "print", info_a.print.get(key), info_b.print.get(key))
+        panes_a, panes_b = [pane for _, pane in info_a.views], [pane for _, pane in info_b.views]
+        if panes_a != panes_b:
+            self.add(title, "pane", "freeze_panes", panes_a, panes_b)
+        views_a, views_b = [view for view, _ in info_a.views], [view for view, _ in info_b.views]
+        if views_a != views_b:
+            self.add(title, "sheetView", "view", views_a, views_b)
+        if info_a.images != info_b.images:
+            self.add(title, "drawing", "image", info_a.images, info_b.images)
+
+def style_part(cell, part):
+    if cell is None or not getattr(cell, "_style_id", 0):
+        return DEFAULT_STYLE[part]
+    return getattr(cell, part)
+
+def number_format(cell):
+    if cell is None or not getattr(cell, "_style_id", 0):
+        return "General"
+    return cell.number_format
+
+def style_repr(cell, part):
+    if part == "number_format":
+        return number_format(cell)
+    from openpyxl.xml.functions import tostring
+
+    return tostring(style_part(cell, part).to_tree()).decode("utf-8")
+
+class _Defaults(dict):
+    """스타일이 없는 셀의 기본 스타일 (openpyxl 기본 객체, 처음 필요할 때 생성)"""
+
+    def __missing__(self, part):
+        from openpyxl.styles import Alignment, Border, PatternFill, Protection
+        from openpyxl.styles.fonts import DEFAULT_FONT
+
+        defaults = {"font": DEFAULT_FONT, "fill": PatternFill(), "border": Border(),
+                    "alignment": Alignment(), "protection": Protection()}
+        self.update(defaults)
+        return defaults[part]
+
+DEFAULT_STYLE = _Defaults()
+
+def diff_workbooks(path_a, path_b, max_diffs=None):
+    """두 xlsx(경로 또는 bytes) 의 구조 차이 목록. 같으면 빈 목록."""
+    import io
+    import zipfile
+    import openpyxl
+    from xlsx_package import sheet_members
+
+    def open_source(source):
+        return io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+
+    diff = WorkbookDiff(max_diffs)
+    with zipfile.ZipFile(open_source(path_a)) as zf_a, zipfile.ZipFile(open_source(path_b)) as zf_b:
+        wb_a = openpyxl.load_workbook(open_source(path_a), read_only=True)
+        wb_b = openpyxl.load_workbook(open_source(path_b), read_only=True)
+        try:
+            if wb_a.sheetnames != wb_b.sheetnames:
+                diff.add(None, "workbook", "sheets", wb_a.sheetnames, wb_b.sheetnames)
+            members_a, members_b = sheet_members(zf_a), sheet_members(zf_b)
+            names_a, names_b = defined_names(zf_a), defined_names(zf_b)
+            for title in [t for t in wb_a.sheetnames if t in wb_b.sheetnames]:
+                if diff.full:
+                    break
+                info_a = SheetInfo(zf_a, members_a[title], names_a.get(wb_a.sheetnames.index(title), {}))
+                info_b = SheetInfo(zf_b, members_b[title], names_b.get(wb_b.sheetnames.index(title), {}))
+                diff.compare_sheet(title, wb_a[title], wb_b[title], info_a, info_b)
+        finally:
+            wb_a.close()
+            wb_b.close()
+    return diff.diffs
+
+def format_diff(d):
+    where = f"{d['sheet']}!{d['where']}" if d["sheet"] else d["where"]
+    return f"{where} {d['kind']}: {d['a']!r} → {d['b']!r}"
+
+def main():
+    """메인 함수 - 명령줄 인자 처리"""
+    import os
+    import argparse
+
+    parser = argparse.ArgumentParser(description='두 xlsx 워크북의 구조 비교')
+    parser.add_argument('a', help='기준 xlsx')
+    parser.add_argument('b', help='비교 xlsx')
+    parser.add_argument('--max-diffs', type=int, default=100, help='최대 차이 수 (0: 제한 없음)')
+    parser.add_argument('--json', action='store_true', help='차이 목록을 JSON 으로 출력')
+    args = parser.parse_args()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    if script_dir not in sys.path:
+        sys.path.insert(0, script_dir)
+
+    diffs = diff_workbooks(args.a, args.b, args.max_diffs or None)
+    if args.json:
+        print(json.dumps({"identical": not diffs, "diffs": diffs}, ensure_ascii=False, default=str, indent=2))
+    elif diffs:
+        for d in diffs:
+            print(format_diff(d))
+        print(f"차이 {len(diffs)}건{' 이상' if args.max_diffs and len(diffs) >= args.max_diffs else ''}")
+    else:
+        print("동일")
+    return 1 if diffs else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
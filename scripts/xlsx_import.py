@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+견적/청구 엑셀 가져오기 (xlsx → JSONL 렌더 payload)
+거래처가 보내온 견적서, 작업 내역, 건축주 목록 같은 엑셀 파일을 render_invoice 가 받는
+payload({client, project, ..., "header": {...}, "items": [...]}) 로 변환합니다.
+
+- 워크북은 read_only 스트리밍 모드로 읽고, 결과도 한 줄씩 바로 기록하므로
+  10만 행 파일에서도 메모리 사용량이 일정합니다.
+- 머리글 행은 앞쪽 행을 훑어 찾고, 열 이름은 매핑 파일(templates/import_mapping.json)의
+  별칭 목록으로 title/desc/spec/qty/unit/unit_price/note 에 대응시킵니다.
+  ("단가(원)", "내    용", "수량*" 처럼 공백/괄호/기호가 섞여도 같은 이름으로 봅니다.)
+- 머리글 행 위의 "건축주 : 김철수" 같은 행이나 "견적서 정보" 같은 키-값 시트는 헤더 값이 됩니다.
+- 청구서번호 같은 group_by 열이 있으면 값이 바뀔 때마다 새 payload 를 시작합니다.
+- "1,200", "₩3,000,000원", "(1,000)" 같은 숫자 문자열은 배치 단위로 한꺼번에 정규화합니다.
+  변환할 수 없는 값("1/2" 등)은 원래 값 그대로 남겨 payload 검증(invoice_schema)에서 거부되게 합니다.
+
+사용 예:
+  python xlsx_import.py --input 견적서.xlsx --output payloads.jsonl
+  python xlsx_import.py --input 작업내역.xlsx --mapping my_mapping.json --header '{"client": "김철수"}'
+"""
+
+import os
+import sys
+import json
+from functools import lru_cache
+
+# openpyxl, re 는 실제로 변환하는 함수 안에서 지연 임포트합니다.
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MAPPING = os.path.join(SCRIPT_DIR, "templates", "import_mapping.json")
+BATCH_ROWS = 1000
+MAX_REPORTED_ERRORS = 50
+
+# ---------- 매핑 ----------
+def load_mapping(path=None):
+    """매핑 파일(JSON/YAML) 로드"""
+    from build_template import load_spec
+    return load_spec(path or DEFAULT_MAPPING)
+
+def normalize_label(text):
+    """"단가(원)" / "내    용" / "수량*" / "건 축 주 :" → 비교용 이름"""
+    import re
+    return re.sub(r"\(.*?\)|\[.*?\]|[\s*:·.,_\-/]", "", str(text)).lower()
+
+class ColumnMatcher:
+    """열 이름 → (구분, 필드). 구분은 "items" 또는 "header"."""
+
+    def __init__(self, mapping):
+        self.aliases = {}
+        for kind in ("header", "items"):
+            for field, names in mapping.get(kind, {}).items():
+                for name in [field, *names]:
+                    self.aliases.setdefault(normalize_label(name), (kind, field))
+        # 긴 별칭부터 접두어 비교 ("단가(원)" 은 위에서 정규화됨, "단가합계" 같은 경우는 접두어로)
+        self.prefixes = sorted(self.aliases, key=len, reverse=True)
+
+    def match(self, label):
+        if label is None or isinstance(label, (int, float)):
+            return None
+        key = normalize_label(label)
+        if not key:
+            return None
+        if key in self.aliases:
+            return self.aliases[key]
+        for alias in self.prefixes:
+            if len(alias) >= 2 and key.startswith(alias):
+                return self.aliases[alias]
+        return None
+
+def match_header_row(row, matcher):
+    """행의 각 열을 필드에 대응시킵니다. {열 번호: (구분, 필드)} (같은 필드는 첫 열만)"""
+    columns, seen = {}, set()
+    for c, value in enumerate(row):
+        target = matcher.match(value)
+        if target is not None and target not in seen:
+            columns[c] = target
+            seen.add(target)
+    return columns
+
+def key_values(row, matcher):
+    """"건축주 | 김철수" 또는 "건축주 : 김철수" 형태의 헤더 값을 추출합니다."""
+    found = {}
+    cells = [v for v in row if v is not None and str(v).strip() != ""]
+    for i, value in enumerate(cells):
+        if isinstance(value, str) and ":" in value:
+            label, _, rest = value.partition(":")
+            target = matcher.match(label)
+            if target and target[0] == "header" and rest.strip():
+                found[target[1]] = rest.strip()
+                continue
+        target = matcher.match(value)
+        if target and target[0] == "header" and i + 1 < len(cells) and matcher.match(cells[i + 1]) is None:
+            found.setdefault(target[1], cells[i + 1])
+    return found
+
+# ---------- 숫자 정규화 ----------
+# 숫자 앞뒤에만 허용하는 통화 기호/코드와 단위 (숫자 사이에 다른 문자가 있으면 거부)
+CURRENCY_PREFIX = r"(?:₩|￦|\$|€|¥|£|KRW|USD|EUR|JPY)"
+UNIT_SUFFIX = r"(?:원|KRW|USD|EUR|JPY|[A-Za-z가-힣㎡㎥]{1,4}[²³]?)"
+NUMBER_PATTERN = (
+    r"(?P<sign>[+-]?)\s*" + CURRENCY_PREFIX + r"?\s*(?P<sign2>[+-]?)"
+    r"(?P<digits>(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?|\.\d+)"
+    r"\s*" + UNIT_SUFFIX + r"?"
+)
+
+@lru_cache(maxsize=4096)
+def parse_number(text):
+    """숫자 문자열 → int/float. 비어 있거나 "-" 면 None, 해석할 수 없으면 ValueError.
+
+    "1,200", "₩3,000,000원", "(1,000)", "12 EA" 처럼 앞뒤 통화/단위, 천 단위 쉼표(3자리 묶음),
+    회계식 괄호만 벗겨 내고, "1/2", "3 x 4", "1e3", "v2.1" 처럼 숫자 사이에 다른 문자가 남으면 거부합니다.
+    소수점이 없으면 int() 로 읽어 큰 정수도 자릿수를 잃지 않습니다.
+    """
+    import re
+
+    s = text.strip()
+    if s in ("", "-", "—"):
+        return None
+    negative = s.startswith("(") and s.endswith(")")
+    if negative:
+        s = s[1:-1].strip()
+    m = re.fullmatch(NUMBER_PATTERN, s, re.IGNORECASE)
+    if m is None or (m["sign"] and m["sign2"]) or (negative and (m["sign"] or m["sign2"])):
+        raise ValueError(text)
+    digits = m["digits"].replace(",", "")
+    number = int(digits) if "." not in digits else float(digits)
+    return -number if negative or (m["sign"] or m["sign2"]) == "-" else number
+
+def coerce_number(value):
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else value
+    if isinstance(value, int):
+        return value
+    return parse_number(str(value))
+
+def normalize_batch(batch, fields, stats):
+    """행 배치의 숫자 필드를 한꺼번에 정규화합니다.
+
+    변환할 수 없는 값은 원래 문자열을 그대로 두고 오류에 기록합니다. 수량·단가가 조용히
+    빠지지 않도록, 그런 payload 는 렌더링 전에 invoice_schema 검증에서 거부됩니다.
+    """
+    for row_number, item in batch:
+        for field in fields:
+            if field not in item:
+                continue
+            try:
+                item[field] = coerce_number(item[field])
+            except ValueError:
+                record_error(stats, row_number, f"{field} 숫자 변환 실패: {item[field]!r}")
+
+def record_error(stats, row_number, message):
+    stats["errors"] += 1
+    if len(stats["error_samples"]) < MAX_REPORTED_ERRORS:
+        stats["error_samples"].append({"row": row_number, "error": message})
+
+# ---------- 스트리밍 변환 ----------
+def cell_text(value):
+    """문자열 필드 값: 앞뒤 공백 제거, 날짜는 ISO 형식"""
+    from datetime import date, datetime
+
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.date().isoformat() if value.time() == datetime.min.time() else value.isoformat(" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+def sheet_events(ws, matcher, mapping, base_header, stats):
+    """시트 하나에서 ("begin", 헤더) / ("item", 항목) / ("end", None) 이벤트를 스트리밍합니다.
+
+    항목 머리글 행이 없으면 키-값 헤더만 모아 ("header", 값) 이벤트 하나를 냅니다.
+    """
+    ws.reset_dimensions()  # 일부 파일은 dimension 정보가 잘못되어 있어 끝까지 읽도록 함
+    rows = ws.iter_rows(values_only=True)
+    preamble = {}
+    columns = None
+    scan_rows = mapping.get("header_scan_rows", 20)
+    min_matched = mapping.get("min_matched_columns", 2)
+    required = mapping.get("required", ["title"])
+
+    for row_number, row in enumerate(rows, start=1):
+        candidate = match_header_row(row, matcher)
+        item_fields = {field for kind, field in candidate.values() if kind == "items"}
+        if len(item_fields) >= min_matched and all(field in item_fields for field in required):
+            columns = candidate
+            break
+        preamble.update(key_values(row, matcher))
+        if row_number >= scan_rows:
+            break
+    if columns is None:
+        if preamble:
+            yield "header", preamble
+        return
+
+    numbers = mapping.get("numbers", ["qty", "unit_price"])
+    skip_titles = {normalize_label(t) for t in mapping.get("skip_titles", [])}
+    group_by = mapping.get("group_by")
+    group_col = next((c for c, target in columns.items() if target == ("header", group_by)), None)
+    header = {**base_header, **preamble}
+    current_group = None
+    open_payload = False
+    batch = []
+
+    def flush():
+        normalize_batch(batch, numbers, stats)
+        for _, item in batch:
+            yield "item", item
+        batch.clear()
+
+    for row_number, row in enumerate(rows, start=row_number + 1):
+        item, row_header = {}, {}
+        for c, (kind, field) in columns.items():
+            value = row[c] if c < len(row) else None
+            if kind == "items":
+                item[field] = value if field in numbers else cell_text(value)
+            elif value is not None and cell_text(value):
+                row_header[field] = cell_text(value)
+        if all(v in (None, "") for v in item.values()):
+            continue
+        title = item.get("title", "")
+        if title and normalize_label(title) in skip_titles:
+            stats["skipped"] += 1
+            continue
+        missing = [field for field in required if not item.get(field)]
+        if missing:
+            stats["skipped"] += 1
+            record_error(stats, row_number, f"필수 값 없음: {', '.join(missing)}")
+            continue
+
+        group = row_header.get(group_by) if group_col is not None else None
+        if not open_payload or (group is not None and group != current_group):
+            if open_payload:
+                yield from flush()
+                yield "end", None
+            yield "begin", {**header, **row_header}
+            open_payload = True
+            current_group = group
+        batch.append((row_number, item))
+        stats["rows"] += 1
+        if len(batch) >= BATCH_ROWS:
+            yield from flush()
+
+    if open_payload:
+        yield from flush()
+        yield "end", None
+
+def import_events(source, mapping=None, sheet=None, header=None, stats=None):
+    """워크북 전체의 payload 이벤트. 키-값 시트의 헤더 값은 뒤따르는 항목 시트에 적용됩니다."""
+    import openpyxl
+
+    mapping = mapping or load_mapping()
+    matcher = ColumnMatcher(mapping)
+    stats = stats if stats is not None else new_stats()
+    base_header = dict(header or {})
+    wb = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        for ws in wb.worksheets:
+            for event, value in sheet_events(ws, matcher, mapping, base_header, stats):
+                if event == "header":
+                    base_header.update(value)
+                elif sheet is None or ws.title == sheet:
+                    yield event, value
+    finally:
+        wb.close()
+
+def new_stats():
+    return {"payloads": 0, "rows": 0, "skipped": 0, "errors": 0, "error_samples": []}
+
+def payload_prefix(header):
+    """payload 의 items 앞부분 JSON (최상위 플레이스홀더 키 + excel_generator 용 header)"""
+    head = {**header, "header": header}
+    return json.dumps(head, ensure_ascii=False, default=str)[:-1] + ', "items": ['
+
+def write_jsonl(source, out, mapping=None, sheet=None, header=None):
+    """payload 를 JSONL 로 스트리밍 기록합니다. 항목을 메모리에 모으지 않습니다. 통계 dict 반환."""
+    stats = new_stats()
+    first = True
+    for event, value in import_events(source, mapping, sheet, header, stats):
+        if event == "begin":
+            out.write(payload_prefix(value))
+            first = True
+        elif event == "item":
+            out.write(("" if first else ", ") + json.dumps(value, ensure_ascii=False, default=str))
+            first = False
+        elif event == "end":
+            out.write("]}\n")
+            stats["payloads"] += 1
+    return stats
+
+def iter_payloads(source, mapping=None, sheet=None, header=None):
+    """payload dict 를 하나씩 반환합니다 (라이브러리용, payload 하나는 메모리에 올라감)."""
+    payload = None
+    for event, value in import_events(source, mapping, sheet, header):
+        if event == "begin":
+            payload = {**value, "header": dict(value), "items": []}
+        elif event == "item":
+            payload["items"].append(value)
+        elif event == "end":
+            yield payload
+
+def main():
+    """메인 함수 - 명령줄 인자 처리"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='견적/청구 엑셀을 JSONL 렌더 payload 로 변환')
+    parser.add_argument('--input', required=True, help='가져올 xlsx 파일')
+    parser.add_argument('--output', help='JSONL 저장 경로 (기본: 표준 출력)')
+    parser.add_argument('--mapping', help='열 매핑 파일 (JSON/YAML, 기본: templates/import_mapping.json)')
+    parser.add_argument('--sheet', help='항목을 읽을 시트 이름 (기본: 머리글이 있는 모든 시트)')
+    parser.add_argument('--header', help='기본 헤더 값 JSON (파일 경로 또는 JSON 문자열)')
+    args = parser.parse_args()
+
+    if SCRIPT_DIR not in sys.path:
+        sys.path.insert(0, SCRIPT_DIR)
+
+    try:
+        from invoice_template_renderer import load_json_arg
+
+        mapping = load_mapping(args.mapping)
+        header = load_json_arg(args.header) if args.header else None
+        if args.output:
+            tmp_path = f"{args.output}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as out:
+                stats = write_jsonl(args.input, out, mapping, args.sheet, header)
+            os.replace(tmp_path, args.output)
+        else:
+            stats = write_jsonl(args.input, sys.stdout, mapping, args.sheet, header)
+        result = {"success": True, "output_path": args.output, **stats}
+    except Exception as e:
+        result = {"success": False, "error": str(e)}
+
+    print(json.dumps(result, ensure_ascii=False), file=sys.stdout if args.output else sys.stderr)
+    return 0 if result["success"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
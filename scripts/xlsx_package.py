@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+xlsx 패키지(zip) 공용 도우미
+증분 패치(invoice_patch), 미리보기(xlsx_preview), 구조 비교(xlsx_diff)가 함께 쓰는
+시트 이름 → 시트 XML 경로 조회와 bytes 해시를 모아 둡니다.
+openpyxl 없이 zip 과 workbook.xml 만 읽으므로 워크북 전체를 열지 않습니다.
+"""
+
+# xml.etree, posixpath, hashlib 는 실제로 사용하는 함수 안에서 지연 임포트합니다.
+
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+def sha256_bytes(data):
+    import hashlib
+    return hashlib.sha256(data).hexdigest()
+
+def sheet_members(zf):
+    """시트 이름 → zip 안의 시트 XML 경로"""
+    import posixpath
+    import xml.etree.ElementTree as ET
+
+    workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+    rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    targets = {}
+    for rel in rels.findall(f"{{{PKG_REL_NS}}}Relationship"):
+        target = rel.get("Target")
+        targets[rel.get("Id")] = target.lstrip("/") if target.startswith("/") else posixpath.join("xl", target)
+    return {
+        sheet.get("name"): targets[sheet.get(f"{{{REL_NS}}}id")]
+        for sheet in workbook.iter(f"{{{MAIN_NS}}}sheet")
+    }
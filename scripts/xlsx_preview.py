@@ -0,0 +1,702 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+청구서 미리보기 (xlsx → HTML / PNG)
+렌더링된 청구서를 내려받아 열지 않고도 확인할 수 있도록 HTML 표로 변환합니다.
+셀은 시트 XML 에서 직접 읽고(스타일·공유 문자열만 openpyxl read_only 워크북 사용),
+병합/테두리/숫자 형식/열 너비/행 높이를 반영합니다.
+openpyxl 이 저장한 파일에는 수식 결과값이 없으므로 청구서에 쓰이는 단순 수식
+(사칙연산, SUM, 다른 시트 참조)은 직접 계산해 표시하고, 계산할 수 없는 수식은
+파일에 저장된 결과값(없으면 빈 셀)으로 표시합니다.
+
+결과는 (출력 파일 SHA-256, 옵션) 으로 캐시됩니다. 메모리 LRU 에 더해
+INVOICE_PREVIEW_CACHE_DIR 환경 변수를 지정하면 디스크 캐시를 프로세스 간에 공유합니다.
+첫 페이지 PNG 는 html_to_pdf 의 WeasyPrint 설정을 사용합니다 (선택 사항).
+
+사용 예:
+  python xlsx_preview.py --input 청구서_결과.xlsx --output preview.html
+  python xlsx_preview.py --input 청구서_결과.xlsx --pages 1 --png preview.png
+"""
+
+import os
+import sys
+import json
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+# openpyxl, re, zipfile 은 실제로 변환하는 함수 안에서 지연 임포트합니다.
+
+MAX_ENTRIES = 32
+DEFAULT_COLUMN_WIDTH = 8.43
+DEFAULT_ROW_HEIGHT = 15
+FONT_FAMILY = '"Malgun Gothic", "Apple SD Gothic Neo", "Nanum Gothic", sans-serif'
+
+BORDER_CSS = {
+    "hair": "1px solid", "thin": "1px solid", "dotted": "1px dotted", "dashed": "1px dashed",
+    "dashDot": "1px dashed", "dashDotDot": "1px dotted", "mediumDashed": "2px dashed",
+    "mediumDashDot": "2px dashed", "mediumDashDotDot": "2px dotted", "slantDashDot": "2px dashed",
+    "medium": "2px solid", "thick": "3px solid", "double": "3px double",
+}
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+# ---------- 시트 XML 정보 (read_only 워크시트가 제공하지 않는 항목) ----------
+def sheet_layout(zf, member):
+    """시트 XML 에서 열 너비, 행 높이, 병합 범위, 행 나눔을 읽습니다."""
+    return xml_layout(zf.read(member).decode("utf-8"))
+
+def xml_layout(xml):
+    """이미 읽은 시트 XML 로 sheet_layout 과 같은 (열 너비, 행 높이, 병합 범위, 행 나눔)"""
+    import re
+    from openpyxl.utils.cell import range_boundaries
+
+    widths = {}
+    for m in re.finditer(r"<col\b([^>]*)/>", xml):
+        attrs = dict(re.findall(r'(\w+)="([^"]*)"', m.group(1)))
+        if "width" in attrs:
+            for c in range(int(attrs["min"]), int(attrs["max"]) + 1):
+                widths[c] = float(attrs["width"])
+    heights = {}
+    for m in re.finditer(r"<row\b([^>]*?)/?>", xml):
+        attrs = dict(re.findall(r'(\w+)="([^"]*)"', m.group(1)))
+        if "ht" in attrs:
+            heights[int(attrs["r"])] = float(attrs["ht"])
+    merges = [range_boundaries(ref) for ref in re.findall(r'<mergeCell\b[^>]*\bref="([^"]+)"', xml)]
+    breaks = []
+    row_breaks = re.search(r"<rowBreaks\b.*?</rowBreaks>", xml, flags=re.S)
+    if row_breaks:
+        breaks = sorted(int(v) for v in re.findall(r'<brk\b[^>]*\bid="(\d+)"', row_breaks.group(0)))
+    return widths, heights, merges, breaks
+
+# ---------- 셀 값 ----------
+ROW_PATTERN = r"<row\b([^>]*?)(?:/>|>(.*?)</row>)"
+CELL_PATTERN = r'<c\b(?=[^>]*?\br="([A-Z]+)\d+")([^>]*?)(?:/>|>(.*?)</c>)'
+
+def cell_text(value, kind, shared_strings):
+    """<v> 내용 → 셀 값 (셀 종류 t 속성에 따라)"""
+    from xml.sax.saxutils import unescape
+
+    if kind == "s":
+        return shared_strings[int(value)]
+    if kind == "b":
+        return value == "1"
+    if kind in ("str", "e", "inlineStr"):
+        return unescape(value)
+    if kind == "d":
+        from openpyxl.utils.datetime import from_ISO8601
+        return from_ISO8601(value)
+    return float(value) if any(ch in value for ch in ".eE") else int(value)
+
+def sheet_cells(xml, shared_strings, covered=(), last_row=None):
+    """시트 XML 의 셀을 직접 읽습니다 (openpyxl read_only 셀 객체를 만들지 않음).
+
+    반환: (행 목록 [(행, [(열, 값, 스타일 번호), ...])], 값 {(행, 열): 값}, 저장된 수식 결과 {(행, 열): 값})
+    covered(병합으로 가려진 셀)는 행 목록에서 빠지고 값만 남습니다. 수식은 "=..." 문자열이며
+    공유 수식은 기준 셀의 수식을 해당 셀로 옮겨 적습니다. 날짜 변환은 숫자 형식을 아는 호출자가 합니다.
+    """
+    import re
+    from xml.sax.saxutils import unescape
+    from openpyxl.utils.cell import column_index_from_string
+
+    row_attr = re.compile(r'\br="(\d+)"')
+    cell_tag = re.compile(CELL_PATTERN, re.S)
+    style_attr = re.compile(r'\bs="(\d+)"')
+    type_attr = re.compile(r'\bt="(\w+)"')
+    formula_tag = re.compile(r"<f\b([^>]*?)(?:/>|>(.*?)</f>)", re.S)
+    value_tag = re.compile(r"<v>(.*?)</v>", re.S)
+    text_tag = re.compile(r"<t\b[^>]*>(.*?)</t>", re.S)
+    shared_formulas = {}
+
+    rows, values, results = [], {}, {}
+    for row in re.finditer(ROW_PATTERN, xml, re.S):
+        r = int(row_attr.search(row.group(1)).group(1))
+        if last_row is not None and r > last_row:
+            break
+        if not row.group(2):
+            continue
+        cells = []
+        for cell in cell_tag.finditer(row.group(2)):
+            column, attrs, content = cell.groups()
+            c = column_index_from_string(column)
+            if not content and (r, c) in covered:
+                continue
+            style = style_attr.search(attrs)
+            style_id = int(style.group(1)) if style else 0
+            value = None
+            if content:
+                kind = type_attr.search(attrs)
+                kind = kind.group(1) if kind else "n"
+                formula = formula_tag.search(content)
+                v = value_tag.search(content)
+                if formula:
+                    value = formula_value(formula, f"{column}{r}", shared_formulas)
+                    if v and v.group(1):
+                        results[(r, c)] = cell_text(v.group(1), kind, shared_strings)
+                elif kind == "inlineStr":
+                    value = unescape("".join(text_tag.findall(content)))
+                elif v:
+                    value = cell_text(v.group(1), kind, shared_strings)
+                if value is not None:
+                    values[(r, c)] = value
+            if (r, c) in covered or value is None and not style_id:
+                continue
+            cells.append((c, value, style_id))
+        if cells:
+            rows.append((r, cells))
+    return rows, values, results
+
+def formula_value(m, coordinate, shared_formulas):
+    """<f> 요소 → "=수식" (공유 수식이면 기준 셀에서 이 셀로 옮긴 수식)"""
+    import re
+    from xml.sax.saxutils import unescape
+    from openpyxl.formula.translate import Translator
+
+    attrs, text = m.group(1), unescape(m.group(2) or "")
+    if 't="shared"' not in attrs:
+        return f"={text}"
+    si = re.search(r'\bsi="(\d+)"', attrs).group(1)
+    if text:
+        shared_formulas[si] = (f"={text}", coordinate)
+        return f"={text}"
+    if si not in shared_formulas:
+        return None
+    formula, origin = shared_formulas[si]
+    return Translator(formula, origin).translate_formula(coordinate)
+
+# ---------- 숫자 형식 ----------
+@lru_cache(maxsize=256)
+def split_sections(fmt):
+    """세미콜론(따옴표 밖)으로 형식 구역을 나눕니다."""
+    sections, buf, quoted = [], [], False
+    for ch in fmt:
+        if ch == '"':
+            quoted = not quoted
+        if ch == ";" and not quoted:
+            sections.append("".join(buf))
+            buf = []
+        else:
+            buf.append(ch)
+    sections.append("".join(buf))
+    return tuple(sections)
+
+def format_general(value):
+    if isinstance(value, float):
+        return f"{value:.10g}" if not value.is_integer() else str(int(value))
+    return str(value)
+
+def format_number(value, fmt):
+    """#,##0 / 0.00 / 0% / "원" 리터럴 / [$₩-412] 통화 등 자주 쓰이는 숫자 형식"""
+    from decimal import Decimal, ROUND_HALF_UP
+
+    if not fmt or fmt == "General":
+        return format_general(value)
+    sections = split_sections(fmt)
+    section = sections[0]
+    negative = value < 0
+    if negative and len(sections) > 1:
+        section, value = sections[1], -value
+        negative = False
+    elif value == 0 and len(sections) > 2:
+        section = sections[2]
+    if section == "General":
+        return ("-" if negative else "") + format_general(abs(value))
+
+    compiled = compile_section(section)
+    if isinstance(compiled, str):
+        return compiled
+    percent, decimals, comma, int_zero, dec_hash, head, tail = compiled
+    if percent:
+        value *= 100
+    rounded = Decimal(str(abs(value))).quantize(Decimal(1).scaleb(-decimals), ROUND_HALF_UP)  # 엑셀식 반올림
+    text = f"{rounded:{',' if comma else ''}.{decimals}f}"
+    if not int_zero and text.startswith("0"):
+        text = text[1:]
+    if dec_hash and "." in text:
+        text = text.rstrip("0").rstrip(".")
+    return f"{'-' if negative else ''}{head}{text}{tail}"
+
+@lru_cache(maxsize=256)
+def compile_section(section):
+    """숫자 형식 구역 해석 (형식마다 한 번): 숫자 자리가 없으면 표시할 문자열, 있으면
+    (백분율, 소수 자릿수, 천단위 콤마, 정수부 0 자리, 소수부 # 자리, 앞 문자열, 뒤 문자열)"""
+    import re
+
+    section = re.sub(r"\[\$([^\]-]*)(?:-[^\]]*)?\]", r'"\1"', section)    # [$₩-412] → "₩"
+    section = re.sub(r"\[[^\]]*\]", "", section)                            # [Red], [>=100] 등
+    section = re.sub(r"_.", " ", section)
+    section = re.sub(r"\*.", "", section)
+
+    number = re.search(r"[#0?,]*\.?[#0?]+|[#0?][#0?,]*", section.replace('\\', ''))
+    if number is None:
+        return section.replace('"', "")
+    pattern = number.group(0)
+    int_part, _, dec_part = pattern.partition(".")
+    decimals = sum(1 for ch in dec_part if ch in "0#?")
+    head, _, tail = section.replace('\\', '').partition(pattern)
+    literal = lambda s: re.sub(r'"([^"]*)"', r"\1", s)
+    return ("%" in section, decimals, "," in int_part, "0" in int_part, "#" in dec_part, literal(head), literal(tail))
+
+def format_date(value, fmt):
+    """yyyy-mm-dd / yyyy"년" m"월" d"일" / hh:mm 등 날짜 형식"""
+    import re
+
+    tokens = re.findall(r'"[^"]*"|yyyy|yy|mmmm|mmm|mm|m|dd|d|hh|h|ss|s|AM/PM|.', re.sub(r"\[[^\]]*\]", "", fmt))
+    parts, after_hour = [], False
+    for i, tok in enumerate(tokens):
+        if tok.startswith('"'):
+            parts.append(tok[1:-1])
+        elif tok == "yyyy":
+            parts.append(f"{value.year:04d}")
+        elif tok == "yy":
+            parts.append(f"{value.year % 100:02d}")
+        elif tok in ("mm", "m"):
+            minute = after_hour or any(t in ("ss", "s") for t in tokens[i + 1:i + 3])
+            number = value.minute if minute and hasattr(value, "minute") else value.month
+            parts.append(f"{number:02d}" if tok == "mm" else str(number))
+        elif tok in ("mmmm", "mmm"):
+            parts.append(value.strftime("%B" if tok == "mmmm" else "%b"))
+        elif tok in ("dd", "d"):
+            parts.append(f"{value.day:02d}" if tok == "dd" else str(value.day))
+        elif tok in ("hh", "h"):
+            parts.append(f"{value.hour:02d}" if tok == "hh" else str(value.hour))
+        elif tok in ("ss", "s"):
+            parts.append(f"{value.second:02d}" if tok == "ss" else str(value.second))
+        elif tok == "AM/PM":
+            parts.append("AM" if value.hour < 12 else "PM")
+        elif tok != "\\":
+            parts.append(tok)
+        after_hour = tok in ("hh", "h") or (after_hour and tok == ":")
+    return "".join(parts)
+
+def format_value(value, fmt):
+    """셀 값을 숫자/날짜 형식에 맞춰 문자열로"""
+    from datetime import date, time
+
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (date, time)):
+        return format_date(value, fmt) if fmt and fmt != "General" else value.isoformat()
+    if isinstance(value, (int, float)):
+        return format_number(value, fmt)
+    return str(value)
+
+# ---------- 수식 계산 ----------
+class FormulaError(Exception):
+    """미리보기에서 지원하지 않는 수식"""
+
+class FormulaEvaluator:
+    """청구서 수식(사칙연산, SUM, 셀/범위/다른 시트 참조)을 계산합니다.
+
+    values(title) 는 시트 제목 → {(행, 열): 값}; 미리보기 시트 외의 시트는 참조될 때만 읽습니다.
+    results(title) 는 파일에 저장된 수식 결과값 {(행, 열): 값} 으로, 계산할 수 없는 수식에 대신 씁니다.
+    """
+
+    TOKEN = (r"\s*(?:(?P<num>\d+(?:\.\d+)?)|(?P<ref>(?:(?:'(?:[^']|'')+'|[^\s'!:(),+\-*/]+)!)?"
+             r"\$?[A-Z]{1,3}\$?\d+(?::\$?[A-Z]{1,3}\$?\d+)?)|(?P<func>[A-Z]+)\(|(?P<op>[-+*/(),]))")
+
+    def __init__(self, values, results=None):
+        self.values = values
+        self.results = results or (lambda sheet: {})
+        self.cache = {}
+        self.pending = set()
+        self.parsed = {}
+
+    def cell_value(self, sheet, r, c):
+        """셀 값 (수식이면 계산 결과, 실패하면 저장된 결과값 또는 None, 순환 참조는 None).
+
+        이월 합계처럼 긴 참조 사슬도 재귀하지 않도록, 참조하는 셀을 스택에 쌓아
+        의존 순서대로 계산하고 결과를 캐시합니다.
+        """
+        target = (sheet, r, c)
+        if target in self.cache or target in self.pending:
+            return self.cache.get(target)
+        stack = [target]
+        while stack:
+            key = stack[-1]
+            if key in self.cache:
+                stack.pop()
+                continue
+            value = self.values(key[0]).get(key[1:])
+            if not (isinstance(value, str) and value.startswith("=")):
+                self.cache[key] = value
+                stack.pop()
+                continue
+            if key not in self.pending:
+                self.pending.add(key)
+                deps = [d for d in self.dependencies(value, key[0]) if d not in self.cache and d not in self.pending]
+                if deps:
+                    stack.extend(deps)
+                    continue
+            try:
+                self.cache[key] = self.evaluate(value, key[0])
+            except Exception:
+                self.cache[key] = self.results(key[0]).get(key[1:])
+            self.pending.discard(key)
+            stack.pop()
+        return self.cache[target]
+
+    def dependencies(self, formula, sheet):
+        """수식이 참조하는 셀 키 목록 (해석할 수 없는 수식은 빈 목록 — 계산 단계에서 실패 처리)"""
+        try:
+            return [key for kind, text in self.tokens(formula) if kind == "ref" for key in self.reference_keys(text, sheet)]
+        except (FormulaError, ValueError):
+            return []
+
+    def tokens(self, formula):
+        if formula not in self.parsed:
+            self.parsed[formula] = self.tokenize(formula.lstrip("="))
+        return self.parsed[formula]
+
+    def tokenize(self, text):
+        import re
+
+        token = re.compile(self.TOKEN)
+        pos, tokens = 0, []
+        while pos < len(text):
+            m = token.match(text, pos)
+            if m is None or m.end() == pos:
+                if text[pos:].strip():
+                    raise FormulaError(text)
+                break
+            kind = m.lastgroup
+            tokens.append((kind, m.group(kind)))
+            pos = m.end()
+        return tokens
+
+    def reference_keys(self, text, sheet):
+        from openpyxl.utils.cell import range_boundaries
+
+        if "!" in text:
+            title, _, text = text.rpartition("!")
+            sheet = title[1:-1].replace("''", "'") if title.startswith("'") else title
+        c1, r1, c2, r2 = range_boundaries(text.replace("$", ""))
+        return [(sheet, r, c) for r in range(r1, r2 + 1) for c in range(c1, c2 + 1)]
+
+    def reference(self, text, sheet):
+        return [self.cell_value(*key) for key in self.reference_keys(text, sheet)]
+
+    def evaluate(self, formula, sheet):
+        tokens = self.tokens(formula)
+        pos = 0
+
+        def peek():
+            return tokens[pos] if pos < len(tokens) else (None, None)
+
+        def take():
+            nonlocal pos
+            pos += 1
+            return tokens[pos - 1]
+
+        def number(value):
+            if value is None or value == "":
+                return 0
+            if isinstance(value, (int, float)):
+                return value
+            raise FormulaError(formula)
+
+        def atom():
+            kind, text = take()
+            if kind == "num":
+                return [float(text) if "." in text else int(text)]
+            if kind == "ref":
+                return self.reference(text, sheet)
+            if kind == "func":
+                args = []
+                while peek() != ("op", ")"):
+                    args.extend(expr(many=True))
+                    if peek() == ("op", ","):
+                        take()
+                take()
+                if text == "SUM":
+                    return [sum(number(v) for v in args)]
+                raise FormulaError(formula)
+            if (kind, text) == ("op", "-"):
+                return [-number(atom()[0])]
+            if (kind, text) == ("op", "("):
+                value = expr()
+                take()
+                return value
+            raise FormulaError(formula)
+
+        def term():
+            values = atom()
+            while peek() in (("op", "*"), ("op", "/")):
+                op = take()[1]
+                left, right = number(values[0]), number(atom()[0])
+                if op == "/" and right == 0:
+                    raise FormulaError(formula)
+                values = [left * right if op == "*" else left / right]
+            return values
+
+        def expr(many=False):
+            values = term()
+            while peek() in (("op", "+"), ("op", "-")):
+                op = take()[1]
+                left, right = number(values[0]), number(term()[0])
+                values = [left + right if op == "+" else left - right]
+            return values if many else values[:1]
+
+        value = expr()
+        if pos != len(tokens) or not value:
+            raise FormulaError(formula)
+        return value[0]
+
+# ---------- HTML 변환 ----------
+def color_css(color):
+    """openpyxl Color(ARGB) → #RRGGBB (테마/인덱스 색상은 None)"""
+    rgb = getattr(color, "rgb", None) if color is not None else None
+    if isinstance(rgb, str) and len(rgb) == 8 and rgb != "00000000":
+        return f"#{rgb[2:]}"
+    return None
+
+def style_css(cell):
+    """셀 스타일(글꼴, 채우기, 테두리, 정렬) → CSS 선언"""
+    decl = []
+    font = cell.font
+    if font.b:
+        decl.append("font-weight:bold")
+    if font.i:
+        decl.append("font-style:italic")
+    if font.u:
+        decl.append("text-decoration:underline")
+    if font.sz:
+        decl.append(f"font-size:{float(font.sz):g}pt")
+    if color_css(font.color):
+        decl.append(f"color:{color_css(font.color)}")
+    fill = cell.fill
+    if getattr(fill, "fill_type", None) == "solid" and color_css(fill.fgColor):
+        decl.append(f"background:{color_css(fill.fgColor)}")
+    border = cell.border
+    for side in ("top", "right", "bottom", "left"):
+        edge = getattr(border, side)
+        if edge is not None and edge.style:
+            decl.append(f"border-{side}:{BORDER_CSS.get(edge.style, '1px solid')} {color_css(edge.color) or '#000'}")
+    align = cell.alignment
+    if align.horizontal in ("left", "center", "right", "justify"):
+        decl.append(f"text-align:{align.horizontal}")
+    elif align.horizontal == "centerContinuous":
+        decl.append("text-align:center")
+    if align.vertical in ("top", "center"):
+        decl.append(f"vertical-align:{'middle' if align.vertical == 'center' else 'top'}")
+    if align.wrap_text:
+        decl.append("white-space:pre-wrap")
+    return ";".join(decl)
+
+def column_px(width):
+    return round(width * 7 + 5)
+
+def row_px(height):
+    return round(height * 4 / 3)
+
+def render_preview_html(data, sheet=None, pages=None):
+    """xlsx bytes → 미리보기 HTML (캐시 없음)
+
+    sheet: 시트 이름 (기본: 첫 시트), pages: 앞에서부터 표시할 인쇄 페이지 수 (행 나눔 기준)
+    """
+    import io
+    import zipfile
+    from html import escape
+    import openpyxl
+    from xlsx_package import sheet_members
+
+    from openpyxl.cell.read_only import ReadOnlyCell
+    from openpyxl.styles.numbers import is_date_format, is_timedelta_format
+    from openpyxl.utils.datetime import from_excel
+
+    # 워크북은 스타일·공유 문자열용으로만 열고, 셀은 시트 XML 에서 직접 읽습니다.
+    wb = openpyxl.load_workbook(io.BytesIO(data), read_only=True)
+    zf = zipfile.ZipFile(io.BytesIO(data))
+    try:
+        title = sheet or wb.sheetnames[0]
+        ws = wb[title]
+        members = sheet_members(zf)
+        xml = zf.read(members[title]).decode("utf-8")
+        widths, heights, merges, breaks = xml_layout(xml)
+        last_row = breaks[pages - 1] if pages and len(breaks) >= pages else None
+
+        # 1) 셀 수집 - 병합으로 가려진 셀은 값만 남기고 표에서 뺌
+        spans, covered = {}, set()
+        for c1, r1, c2, r2 in merges:
+            if last_row is not None and r1 > last_row:
+                continue
+            spans[(r1, c1)] = (min(r2, last_row or r2) - r1 + 1, c2 - c1 + 1)
+            covered.update((r, c) for r in range(r1, r2 + 1) for c in range(c1, c2 + 1) if (r, c) != (r1, c1))
+        rows, values, results = sheet_cells(xml, wb.shared_strings, covered, last_row)
+        del xml
+
+        styles, max_col = {}, 0
+        for r, cells in rows:
+            for i, (c, value, style_id) in enumerate(cells):
+                if style_id not in styles:
+                    cell = ReadOnlyCell(ws, r, c, None, "n", style_id)
+                    fmt = cell.number_format if style_id else "General"
+                    styles[style_id] = (style_css(cell) if style_id else "", fmt, is_date_format(fmt))
+                if styles[style_id][2] and isinstance(value, (int, float)) and not isinstance(value, bool):
+                    cells[i] = (c, from_excel(value, wb.epoch, timedelta=is_timedelta_format(styles[style_id][1])), style_id)
+            c, _, _ = cells[-1]
+            max_col = max(max_col, c + spans.get((r, c), (1, 1))[1] - 1)
+
+        # 2) 수식 계산 (다른 시트는 참조될 때만 읽음)
+        loaded = {title: (values, results)}
+
+        def sheet_data(name):
+            if name not in loaded:
+                if name in members:
+                    _, other, other_results = sheet_cells(zf.read(members[name]).decode("utf-8"), wb.shared_strings)
+                    loaded[name] = (other, other_results)
+                else:
+                    loaded[name] = ({}, {})
+            return loaded[name]
+
+        evaluator = FormulaEvaluator(lambda name: sheet_data(name)[0], lambda name: sheet_data(name)[1])
+
+        # 3) HTML
+        out = [
+            '<!DOCTYPE html><html lang="ko"><head><meta charset="utf-8">',
+            f"<title>{escape(title)}</title><style>",
+            f"table.xlsx{{border-collapse:collapse;table-layout:fixed;font-family:{FONT_FAMILY};font-size:11pt}}",
+            "table.xlsx td{overflow:hidden;white-space:nowrap;padding:0 2px;vertical-align:bottom}",
+            "table.xlsx td.n{text-align:right}",
+        ]
+        out += [f".s{sid}{{{css}}}" for sid, (css, _, _) in styles.items() if css]
+        out.append('</style></head><body><table class="xlsx"><colgroup>')
+        out += [f'<col style="width:{column_px(widths.get(c, DEFAULT_COLUMN_WIDTH))}px">' for c in range(1, max_col + 1)]
+        out.append("</colgroup>")
+
+        prev_row = 0
+        for r, cells in rows:
+            for empty in range(prev_row + 1, r):  # 값이 없는 행도 높이를 유지
+                out.append(f'<tr style="height:{row_px(heights.get(empty, DEFAULT_ROW_HEIGHT))}px"></tr>')
+            prev_row = r
+            out.append(f'<tr style="height:{row_px(heights.get(r, DEFAULT_ROW_HEIGHT))}px">')
+            col = 1
+            for c, value, style_id in cells:
+                if c > col:
+                    out.append(f'<td colspan="{c - col}"></td>' if c - col > 1 else "<td></td>")
+                rowspan, colspan = spans.get((r, c), (1, 1))
+                if isinstance(value, str) and value.startswith("="):
+                    value = evaluator.cell_value(title, r, c)
+                css, fmt, _ = styles[style_id]
+                classes = [f"s{style_id}"] if css else []
+                if isinstance(value, (int, float)) and not isinstance(value, bool) and "text-align" not in css:
+                    classes.append("n")
+                attrs = (f' class="{" ".join(classes)}"' if classes else "") + \
+                    (f' rowspan="{rowspan}"' if rowspan > 1 else "") + (f' colspan="{colspan}"' if colspan > 1 else "")
+                out.append(f"<td{attrs}>{escape(format_value(value, fmt))}</td>")
+                col = c + colspan
+            out.append("</tr>")
+        out.append("</table></body></html>")
+        return "\n".join(out)
+    finally:
+        zf.close()
+        wb.close()
+
+# ---------- 캐시 ----------
+def disk_cache_path(key, suffix):
+    cache_dir = os.environ.get("INVOICE_PREVIEW_CACHE_DIR")
+    if not cache_dir:
+        return None
+    digest, sheet, pages = key
+    name = f"{digest}_{pages or 'all'}_{sheet_digest(sheet)}{suffix}"
+    return os.path.join(cache_dir, name)
+
+def sheet_digest(sheet):
+    import hashlib
+    return hashlib.sha256((sheet or "").encode("utf-8")).hexdigest()[:8]
+
+def read_input(xlsx):
+    """경로 또는 bytes → (bytes, SHA-256)"""
+    from xlsx_package import sha256_bytes
+
+    if isinstance(xlsx, (bytes, bytearray, memoryview)):
+        data = bytes(xlsx)
+    else:
+        with open(xlsx, "rb") as f:
+            data = f.read()
+    return data, sha256_bytes(data)
+
+def cached(key, suffix, build):
+    """메모리 LRU → 디스크 → build() 순으로 결과(bytes)를 찾습니다."""
+    mem_key = key + (suffix,)
+    with _lock:
+        entry = _cache.get(mem_key)
+        if entry is not None:
+            _cache.move_to_end(mem_key)
+            _stats["hits"] += 1
+            return entry
+
+    path = disk_cache_path(key, suffix)
+    if path and os.path.exists(path):
+        with open(path, "rb") as f:
+            entry = f.read()
+    else:
+        entry = build()
+        if path:
+            from invoice_api import write_output
+            write_output(path, entry)  # 고유 임시 파일 → os.replace (스레드/프로세스 간 충돌 없음)
+
+    with _lock:
+        _stats["misses"] += 1
+        _cache[mem_key] = entry
+        while len(_cache) > MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return entry
+
+def preview_html(xlsx, sheet=None, pages=None):
+    """캐시를 거친 미리보기 HTML (xlsx 는 경로 또는 bytes)"""
+    data, digest = read_input(xlsx)
+    key = (digest, sheet, pages)
+    return cached(key, ".html", lambda: render_preview_html(data, sheet, pages).encode("utf-8")).decode("utf-8")
+
+def preview_png(xlsx, sheet=None, pages=1):
+    """캐시를 거친 첫 페이지 PNG bytes (WeasyPrint 필요)"""
+    from html_to_pdf import html_to_png
+
+    data, digest = read_input(xlsx)
+    key = (digest, sheet, pages)
+    return cached(key, ".png", lambda: html_to_png(preview_html(data, sheet, pages)))
+
+def cache_info():
+    """캐시 적중/실패 횟수와 현재 항목 수"""
+    with _lock:
+        return {**_stats, "entries": len(_cache)}
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
+        _stats.update(hits=0, misses=0)
+
+def main():
+    """메인 함수 - 명령줄 인자 처리"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='청구서 xlsx 미리보기 (HTML/PNG)')
+    parser.add_argument('--input', required=True, help='렌더링된 청구서 xlsx')
+    parser.add_argument('--output', help='HTML 저장 경로 (기본: <입력>.html)')
+    parser.add_argument('--sheet', help='시트 이름 (기본: 첫 시트)')
+    parser.add_argument('--pages', type=int, help='앞에서부터 표시할 인쇄 페이지 수')
+    parser.add_argument('--png', help='첫 페이지 PNG 저장 경로 (WeasyPrint 필요)')
+    args = parser.parse_args()
+
+    try:
+        output = args.output or f"{os.path.splitext(args.input)[0]}.html"
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(preview_html(args.input, args.sheet, args.pages))
+        result = {"success": True, "output_path": output}
+        if args.png:
+            with open(args.png, "wb") as f:
+                f.write(preview_png(args.input, args.sheet, args.pages or 1))
+            result["png_path"] = args.png
+    except Exception as e:
+        result = {"success": False, "error": str(e)}
+
+    print(json.dumps(result, ensure_ascii=False))
+    return 0 if result["success"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())